@@ -0,0 +1,49 @@
+"""
+Synthetic text with a Zipf-like word distribution for benchmarks
+"""
+
+import random
+
+
+def vocabulary(size=20000, seed=0):
+    rng = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(letters) for _ in range(rng.randint(3, 10))))
+    return sorted(words)
+
+
+class TextGenerator:
+    """Generates words where the n-th most common word has weight 1/n"""
+
+    def __init__(self, vocab_size=20000, seed=0):
+        self.words = vocabulary(vocab_size, seed)
+        self.weights = [1 / (rank + 1) for rank in range(len(self.words))]
+        self.rng = random.Random(seed)
+
+    def words_sample(self, count):
+        return self.rng.choices(self.words, weights=self.weights, k=count)
+
+    def text(self, word_count):
+        return ' '.join(self.words_sample(word_count))
+
+    def query(self, terms=3):
+        # Mid-frequency terms, like the nouns users actually ask about
+        return ' '.join(self.rng.choice(self.words[100:5000]) for _ in range(terms))
+
+    def topic_words(self, topic, size=200):
+        """Words specific to one topic, absent from the shared vocabulary"""
+        rng = random.Random(f'topic-{topic}')
+        return [f'{rng.choice(self.words)}{topic}x{n}' for n in range(size)]
+
+    def topic_text(self, word_count, topic, topic_share=0.1):
+        """Shared Zipf text with a share of words from ``topic``"""
+        topical = self.topic_words(topic)
+        words = self.words_sample(word_count)
+        for index in range(0, word_count, int(1 / topic_share)):
+            words[index] = self.rng.choice(topical)
+        return ' '.join(words)
+
+    def topic_query(self, topic, terms=2):
+        return ' '.join(self.rng.sample(self.topic_words(topic), terms))
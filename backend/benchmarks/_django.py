@@ -0,0 +1,34 @@
+"""
+In-process Django setup for benchmarks, on a throwaway SQLite database
+"""
+
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup(**env):
+    """Configure Django against a fresh migrated database in a temp dir.
+
+    Extra keyword arguments are exported as environment variables before
+    settings load, e.g. ``setup(FILE_CHUNK_SIZE='500')``; a DATABASE_URL
+    among them replaces the throwaway database.
+    """
+    tmp = tempfile.mkdtemp(prefix='chatbot-bench-')
+    atexit.register(shutil.rmtree, tmp, ignore_errors=True)
+    os.environ['DATABASE_URL'] = f"sqlite:///{Path(tmp) / 'bench.sqlite3'}"
+    os.environ.update({key: str(value) for key, value in env.items()})
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    import django
+    from django.core.management import call_command
+    django.setup()
+    call_command('migrate', verbosity=0)
+    return Path(tmp)
@@ -0,0 +1,102 @@
+"""
+Helpers for benchmarks that run the backend and the fake Groq server
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'Server on port {port} did not start')
+
+
+@contextmanager
+def temp_database_env(env=None):
+    """Yield an environment pointing the backend at a fresh migrated SQLite DB"""
+    env = dict(os.environ if env is None else env)
+    with tempfile.TemporaryDirectory() as tmp:
+        env['DATABASE_URL'] = f"sqlite:///{Path(tmp) / 'bench.sqlite3'}"
+        env['DEBUG'] = 'False'
+        subprocess.run(
+            [sys.executable, 'manage.py', 'migrate', '--verbosity', '0'],
+            cwd=BACKEND_DIR, env=env, check=True
+        )
+        yield env
+
+
+@contextmanager
+def run_server(args, env, port):
+    """Run a server subprocess from the backend dir until the block exits"""
+    proc = subprocess.Popen(args, cwd=BACKEND_DIR, env=env)
+    try:
+        wait_for_port(port)
+        yield proc
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            # Open keep-alive connections can stall a graceful shutdown
+            proc.kill()
+            proc.wait()
+
+
+@contextmanager
+def self_signed_cert():
+    """Yield ``(certfile, keyfile)`` for a throwaway localhost certificate"""
+    with tempfile.TemporaryDirectory() as tmp:
+        certfile = str(Path(tmp) / 'cert.pem')
+        keyfile = str(Path(tmp) / 'key.pem')
+        subprocess.run(
+            [
+                'openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes',
+                '-keyout', keyfile, '-out', certfile, '-days', '1',
+                '-subj', '/CN=localhost', '-addext', 'subjectAltName=DNS:localhost,IP:127.0.0.1'
+            ],
+            check=True, capture_output=True
+        )
+        yield certfile, keyfile
+
+
+@contextmanager
+def fake_groq(env=None, chunks=20, delay=0.05, ssl=None):
+    """Run ``benchmarks.fake_groq`` and yield its chat completions URL.
+
+    Pass ``ssl=(certfile, keyfile)`` to serve over HTTPS.
+    """
+    env = dict(os.environ if env is None else env)
+    env['FAKE_GROQ_CHUNKS'] = str(chunks)
+    env['FAKE_GROQ_DELAY'] = str(delay)
+    port = free_port()
+    args = [
+        sys.executable, '-m', 'uvicorn', 'benchmarks.fake_groq:app',
+        '--port', str(port), '--log-level', 'warning'
+    ]
+    scheme = 'http'
+    if ssl:
+        args += ['--ssl-certfile', ssl[0], '--ssl-keyfile', ssl[1]]
+        scheme = 'https'
+    with run_server(args, env, port):
+        yield f'{scheme}://127.0.0.1:{port}/openai/v1/chat/completions'
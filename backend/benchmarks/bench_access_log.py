@@ -0,0 +1,92 @@
+"""
+Shared-link view latency and access counts: inline vs write-behind logging
+
+Has ``--threads`` threads load a shared session ``--views`` times each,
+first with the old inline logging (an INSERT plus a read-modify-write save
+of ``access_count`` per view), then with ``chat.access_log``. Reports view
+latency and whether every view ended up counted.
+
+Run from backend/:
+    python -m benchmarks.bench_access_log --threads 8 --views 50
+"""
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from . import _django
+
+
+def legacy_record(shared_session, request):
+    from django.utils import timezone
+    from chat.models import SharedChatAccess
+    SharedChatAccess.objects.create(
+        shared_session=shared_session,
+        ip_address=request.META.get('REMOTE_ADDR', ''),
+        user_agent=request.META.get('HTTP_USER_AGENT', ''),
+        session_data={'accessed_at': timezone.now().isoformat()}
+    )
+    shared_session.access_count += 1
+    shared_session.save(update_fields=['access_count'])
+
+
+def run(share_token, threads, views):
+    from django.db import connections
+    from django.test import Client
+
+    def viewer(_):
+        client = Client(HTTP_HOST='localhost')
+        timings, errors = [], 0
+        try:
+            for _ in range(views):
+                started = time.perf_counter()
+                response = client.get(f'/api/chat/shared/{share_token}/')
+                timings.append(time.perf_counter() - started)
+                errors += response.status_code != 200
+        finally:
+            connections.close_all()
+        return timings, errors
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(viewer, range(threads)))
+    return [t for timings, _ in results for t in timings], sum(errors for _, errors in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--views', type=int, default=50)
+    parser.add_argument('--messages', type=int, default=20)
+    args = parser.parse_args()
+
+    _django.setup()
+    from chat import access_log
+    from chat.models import ChatMessage, ChatSession, SharedChatAccess, SharedChatSession
+
+    expected = args.threads * args.views
+    print(f'{args.threads} threads x {args.views} views')
+    for label in ('write-behind', 'inline'):
+        session = ChatSession.objects.create(session_id=label)
+        ChatMessage.objects.bulk_create(
+            ChatMessage(session=session, role='user', content=f'Message {i}') for i in range(args.messages)
+        )
+        shared = SharedChatSession.objects.create(original_session=session, share_token=label, title=label)
+
+        record = access_log.record
+        if label == 'inline':
+            access_log.record = legacy_record
+        try:
+            timings, errors = run(label, args.threads, args.views)
+        finally:
+            access_log.record = record
+        access_log.flush()
+
+        shared.refresh_from_db()
+        rows = SharedChatAccess.objects.filter(shared_session=shared).count()
+        print(f'  {label:<12} p50 {statistics.median(timings) * 1000:6.1f} ms  '
+              f'p99 {sorted(timings)[int(len(timings) * 0.99) - 1] * 1000:6.1f} ms  '
+              f'errors {errors}  access_count {shared.access_count}/{expected}  log rows {rows}')
+
+
+if __name__ == '__main__':
+    main()
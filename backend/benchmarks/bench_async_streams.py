@@ -0,0 +1,93 @@
+"""
+Concurrent SSE stream benchmark for the async chat endpoint
+
+Starts the fake Groq server and the backend under uvicorn (one worker), then
+opens N concurrent streaming chats and reports how many complete and how long
+they take. Compare ``/api/chat/async/`` with the sync ``/api/chat/`` view.
+
+Run from backend/:
+    python -m benchmarks.bench_async_streams --concurrency 50 100 200 400
+    python -m benchmarks.bench_async_streams --endpoint /api/chat/ --concurrency 10 50
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import httpx
+from ._servers import fake_groq, free_port, run_server, temp_database_env
+
+
+async def _one_stream(client, url, index, expected_chunks):
+    started = time.perf_counter()
+    first_token = None
+    chunks = 0
+    try:
+        async with client.stream(
+            'POST', url,
+            json={'message': f'benchmark message {index}', 'stream': True}
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith('data: '):
+                    continue
+                event = json.loads(line[6:])
+                if 'error' in event:
+                    return None
+                if first_token is None:
+                    first_token = time.perf_counter() - started
+                chunks += 1
+    except httpx.HTTPError:
+        return None
+    if chunks < expected_chunks:
+        return None
+    return first_token, time.perf_counter() - started
+
+
+async def _run_level(url, concurrency, expected_chunks):
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(timeout=300, limits=limits) as client:
+        started = time.perf_counter()
+        results = await asyncio.gather(*[
+            _one_stream(client, url, i, expected_chunks) for i in range(concurrency)
+        ])
+        wall = time.perf_counter() - started
+    ok = [r for r in results if r is not None]
+    return ok, wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--endpoint', default='/api/chat/async/')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[50, 100, 200, 400])
+    parser.add_argument('--chunks', type=int, default=20)
+    parser.add_argument('--delay', type=float, default=0.05)
+    args = parser.parse_args()
+
+    with temp_database_env() as env, fake_groq(env, args.chunks, args.delay) as groq_url:
+        env['GROQ_API_URL'] = groq_url
+        env['GROQ_API_KEY'] = 'benchmark'
+        port = free_port()
+        server = [
+            sys.executable, '-m', 'uvicorn', 'core.asgi:application',
+            '--port', str(port), '--workers', '1', '--log-level', 'warning'
+        ]
+        with run_server(server, env, port):
+            url = f'http://127.0.0.1:{port}{args.endpoint}'
+            ideal = args.chunks * args.delay
+            print(f'endpoint={args.endpoint} upstream generation ~{ideal:.2f}s per stream')
+            print(f"{'streams':>8} {'ok':>6} {'wall_s':>8} {'ttft_p50':>9} {'total_p50':>10} {'total_max':>10}")
+            for concurrency in args.concurrency:
+                ok, wall = asyncio.run(_run_level(url, concurrency, args.chunks))
+                ttft = [r[0] for r in ok] or [float('nan')]
+                total = [r[1] for r in ok] or [float('nan')]
+                print(
+                    f'{concurrency:>8} {len(ok):>6} {wall:>8.2f} '
+                    f'{statistics.median(ttft):>9.3f} {statistics.median(total):>10.3f} {max(total):>10.3f}'
+                )
+
+
+if __name__ == '__main__':
+    main()
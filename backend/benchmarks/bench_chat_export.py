@@ -0,0 +1,99 @@
+"""
+Chat session export: in-memory document vs streaming, plain and gzipped
+
+For sessions of ``--messages`` messages, compares the old export (every
+message serialized into a list, then one DRF ``Response``) with
+``POST /api/chat/export/`` streaming JSON, JSON Lines and gzipped JSON.
+Reports time to first byte, total time, bytes sent and the tracemalloc peak
+of a second, traced run.
+
+Run from backend/:
+    python -m benchmarks.bench_chat_export --messages 1000 10000 50000
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from . import _django
+
+
+def legacy_export(session_id):
+    from rest_framework.renderers import JSONRenderer
+    from chat.models import ChatSession
+    session = ChatSession.objects.get(session_id=session_id)
+    message_data = []
+    for msg in session.messages.all().order_by('timestamp'):
+        message_data.append({
+            'id': str(msg.id),
+            'role': msg.role,
+            'content': msg.content,
+            'timestamp': msg.timestamp.isoformat(),
+            'metadata': msg.metadata or {}
+        })
+    export_data = {'sessionId': session.session_id, 'title': session.title, 'messages': message_data}
+    # What the DRF Response rendered before sending anything
+    body = JSONRenderer().render(export_data)
+    yield body
+
+
+def streaming_export(session_id, export_format='json', gzip=False):
+    from django.test import Client
+    headers = {'HTTP_ACCEPT_ENCODING': 'gzip'} if gzip else {}
+    response = Client(HTTP_HOST='localhost').post(
+        '/api/chat/export/', json.dumps({'session_id': session_id, 'format': export_format}),
+        content_type='application/json', **headers
+    )
+    assert response.status_code == 200, response.status_code
+    yield from response.streaming_content
+
+
+def measure(chunks_fn):
+    started = time.perf_counter()
+    first_byte = None
+    size = 0
+    for chunk in chunks_fn():
+        if first_byte is None:
+            first_byte = time.perf_counter() - started
+        size += len(chunk)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    for _ in chunks_fn():
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return first_byte, elapsed, size, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--messages', type=int, nargs='+', default=[1000, 10000, 50000])
+    args = parser.parse_args()
+
+    _django.setup()
+    from chat.models import ChatMessage, ChatSession
+
+    for count in args.messages:
+        session_id = f'bench-{count}'
+        session = ChatSession.objects.create(session_id=session_id, title='Benchmark')
+        ChatMessage.objects.bulk_create(
+            ChatMessage(session=session, role='user' if i % 2 == 0 else 'assistant',
+                        content=f'Message {i}: ' + 'the quick brown fox jumps over the lazy dog ' * 8)
+            for i in range(count)
+        )
+        print(f'{count} messages')
+        variants = (
+            ('in-memory', lambda: legacy_export(session_id)),
+            ('json', lambda: streaming_export(session_id)),
+            ('jsonl', lambda: streaming_export(session_id, 'jsonl')),
+            ('json+gzip', lambda: streaming_export(session_id, gzip=True)),
+        )
+        for label, chunks_fn in variants:
+            first_byte, elapsed, size, peak = measure(chunks_fn)
+            print(f'  {label:<10} first byte {first_byte * 1000:7.1f} ms  total {elapsed:6.2f}s  '
+                  f'{size / 1e6:6.2f} MB sent  peak {peak / 1e6:6.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Chat session import throughput: per-row inserts vs the bulk importer
+
+Builds an export with ``--messages`` messages and imports it twice: with the
+old import loop (``json.loads`` of the whole body, then one autocommitted
+``objects.create`` per message) and through ``POST /api/chat/import/``,
+which streams the body into ``chat.importer``. Reports messages/second and
+the tracemalloc peak of a second, traced run.
+
+Run from backend/:
+    python -m benchmarks.bench_chat_import --messages 1000 10000
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from . import _django
+
+
+def make_export(session_id, count):
+    started = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return json.dumps({
+        'sessionId': session_id,
+        'title': 'Benchmark import',
+        'messages': [
+            {
+                'id': str(number),
+                'role': 'user' if number % 2 == 0 else 'assistant',
+                'content': f'Message {number}: ' + 'the quick brown fox jumps over the lazy dog ' * 5,
+                'timestamp': (started + timedelta(seconds=number)).isoformat(),
+                'metadata': {'tokens': number % 100}
+            }
+            for number in range(count)
+        ],
+        'files': [],
+        'metadata': {'version': '1.0', 'messageCount': count}
+    }).encode()
+
+
+def legacy_import(body):
+    from chat.models import ChatMessage, ChatSession
+    session_data = json.loads(body)
+    session, _ = ChatSession.objects.get_or_create(
+        session_id=session_data['sessionId'], defaults={'title': session_data.get('title', 'Imported Chat')}
+    )
+    for msg_data in session_data['messages']:
+        ChatMessage.objects.create(
+            session=session,
+            role=msg_data['role'],
+            content=msg_data['content'],
+            metadata=msg_data.get('metadata', {})
+        )
+
+
+def bulk_import(body):
+    from django.test import Client
+    response = Client(HTTP_HOST='localhost').post('/api/chat/import/', body, content_type='application/json')
+    assert response.status_code == 200, response.content
+
+
+def measure(fn, make_body):
+    body = make_body()
+    started = time.perf_counter()
+    fn(body)
+    elapsed = time.perf_counter() - started
+    # Second, traced run on a fresh session id (tracemalloc slows everything down)
+    body = make_body(traced=True)
+    tracemalloc.start()
+    fn(body)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--messages', type=int, nargs='+', default=[1000, 10000])
+    args = parser.parse_args()
+
+    _django.setup()
+    from chat.models import ChatMessage
+
+    for count in args.messages:
+        print(f'{count} messages')
+        for label, fn in (('per-row', legacy_import), ('bulk', bulk_import)):
+            session_id = f'{label}-{count}'
+            elapsed, peak, size = measure(
+                fn, lambda traced=False: make_export(session_id + ('-traced' if traced else ''), count)
+            )
+            stored = ChatMessage.objects.filter(session__session_id=session_id)
+            first = stored.order_by('id').first()
+            print(f'  {label:<8} {count / elapsed:9.0f} msg/s  {elapsed:6.2f}s  peak {peak / 1e6:6.1f} MB  '
+                  f'({size / 1e6:.1f} MB body, first timestamp {first.timestamp:%Y-%m-%d})')
+
+
+if __name__ == '__main__':
+    main()
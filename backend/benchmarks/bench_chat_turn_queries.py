@@ -0,0 +1,122 @@
+"""
+Queries per chat turn, by history length
+
+Posts chat turns to ``POST /api/chat/`` with the Groq call replaced by a
+canned reply, into sessions that already hold ``--history`` messages, with
+the history cache cold (first turn after a restart) and warm, and into new
+sessions. Reports the queries, writes and transactions of each turn and its
+latency, and exits non-zero if the query count depends on history length, or
+if ``--max-queries`` is exceeded. chat/tests.py pins the same counts in CI.
+
+Run from backend/:
+    python -m benchmarks.bench_chat_turn_queries --history 0 10 100 1000 5000
+"""
+
+import argparse
+import json
+import sys
+import time
+from . import _django
+
+
+TRANSACTION_CONTROL = {'BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE'}
+REPLY = 'Here is what the uploaded report says about revenue. ' * 10
+
+
+class FakeUpstreamResponse:
+    """Just enough of a requests.Response for the chat views"""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {'choices': [{'message': {'content': REPLY}}]}
+
+    def iter_lines(self):
+        for word in REPLY.split(' '):
+            yield f"data: {json.dumps({'choices': [{'delta': {'content': word + ' '}}]})}".encode()
+        yield b'data: [DONE]'
+
+
+def fake_post(payload, stream=False):
+    return FakeUpstreamResponse(stream)
+
+
+def turn(client, session_id, stream):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        data = {'message': 'What about revenue?', 'stream': stream}
+        if session_id:
+            data['session_id'] = session_id
+        response = client.post('/api/chat/', data, content_type='application/json')
+        if stream:
+            b''.join(response.streaming_content)
+        elapsed = time.perf_counter() - started
+    assert response.status_code == 200, response.content
+    statements = [query['sql'].split(' ', 1)[0].upper() for query in queries.captured_queries]
+    # BEGIN/COMMIT are logged too; count them as transactions, not queries
+    transactions = statements.count('BEGIN')
+    statements = [statement for statement in statements if statement not in TRANSACTION_CONTROL]
+    writes = sum(statement in ('INSERT', 'UPDATE', 'DELETE') for statement in statements)
+    return len(statements), writes, transactions, elapsed
+
+
+def describe(result):
+    queries, writes, transactions, elapsed = result
+    return f'{queries:2d} queries ({writes} writes, {transactions} txn) {elapsed * 1000:6.1f} ms'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--history', type=int, nargs='+', default=[0, 10, 100, 1000, 5000])
+    parser.add_argument('--max-queries', type=int, default=None)
+    args = parser.parse_args()
+
+    _django.setup()
+    from django.test import Client
+    from chat import history, upstream
+    from chat.models import ChatMessage, ChatSession
+
+    upstream.post = fake_post
+    client = Client(HTTP_HOST='localhost')
+    counts = set()
+    for length in args.history:
+        for stream in (False, True):
+            session_id = f'history-{length}-{"stream" if stream else "plain"}'
+            session = ChatSession.objects.create(session_id=session_id, title='Benchmark')
+            ChatMessage.objects.bulk_create(
+                ChatMessage(session=session, role='user' if number % 2 == 0 else 'assistant',
+                            content=f'Message {number}: ' + 'some earlier conversation ' * 10)
+                for number in range(length)
+            )
+            history.get_store().clear()
+            label = f'{length:>5} messages, {"streamed" if stream else "plain"}'
+            cold = turn(client, session_id, stream)
+            warm = turn(client, session_id, stream)
+            counts.update((cold[0], warm[0]))
+            print(f'  {label:<26} cold: {describe(cold)}   warm: {describe(warm)}')
+
+    # The first turn of a session creates it and has no history to read
+    new_counts = set()
+    for label, session_id in (('new session, given id', 'brand-new'), ('new session, no id', None)):
+        new = turn(client, session_id, False)
+        new_counts.add(new[0])
+        print(f'  {label:<26} {describe(new)}')
+
+    failed = False
+    if len(counts) > 1:
+        print(f'Query count varies with history: {sorted(counts)}')
+        failed = True
+    if args.max_queries is not None and max(counts | new_counts) > args.max_queries:
+        print(f'More than {args.max_queries} queries in a turn')
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
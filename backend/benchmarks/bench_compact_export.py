@@ -0,0 +1,163 @@
+"""
+Compact binary export vs JSON: size and encode/decode speed
+
+Generates chat transcripts of ``--messages`` messages (Zipf-distributed
+words, long assistant answers with code blocks, stock user replies, repeated
+system prompts, per-answer model metadata) and encodes each as the JSON
+export, gzipped JSON, and the compact format with zlib and zstd. Checks that
+every compact export decodes to exactly the messages of the JSON one, then
+round-trips a session through ``/api/chat/export/`` and ``/api/chat/import/``.
+
+Run from backend/:
+    python -m benchmarks.bench_compact_export --messages 1000 20000
+"""
+
+import argparse
+import gzip
+import io
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from . import _django
+from ._corpus import TextGenerator
+
+
+SYSTEM_PROMPT = 'You are a helpful assistant. Answer using the uploaded documents when they are relevant.'
+STOCK_REPLIES = ['Thanks!', 'Can you continue?', 'Explain that more simply.', 'ok', 'Give me an example.']
+
+
+def transcript(count, seed=0):
+    """``(id, role, content, timestamp, metadata)`` rows of one session"""
+    text = TextGenerator(seed=seed)
+    rng = random.Random(seed)
+    timestamp = datetime(2025, 3, 1, 9, 0, tzinfo=timezone.utc)
+    rows = []
+    for number in range(count):
+        timestamp += timedelta(seconds=rng.randint(2, 90), microseconds=rng.randint(0, 999999))
+        if number % 200 == 0:
+            role, content, metadata = 'system', SYSTEM_PROMPT, {}
+        elif number % 2:
+            role, metadata = 'user', {}
+            content = rng.choice(STOCK_REPLIES) if rng.random() < 0.15 else text.text(rng.randint(5, 60)) + '?'
+        else:
+            role = 'assistant'
+            paragraphs = [text.text(rng.randint(30, 120)) for _ in range(rng.randint(1, 4))]
+            if rng.random() < 0.3:
+                paragraphs.append('```python\n' + '\n'.join(
+                    f'    {text.text(3)} = {text.text(2)}({number % 7})' for _ in range(rng.randint(3, 12))
+                ) + '\n```')
+            content = '\n\n'.join(paragraphs)
+            metadata = {'model': 'llama-3.1-70b-versatile', 'tokens': len(content) // 4}
+            if rng.random() < 0.2:
+                metadata['sources'] = [f'report-{rng.randint(1, 5)}.pdf']
+        rows.append((1000 + number, role, content, timestamp, metadata))
+    return rows
+
+
+def message_dicts(rows):
+    return [
+        {'id': str(id), 'role': role, 'content': content, 'timestamp': ts.isoformat(), 'metadata': metadata or {}}
+        for id, role, content, ts, metadata in rows
+    ]
+
+
+def json_encode(rows):
+    document = {'sessionId': 'bench', 'title': 'Benchmark', 'messages': message_dicts(rows), 'files': [],
+                'metadata': {'version': '1.0', 'messageCount': len(rows), 'fileCount': 0}}
+    return json.dumps(document, separators=(',', ':')).encode()
+
+
+def compact_encode(rows, codec):
+    from chat import compact
+    encoder = compact.Encoder(codec)
+    pieces = [encoder.header(), encoder.frame({'type': 'session', 'sessionId': 'bench', 'title': 'Benchmark'})]
+    for start in range(0, len(rows), compact.BLOCK_SIZE):
+        pieces.append(encoder.messages(rows[start:start + compact.BLOCK_SIZE]))
+    pieces.append(encoder.frame({'type': 'metadata', 'version': '1.0', 'messageCount': len(rows), 'fileCount': 0}))
+    pieces.append(encoder.close())
+    return b''.join(pieces)
+
+
+def compact_decode(data):
+    from chat import compact
+    return [value for kind, value in compact.read(io.BytesIO(data)) if kind == 'message']
+
+
+def timed(fn, *args, repeat=3):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(*args)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def round_trip(count):
+    """Export a stored session as compact, import it back, compare JSON exports"""
+    from django.test import Client
+    from chat.models import ChatMessage, ChatSession
+    session = ChatSession.objects.create(session_id=f'round-trip-{count}', title='Round trip')
+    ChatMessage.objects.bulk_create(
+        ChatMessage(session=session, role=role, content=content, timestamp=ts, metadata=metadata)
+        for _, role, content, ts, metadata in transcript(count, seed=1)
+    )
+    client = Client(HTTP_HOST='localhost')
+
+    def export(export_format):
+        response = client.post('/api/chat/export/', {'session_id': session.session_id, 'format': export_format},
+                               content_type='application/json')
+        assert response.status_code == 200, response.status_code
+        return b''.join(response.streaming_content)
+
+    def comparable(body):
+        # Message ids are new after an import
+        return [{**message, 'id': None} for message in json.loads(body)['messages']]
+
+    before = export('json')
+    data = export('compact')
+    response = client.post('/api/chat/import/', data, content_type='application/octet-stream')
+    assert response.status_code == 200, response.content
+    return comparable(export('json')) == comparable(before), len(before), len(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--messages', type=int, nargs='+', default=[1000, 20000])
+    args = parser.parse_args()
+
+    _django.setup()
+    from chat import compact
+
+    codecs = [('compact+zlib', compact.ZLIB)]
+    if compact.zstandard is not None:
+        codecs.append(('compact+zstd', compact.ZSTD))
+
+    for count in args.messages:
+        rows = transcript(count)
+        expected = message_dicts(rows)
+        print(f'{count} messages')
+
+        body, encode = timed(json_encode, rows)
+        _, decode = timed(json.loads, body)
+        print(f'  {"json":<13} {len(body) / 1e6:7.2f} MB  encode {encode * 1000:7.1f} ms  decode {decode * 1000:7.1f} ms')
+        gzipped, encode_gz = timed(gzip.compress, body, 6)
+        _, decode_gz = timed(lambda: json.loads(gzip.decompress(gzipped)))
+        print(f'  {"json+gzip":<13} {len(gzipped) / 1e6:7.2f} MB  encode {(encode + encode_gz) * 1000:7.1f} ms  '
+              f'decode {decode_gz * 1000:7.1f} ms')
+
+        for label, codec in codecs:
+            data, encode = timed(compact_encode, rows, codec)
+            decoded, decode = timed(compact_decode, data)
+            assert decoded == expected, f'{label} does not round-trip'
+            print(f'  {label:<13} {len(data) / 1e6:7.2f} MB  encode {encode * 1000:7.1f} ms  '
+                  f'decode {decode * 1000:7.1f} ms  ({len(body) / len(data):.1f}x smaller than json)')
+
+        same, json_size, compact_size = round_trip(count)
+        print(f'  via the API: json {json_size / 1e6:.2f} MB -> compact {compact_size / 1e6:.2f} MB, '
+              f'import and re-export {"identical" if same else "DIFFERENT"}')
+
+
+if __name__ == '__main__':
+    main()
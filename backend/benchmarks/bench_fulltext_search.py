@@ -0,0 +1,75 @@
+"""
+Full-text search latency: indexed search vs. icontains table scan
+
+Loads ``--size-mb`` of synthetic documents into ParsedFile (the search index
+is maintained by the post_save signal), then times ``fileparser.search`` and
+the old ``parsed_content__icontains`` query for the same terms. Each document
+mixes shared text with words from one of ``--topics`` topics, and queries ask
+for topic words, so a query matches a realistic fraction of the corpus.
+
+Run from backend/:
+    python -m benchmarks.bench_fulltext_search --size-mb 1024
+"""
+
+import argparse
+import statistics
+import time
+from . import _django
+
+
+def _timed(fn, queries):
+    samples = []
+    for query in queries:
+        started = time.perf_counter()
+        fn(query)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(0.99 * (len(samples) - 1))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--size-mb', type=int, default=1024)
+    parser.add_argument('--doc-kb', type=int, default=1024)
+    parser.add_argument('--topics', type=int, default=100)
+    parser.add_argument('--queries', type=int, default=20)
+    parser.add_argument('--scan-queries', type=int, default=3)
+    args = parser.parse_args()
+
+    _django.setup()
+    from django.db import connection, transaction
+    from fileparser.models import ParsedFile
+    from fileparser.search import search
+    from ._corpus import TextGenerator
+
+    generator = TextGenerator()
+    words_per_doc = args.doc_kb * 1024 // 8
+    documents = args.size_mb * 1024 // args.doc_kb
+    started = time.perf_counter()
+    for number in range(documents):
+        content = generator.topic_text(words_per_doc, number % args.topics)
+        with transaction.atomic():
+            ParsedFile.objects.create(
+                original_name=f'doc-{number}.txt', file_path='', file_type='txt',
+                file_size=len(content), parsed_content=content
+            )
+    print(f'loaded {documents} documents (~{args.size_mb} MB) on {connection.vendor} '
+          f'in {time.perf_counter() - started:.1f}s')
+
+    queries = [generator.topic_query(n % args.topics) for n in range(args.queries)]
+
+    def indexed(query):
+        return search(query, page=1, page_size=20)
+
+    def scan(query):
+        files = ParsedFile.objects.filter(parsed_content__icontains=query.split()[0])
+        return files.count(), list(files.values_list('id', flat=True)[:20])
+
+    p50, p99 = _timed(indexed, queries)
+    print(f'indexed search: p50={p50:.1f}ms p99={p99:.1f}ms')
+    p50, p99 = _timed(scan, queries[:args.scan_queries])
+    print(f'icontains scan: p50={p50:.1f}ms p99={p99:.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
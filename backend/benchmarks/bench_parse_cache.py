@@ -0,0 +1,68 @@
+"""
+Upload latency with and without a parse cache hit
+
+Uploads a generated PDF through the API, waits for its parse job, then
+uploads the same bytes again under another name, which is served from the
+content-addressed parse cache. Reports both latencies, how many characters
+of parsed text the two files occupy in the database and how many retrieval
+chunks and postings index them.
+
+Run from backend/:
+    python -m benchmarks.bench_parse_cache --pages 20 --repeat 5
+"""
+
+import argparse
+import statistics
+import time
+from . import _django
+from .bench_parse_pipeline import make_pdf
+
+
+def upload(client, name, data):
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    started = time.perf_counter()
+    job = client.post('/api/file/upload/', {'file': SimpleUploadedFile(name, data)}).json()
+    while job['status'] in ('queued', 'running'):
+        time.sleep(0.01)
+        job = client.get(f"/api/file/jobs/{job['id']}/").json()
+    assert job['status'] == 'done', job
+    return time.perf_counter() - started, job['stage']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    tmp = _django.setup()
+    from django.db.models import Sum
+    from django.db.models.functions import Length
+    from django.test import Client
+    from fileparser.models import ChunkTerm, FileChunk, ParsedBlob, ParsedFile
+
+    client = Client(HTTP_HOST='localhost')
+    misses, hits = [], []
+    for run in range(args.repeat):
+        path = tmp / f'resume-{run}.pdf'
+        make_pdf(path, args.pages + run)  # Distinct bytes per run
+        data = path.read_bytes()
+        elapsed, stage = upload(client, f'resume-{run}.pdf', data)
+        misses.append(elapsed)
+        elapsed, stage = upload(client, f'resume-{run}-copy.pdf', data)
+        assert stage == 'cached', stage
+        hits.append(elapsed)
+
+    print(f'PDF: ~{args.pages} pages, {len(data) / 1e3:.0f} KB, {args.repeat} runs')
+    print(f'  first upload (parse job)  p50 {statistics.median(misses) * 1000:8.1f} ms')
+    print(f'  repeat upload (cache hit) p50 {statistics.median(hits) * 1000:8.1f} ms')
+    inline = ParsedFile.objects.aggregate(chars=Sum(Length('parsed_content')))['chars'] or 0
+    shared = ParsedBlob.objects.aggregate(chars=Sum('content_length'))['chars'] or 0
+    print(f'  {ParsedFile.objects.count()} files store {inline + shared} chars of text '
+          f'({shared} in {ParsedBlob.objects.count()} shared blobs)')
+    print(f'  indexed by {FileChunk.objects.count()} chunks and {ChunkTerm.objects.count()} postings '
+          f'({FileChunk.objects.filter(blob__isnull=False).count()} chunks shared)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+Memory and throughput of upload saving and text extraction
+
+Compares the old implementation (whole upload read into a ContentFile,
+parsers building text with ``text += ...``) with the streaming pipeline in
+``fileparser.utils`` on a generated multi-page PDF and a large CSV. Peak
+memory is the tracemalloc peak of Python allocations during each step;
+``iter_file -> sink`` streams text without keeping it, showing the parser's
+own footprint.
+
+Run from backend/:
+    python -m benchmarks.bench_parse_pipeline --pdf-pages 100 --csv-rows 500000
+"""
+
+import argparse
+import csv
+import sys
+import time
+import tracemalloc
+from . import _django
+
+
+def legacy_parse_pdf(file_path):
+    import PyPDF2
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        text = ""
+        for page in pdf_reader.pages:
+            text += page.extract_text() + "\n"
+    return text
+
+
+def legacy_parse_csv(file_path):
+    text = ""
+    with open(file_path, 'r', encoding='utf-8', newline='') as file:
+        for row in csv.reader(file):
+            text += ", ".join(row) + "\n"
+    return text
+
+
+def legacy_save(uploaded_file):
+    from django.core.files.base import ContentFile
+    from django.core.files.storage import default_storage
+    name = default_storage.save(uploaded_file.name, ContentFile(uploaded_file.read()))
+    return default_storage.path(name)
+
+
+def make_pdf(path, pages):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+    pdf = canvas.Canvas(str(path), pagesize=A4)
+    line = 'The quick brown fox jumps over the lazy dog while parsing benchmarks run. '
+    for page in range(pages):
+        text = pdf.beginText(40, 800)
+        for number in range(60):
+            text.textLine(f'{page}:{number} {line}')
+        pdf.drawText(text)
+        pdf.showPage()
+    pdf.save()
+
+
+def make_csv(path, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['id', 'name', 'email', 'city', 'amount'])
+        for row in range(rows):
+            writer.writerow([row, f'user {row}', f'user{row}@example.com', 'Springfield', row * 3 % 1000])
+
+
+def measure(label, fn):
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    size = len(result) if isinstance(result, str) else 0
+    rate = f'{size / elapsed / 1e6:8.1f} MB/s' if size else ' ' * 13
+    print(f'  {label:<28} {elapsed:7.2f}s {rate} peak {peak / 1e6:8.1f} MB')
+    return result
+
+
+def _ignore_moved_tempfiles(unraisable):
+    # save_uploaded_file moves Django's spooled temp file into MEDIA_ROOT, so
+    # its finalizer finds nothing to unlink
+    if not isinstance(unraisable.exc_value, FileNotFoundError):
+        sys.__unraisablehook__(unraisable)
+
+
+def main():
+    sys.unraisablehook = _ignore_moved_tempfiles
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--pdf-pages', type=int, default=100)
+    parser.add_argument('--csv-rows', type=int, default=500000)
+    args = parser.parse_args()
+
+    tmp = _django.setup()
+    from django.conf import settings
+    from django.core.files.uploadedfile import TemporaryUploadedFile
+    from fileparser.utils import iter_file, parse_file, save_uploaded_file
+
+    settings.MEDIA_ROOT = str(tmp / 'media')
+
+    class Sink:
+        def write(self, piece):
+            pass
+
+    def stream_to_sink(path, name):
+        sink = Sink()
+        for piece in iter_file(path, name):
+            sink.write(piece)
+
+    pdf_path = tmp / 'bench.pdf'
+    make_pdf(pdf_path, args.pdf_pages)
+    print(f'PDF: {args.pdf_pages} pages, {pdf_path.stat().st_size / 1e6:.1f} MB')
+    measure('legacy parse_pdf', lambda: legacy_parse_pdf(pdf_path))
+    measure('parse_file', lambda: parse_file(pdf_path, 'bench.pdf'))
+    measure('iter_file -> sink', lambda: stream_to_sink(pdf_path, 'bench.pdf'))
+
+    csv_path = tmp / 'bench.csv'
+    make_csv(csv_path, args.csv_rows)
+    print(f'CSV: {args.csv_rows} rows, {csv_path.stat().st_size / 1e6:.1f} MB')
+    measure('legacy parse_csv', lambda: legacy_parse_csv(csv_path))
+    measure('parse_file', lambda: parse_file(csv_path, 'bench.csv'))
+    measure('iter_file -> sink', lambda: stream_to_sink(csv_path, 'bench.csv'))
+
+    def upload():
+        uploaded = TemporaryUploadedFile('bench.csv', 'text/csv', csv_path.stat().st_size, 'utf-8')
+        with open(csv_path, 'rb') as source:
+            while block := source.read(1024 * 1024):
+                uploaded.write(block)
+        uploaded.seek(0)
+        return uploaded
+
+    print('Upload save (CSV, spooled to a temp file by Django):')
+    measure('legacy ContentFile(read())', lambda: legacy_save(upload()))
+    measure('save_uploaded_file', lambda: save_uploaded_file(upload()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Shared PDF downloads under a burst of viewers
+
+Creates a shared session with ``--messages`` messages, then has ``--viewers``
+threads request its PDF at once. Reports how long the requests held a web
+thread, how many renders the burst started and how long the single render
+took, as seen through the job's status endpoint.
+
+Run from backend/:
+    python -m benchmarks.bench_pdf_jobs --messages 2000 --viewers 50
+"""
+
+import argparse
+import atexit
+import shutil
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from . import _django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--viewers', type=int, default=50)
+    args = parser.parse_args()
+
+    # Passed through the environment so the render processes see it too
+    pdf_dir = tempfile.mkdtemp(prefix='chatbot-bench-pdfs-')
+    atexit.register(shutil.rmtree, pdf_dir, ignore_errors=True)
+    _django.setup(SHARED_PDF_CACHE_DIR=pdf_dir)
+    from django.db import connections
+    from django.test import Client
+    from chat.models import ChatMessage, ChatSession, PdfExportJob, SharedChatSession
+
+    session = ChatSession.objects.create(session_id='bench', title='Benchmark')
+    ChatMessage.objects.bulk_create(
+        ChatMessage(
+            session=session,
+            role='user' if number % 2 == 0 else 'assistant',
+            content=f'Message {number}: ' + 'the quick brown fox jumps over the lazy dog ' * (3 + number % 12)
+        )
+        for number in range(args.messages)
+    )
+    # Created directly, so no pre-render runs before the burst
+    share_token = 'bench'
+    SharedChatSession.objects.create(
+        original_session=session, share_token=share_token, title='Benchmark',
+        pdf_url=f'/api/chat/shared/{share_token}/pdf/'
+    )
+    client = Client(HTTP_HOST='localhost')
+
+    def view(_):
+        try:
+            started = time.perf_counter()
+            response = Client(HTTP_HOST='localhost').get(f'/api/chat/shared/{share_token}/pdf/')
+            return time.perf_counter() - started, response.status_code, response
+        finally:
+            connections.close_all()
+
+    burst_started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=min(args.viewers, 32)) as threads:
+        results = list(threads.map(view, range(args.viewers)))
+    latencies = [elapsed for elapsed, _, _ in results]
+    job_ids = {response.json()['id'] for _, code, response in results if code == 202}
+
+    job = results[0][2].json()
+    while job['status'] in ('queued', 'running'):
+        time.sleep(0.05)
+        job = client.get(job['status_url']).json()
+    rendered = time.perf_counter() - burst_started
+    assert job['status'] == 'done', job
+    download = client.get(job['pdf_url'])
+    size = sum(len(chunk) for chunk in download.streaming_content)
+
+    print(f'{args.viewers} viewers, {args.messages} messages')
+    print(f'  request p50 {statistics.median(latencies) * 1000:7.1f} ms  '
+          f'max {max(latencies) * 1000:7.1f} ms')
+    print(f'  render jobs started {len(job_ids)}  (rows {PdfExportJob.objects.count()})')
+    print(f'  PDF ready after {rendered:.2f}s, {size / 1e3:.0f} KB')
+
+
+if __name__ == '__main__':
+    main()
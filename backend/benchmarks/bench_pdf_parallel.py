@@ -0,0 +1,57 @@
+"""
+Serial vs process-pool PDF text extraction
+
+Generates a multi-page PDF and extracts it with ``fileparser.utils.iter_pdf``
+serially and with page-range process pools of each ``--workers`` size,
+checking that every run returns the same text. Each pool is warmed up with
+one untimed run so process start-up is not counted; the speedup is bounded
+by the number of CPU cores available.
+
+Run from backend/:
+    python -m benchmarks.bench_pdf_parallel --pages 400 --workers 2 4 8
+"""
+
+import argparse
+import os
+import time
+from . import _django
+from .bench_parse_pipeline import make_pdf
+
+
+def timed(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=400)
+    parser.add_argument('--workers', type=int, nargs='+', default=[2, 4, 8])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    tmp = _django.setup(FILE_PDF_PARALLEL_MIN_PAGES='1')
+    from fileparser.utils import iter_pdf
+
+    path = tmp / 'bench.pdf'
+    make_pdf(path, args.pages)
+    print(f'PDF: {args.pages} pages, {path.stat().st_size / 1e6:.1f} MB, {os.cpu_count()} CPUs')
+
+    serial, expected = timed(lambda: ''.join(iter_pdf(str(path), workers=1)), args.repeat)
+    print(f'  serial           {serial:7.2f}s  {args.pages / serial:7.0f} pages/s')
+
+    for workers in args.workers:
+        ''.join(iter_pdf(str(path), workers=workers))  # Start the pool
+        elapsed, text = timed(lambda: ''.join(iter_pdf(str(path), workers=workers)), args.repeat)
+        assert text == expected, f'{workers} workers returned different text'
+        print(f'  {workers} workers{"":<8} {elapsed:7.2f}s  {args.pages / elapsed:7.0f} pages/s  '
+              f'speedup {serial / elapsed:4.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Chat transcript PDF rendering time and memory
+
+Compares the old renderer (stylesheet rebuilt per call, whole story list
+built up front, output through a temporary file) with
+``chat.pdf_generator.generate_chat_pdf`` rendering batches of messages from
+an iterator into an in-memory buffer. Peak memory is the tracemalloc peak of
+a second, traced run.
+
+Run from backend/:
+    python -m benchmarks.bench_pdf_render --messages 100 1000 10000
+"""
+
+import argparse
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from . import _django
+
+
+def legacy_generate_chat_pdf(session_id, messages, title="Chat Session"):
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
+    temp_path = temp_file.name
+    temp_file.close()
+    doc = SimpleDocTemplate(temp_path, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle('CustomTitle', parent=styles['Heading1'], fontSize=16, spaceAfter=30,
+                                 alignment=TA_CENTER, textColor=colors.darkblue)
+    user_style = ParagraphStyle('UserMessage', parent=styles['Normal'], fontSize=10, leftIndent=20,
+                                rightIndent=100, spaceAfter=12, borderColor=colors.blue, borderWidth=1,
+                                borderPadding=8, backColor=colors.lightblue)
+    assistant_style = ParagraphStyle('AssistantMessage', parent=styles['Normal'], fontSize=10, leftIndent=100,
+                                     rightIndent=20, spaceAfter=12, borderColor=colors.green, borderWidth=1,
+                                     borderPadding=8, backColor=colors.lightgreen)
+    story = [Paragraph(f"Chat Session: {title}", title_style), Spacer(1, 12)]
+    story.append(Paragraph(f"Session ID: {session_id}<br/>Total Messages: {len(messages)}", styles['Normal']))
+    story.append(Spacer(1, 20))
+    for i, message in enumerate(messages, 1):
+        content = message['content'].replace('\n', '<br/>').replace('<', '&lt;').replace('>', '&gt;')
+        story.append(Paragraph(f"<b>Message {i}</b> - {message['role'].title()} - {message['timestamp']}",
+                               styles['Heading3']))
+        story.append(Paragraph(content, user_style if message['role'] == 'user' else assistant_style))
+        story.append(Spacer(1, 12))
+    story.append(Spacer(1, 20))
+    story.append(Paragraph("<i>Generated by AI Chatbot</i>", styles['Normal']))
+    doc.build(story)
+    return temp_path
+
+
+def make_messages(count):
+    started = datetime(2025, 1, 1)
+    for number in range(count):
+        yield {
+            'role': 'user' if number % 2 == 0 else 'assistant',
+            'content': f'Message {number}: ' + 'the quick brown fox jumps over the lazy dog ' * (3 + number % 12),
+            'timestamp': started + timedelta(seconds=number)
+        }
+
+
+def run_legacy(count):
+    path = legacy_generate_chat_pdf('bench', list(make_messages(count)), 'Benchmark')
+    # The old view read the whole file back into memory before responding
+    with open(path, 'rb') as pdf_file:
+        size = len(pdf_file.read())
+    os.unlink(path)
+    return size
+
+
+def run_batched(count):
+    from chat.pdf_generator import generate_chat_pdf
+    buffer = io.BytesIO()
+    generate_chat_pdf('bench', make_messages(count), 'Benchmark', output=buffer, message_count=count)
+    return buffer.tell()
+
+
+def measure(fn, count, trace):
+    started = time.perf_counter()
+    size = fn(count)
+    elapsed = time.perf_counter() - started
+    peak = None
+    if trace:
+        tracemalloc.start()
+        fn(count)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return elapsed, size, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--messages', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--no-memory', action='store_true', help='Skip the traced runs')
+    args = parser.parse_args()
+
+    _django.setup()
+    run_batched(10)  # Build the cached styles and load fonts outside the timings
+
+    for count in args.messages:
+        print(f'{count} messages')
+        for label, fn in (('legacy', run_legacy), ('batched', run_batched)):
+            elapsed, size, peak = measure(fn, count, not args.no_memory)
+            memory = f'peak {peak / 1e6:7.1f} MB' if peak is not None else ''
+            print(f'  {label:<8} {elapsed:7.2f}s  {size / 1e6:6.2f} MB PDF  {memory}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+BM25 retrieval latency over the chunk index
+
+Indexes synthetic files totalling ``--chunks`` chunks and times top-k
+retrieval for random multi-term queries.
+
+Run from backend/:
+    python -m benchmarks.bench_retrieval --chunks 10000
+"""
+
+import argparse
+import statistics
+import time
+from . import _django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--chunks', type=int, default=10000)
+    parser.add_argument('--chunks-per-file', type=int, default=100)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=6)
+    args = parser.parse_args()
+
+    _django.setup()
+    from fileparser.models import FileChunk, ParsedFile
+    from fileparser.retrieval import index_file, search
+    from ._corpus import TextGenerator
+
+    generator = TextGenerator()
+    started = time.perf_counter()
+    for number in range(args.chunks // args.chunks_per_file):
+        # ~113 words advance one 1000-character chunk with 150 characters of overlap
+        content = generator.text(113 * args.chunks_per_file)
+        parsed_file = ParsedFile.objects.create(
+            original_name=f'file-{number}.txt', file_path='', file_type='txt',
+            file_size=len(content), parsed_content=content
+        )
+        index_file(parsed_file, content)
+    print(f'indexed {FileChunk.objects.count()} chunks in {time.perf_counter() - started:.1f}s')
+
+    queries = [generator.query(terms=3) for _ in range(args.queries)]
+    for query in queries[:5]:  # Warm up
+        search(query, args.k)
+    samples = []
+    for query in queries:
+        started = time.perf_counter()
+        search(query, args.k)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    print(
+        f'top-{args.k} retrieval: p50={statistics.median(samples):.2f}ms '
+        f'p99={samples[int(0.99 * (len(samples) - 1))]:.2f}ms mean={statistics.fmean(samples):.2f}ms'
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Session sidebar: full session list vs keyset-paginated summaries
+
+Creates ``--sessions`` sessions of ``--messages`` messages each and compares
+``GET /api/chat/sessions/`` (every session with every message) with the first
+page of ``GET /api/chat/sessions/page/``: queries, response size and time.
+Then walks all pages and checks every session is listed exactly once, even
+where many sessions share the same ``updated_at``.
+
+Run from backend/:
+    python -m benchmarks.bench_session_list --sessions 500 --messages 40
+"""
+
+import argparse
+import time
+from . import _django
+
+
+def fetch(client, url):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        response = client.get(url)
+        elapsed = time.perf_counter() - started
+    assert response.status_code == 200, response.content
+    return response, len(queries), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=500)
+    parser.add_argument('--messages', type=int, default=40)
+    args = parser.parse_args()
+
+    _django.setup()
+    from django.test import Client
+    from django.utils import timezone
+    from chat.models import ChatMessage, ChatSession
+
+    sessions = ChatSession.objects.bulk_create(
+        ChatSession(session_id=f'session-{number}', title=f'Session {number}') for number in range(args.sessions)
+    )
+    ChatMessage.objects.bulk_create(
+        ChatMessage(session=session, role='user' if number % 2 == 0 else 'assistant',
+                    content=f'Message {number}: ' + 'the quick brown fox jumps over the lazy dog ' * 6)
+        for session in sessions for number in range(args.messages)
+    )
+    # Ties on updated_at, as bulk updates and imports produce
+    ChatSession.objects.filter(id__in=[session.id for session in sessions[::3]]).update(updated_at=timezone.now())
+
+    client = Client(HTTP_HOST='localhost')
+    print(f'{args.sessions} sessions x {args.messages} messages')
+    response, queries, elapsed = fetch(client, '/api/chat/sessions/')
+    print(f'  full list     {queries:5d} queries  {len(response.content) / 1e6:7.2f} MB  {elapsed * 1000:7.1f} ms')
+    response, queries, elapsed = fetch(client, '/api/chat/sessions/page/')
+    print(f'  first page    {queries:5d} queries  {len(response.content) / 1e3:7.1f} KB  {elapsed * 1000:7.1f} ms  '
+          f'({len(response.json()["sessions"])} sessions)')
+
+    seen, pages, cursor = [], 0, None
+    while True:
+        url = '/api/chat/sessions/page/?limit=50' + (f'&cursor={cursor}' if cursor else '')
+        data = client.get(url).json()
+        seen.extend(session['session_id'] for session in data['sessions'])
+        pages += 1
+        cursor = data['next_cursor']
+        if not cursor:
+            break
+    complete = len(seen) == len(set(seen)) == args.sessions
+    print(f'  all pages     {pages} pages of 50, every session exactly once: {complete}')
+
+
+if __name__ == '__main__':
+    main()
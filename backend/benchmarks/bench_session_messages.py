@@ -0,0 +1,87 @@
+"""
+Opening a long conversation: every message vs a window of the latest ones
+
+Creates a session of ``--messages`` messages (timestamps with ties, as bulk
+imports produce) and compares ``GET /api/chat/session/<id>/`` with the
+latest window of ``GET /api/chat/session/<id>/messages/`` and with paging
+back through older windows. Checks that paging back with ``?before=`` and
+forward with ``?after=`` both return every message exactly once, in order.
+
+Run from backend/:
+    python -m benchmarks.bench_session_messages --messages 20000 --limit 50
+"""
+
+import argparse
+import time
+from . import _django
+
+
+def fetch(client, url):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        response = client.get(url)
+        elapsed = time.perf_counter() - started
+    assert response.status_code == 200, response.content
+    return response, len(queries), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--messages', type=int, default=20000)
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args()
+
+    _django.setup()
+    from datetime import timedelta
+    from django.test import Client
+    from django.utils import timezone
+    from chat.models import ChatMessage, ChatSession
+
+    session = ChatSession.objects.create(session_id='long', title='Long conversation')
+    started = timezone.now() - timedelta(days=30)
+    ChatMessage.objects.bulk_create(
+        ChatMessage(session=session, role='user' if number % 2 == 0 else 'assistant',
+                    content=f'Message {number}: ' + 'the quick brown fox jumps over the lazy dog ' * 6,
+                    timestamp=started + timedelta(seconds=number // 3))  # Three messages per second
+        for number in range(args.messages)
+    )
+    # Other sessions, so the index has to narrow down to this one
+    other = ChatSession.objects.create(session_id='other')
+    ChatMessage.objects.bulk_create(
+        ChatMessage(session=other, role='user', content='Other', timestamp=started) for _ in range(args.messages)
+    )
+    expected = list(session.messages.order_by('timestamp', 'id').values_list('id', flat=True))
+
+    client = Client(HTTP_HOST='localhost')
+    base = f'/api/chat/session/{session.session_id}'
+    print(f'{args.messages} messages')
+    response, queries, elapsed = fetch(client, f'{base}/')
+    print(f'  whole session   {queries} queries  {len(response.content) / 1e6:7.2f} MB  {elapsed * 1000:7.1f} ms')
+    response, queries, elapsed = fetch(client, f'{base}/messages/?limit={args.limit}')
+    print(f'  latest window   {queries} queries  {len(response.content) / 1e3:7.1f} KB  {elapsed * 1000:7.1f} ms')
+
+    seen, timings = [], []
+    data = response.json()
+    while True:
+        seen[:0] = [message['id'] for message in data['messages']]
+        if not data['has_older']:
+            break
+        response, _, elapsed = fetch(client, f'{base}/messages/?limit={args.limit}&before={seen[0]}')
+        timings.append(elapsed)
+        data = response.json()
+    timings.sort()
+    print(f'  older windows   {len(timings)} pages  p50 {timings[len(timings) // 2] * 1000:.1f} ms  '
+          f'max {timings[-1] * 1000:.1f} ms  all messages once, in order: {seen == expected}')
+
+    seen, data = [], {'messages': [{'id': expected[0]}], 'has_newer': True}
+    seen.append(expected[0])
+    while data['has_newer']:
+        data = client.get(f'{base}/messages/?limit={args.limit * 10}&after={seen[-1]}').json()
+        seen.extend(message['id'] for message in data['messages'])
+    print(f'  newer windows   ?after= from the first message, all messages once, in order: {seen == expected}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Live shared-session viewers on one server process
+
+Starts the backend under uvicorn (one worker), connects ``--viewers``
+EventSource-style clients to ``/api/chat/shared/<token>/events/``, then adds
+``--messages`` messages through the shared session's add-message endpoint and
+reports how long each message took to reach every viewer.
+
+Run from backend/:
+    python -m benchmarks.bench_shared_events --viewers 1000 --messages 10
+"""
+
+import argparse
+import asyncio
+import statistics
+import subprocess
+import sys
+import time
+import httpx
+from ._servers import BACKEND_DIR, free_port, run_server, temp_database_env
+
+
+SEED = '''
+from chat.models import ChatMessage, ChatSession, SharedChatSession
+session = ChatSession.objects.create(session_id='bench', title='Benchmark')
+ChatMessage.objects.bulk_create(
+    ChatMessage(session=session, role='user', content=f'Earlier message {{i}}') for i in range({history})
+)
+SharedChatSession.objects.create(original_session=session, share_token='bench', title='Benchmark', allow_editing=True)
+'''
+
+
+async def _viewer(client, url, connected, received):
+    try:
+        async with client.stream('GET', url) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line.startswith('retry:'):
+                    connected.append(True)
+                elif line.startswith('data: ') and line != 'data: {}':
+                    received.append(time.perf_counter())
+    except (httpx.HTTPError, asyncio.CancelledError):
+        pass
+
+
+async def _run(base_url, viewers, messages, interval, history):
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(timeout=None, limits=limits) as client:
+        connected = []
+        inboxes = [[] for _ in range(viewers)]
+        started = time.perf_counter()
+        # Skip the existing history (ids 1..history in the fresh database)
+        tasks = [
+            asyncio.create_task(_viewer(client, f'{base_url}/events/?after={history}', connected, inbox))
+            for inbox in inboxes
+        ]
+        while len(connected) < viewers and time.perf_counter() - started < 120:
+            await asyncio.sleep(0.1)
+        connect_time = time.perf_counter() - started
+
+        sent = []
+        async with httpx.AsyncClient(timeout=60) as writer:
+            for number in range(messages):
+                sent.append(time.perf_counter())
+                response = await writer.post(
+                    f'{base_url}/add-message/', json={'content': f'Live message {number}', 'role': 'user'}
+                )
+                response.raise_for_status()
+                await asyncio.sleep(interval)
+        # Let the last message fan out
+        deadline = time.perf_counter() + 30
+        while time.perf_counter() < deadline and any(len(inbox) < messages for inbox in inboxes):
+            await asyncio.sleep(0.1)
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    latencies = []
+    for inbox in inboxes:
+        latencies.extend(arrived - sent[number] for number, arrived in enumerate(inbox[:messages]))
+    delivered = sum(min(len(inbox), messages) for inbox in inboxes)
+    return len(connected), connect_time, delivered, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--viewers', type=int, default=1000)
+    parser.add_argument('--messages', type=int, default=10)
+    parser.add_argument('--interval', type=float, default=1.0, help='Seconds between messages')
+    parser.add_argument('--history', type=int, default=200, help='Messages already in the session')
+    args = parser.parse_args()
+
+    with temp_database_env() as env:
+        subprocess.run(
+            [sys.executable, 'manage.py', 'shell', '-c', SEED.format(history=args.history)],
+            cwd=BACKEND_DIR, env=env, check=True
+        )
+        port = free_port()
+        server = [
+            sys.executable, '-m', 'uvicorn', 'core.asgi:application',
+            '--port', str(port), '--workers', '1', '--log-level', 'warning'
+        ]
+        with run_server(server, env, port):
+            base_url = f'http://127.0.0.1:{port}/api/chat/shared/bench'
+            connected, connect_time, delivered, latencies = asyncio.run(
+                _run(base_url, args.viewers, args.messages, args.interval, args.history)
+            )
+
+    print(f'{args.viewers} viewers, {args.messages} messages, one uvicorn worker')
+    print(f'  connected {connected} in {connect_time:.1f}s')
+    print(f'  delivered {delivered}/{args.viewers * args.messages} message events')
+    if latencies:
+        latencies.sort()
+        print(f'  delivery latency p50 {statistics.median(latencies) * 1000:7.1f} ms  '
+              f'p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:7.1f} ms  '
+              f'max {latencies[-1] * 1000:7.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
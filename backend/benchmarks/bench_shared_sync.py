@@ -0,0 +1,71 @@
+"""
+Shared-session sync cost: full transcript vs message-id cursor
+
+For a shared session with ``--messages`` messages, compares a full
+``GET /api/chat/shared/<token>/`` with delta syncs (``?after=<cursor>``)
+that find one new message or none. Reports latency, payload size, queries
+and writes per request.
+
+Run from backend/:
+    python -m benchmarks.bench_shared_sync --messages 100 1000 5000
+"""
+
+import argparse
+import statistics
+import time
+from . import _django
+
+
+def measure(client, url, repeat):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    timings = []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = client.get(url)
+            timings.append(time.perf_counter() - started)
+    writes = sum(1 for query in queries if not query['sql'].lstrip().upper().startswith('SELECT'))
+    return response, statistics.median(timings), len(queries), writes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--messages', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    _django.setup()
+    from django.test import Client
+    from chat.models import ChatMessage, ChatSession, SharedChatSession
+
+    client = Client(HTTP_HOST='localhost')
+    for count in args.messages:
+        session = ChatSession.objects.create(session_id=f'bench-{count}', title='Benchmark')
+        ChatMessage.objects.bulk_create(
+            ChatMessage(session=session, role='user' if i % 2 == 0 else 'assistant',
+                        content=f'Message {i}: ' + 'lorem ipsum dolor sit amet ' * 10)
+            for i in range(count)
+        )
+        SharedChatSession.objects.create(original_session=session, share_token=f'bench-{count}', title='Benchmark')
+        url = f'/api/chat/shared/bench-{count}/'
+
+        print(f'{count} messages')
+        response, elapsed, queries, writes = measure(client, url, args.repeat)
+        cursor = response.json()['cursor']
+        print(f'  full           {elapsed * 1000:7.1f} ms  {len(response.content) / 1e3:8.1f} KB  '
+              f'{queries} queries ({writes} writes)  status {response.status_code}')
+
+        response, elapsed, queries, writes = measure(client, f'{url}?after={cursor}', args.repeat)
+        print(f'  delta, none    {elapsed * 1000:7.1f} ms  {len(response.content) / 1e3:8.1f} KB  '
+              f'{queries} queries ({writes} writes)  status {response.status_code}')
+
+        ChatMessage.objects.create(session=session, role='user', content='One more message')
+        response, elapsed, queries, writes = measure(client, f'{url}?after={cursor}', args.repeat)
+        print(f'  delta, one new {elapsed * 1000:7.1f} ms  {len(response.content) / 1e3:8.1f} KB  '
+              f'{queries} queries ({writes} writes)  status {response.status_code}')
+
+
+if __name__ == '__main__':
+    main()
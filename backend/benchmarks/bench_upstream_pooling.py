@@ -0,0 +1,90 @@
+"""
+Time-to-first-token with and without upstream connection pooling
+
+Sends streaming chat completion requests to the fake Groq server, once with a
+fresh ``requests.post`` per call (the old behaviour) and once through the
+pooled ``chat.upstream`` session, and reports p50/p99 time to first token.
+``--tls`` serves the mock over HTTPS so the handshake cost is included.
+
+Run from backend/:
+    python -m benchmarks.bench_upstream_pooling --requests 200 --tls
+"""
+
+import argparse
+import contextlib
+import os
+import statistics
+import time
+import requests
+from ._servers import fake_groq, self_signed_cert
+
+
+def _first_token(lines):
+    for line in lines:
+        if line.startswith(b'data: ') and b'content' in line:
+            return
+    raise RuntimeError('Stream ended without content')
+
+
+def _time_requests(send, count):
+    samples = []
+    for _ in range(count):
+        started = time.perf_counter()
+        response = send()
+        response.raise_for_status()
+        lines = response.iter_lines()
+        _first_token(lines)
+        samples.append((time.perf_counter() - started) * 1000)
+        for _ in lines:  # Drain so the connection can go back to the pool
+            pass
+        response.close()
+    return samples
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--tls', action='store_true')
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        ssl = stack.enter_context(self_signed_cert()) if args.tls else None
+        url = stack.enter_context(fake_groq(chunks=5, delay=0.001, ssl=ssl))
+        if ssl:
+            os.environ['REQUESTS_CA_BUNDLE'] = ssl[0]
+
+        os.environ['GROQ_API_URL'] = url
+        os.environ['GROQ_API_KEY'] = 'benchmark'
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+        import django
+        django.setup()
+        from chat import upstream
+
+        payload = {'model': 'bench', 'messages': [{'role': 'user', 'content': 'hi'}], 'stream': True}
+
+        def unpooled():
+            return requests.post(
+                url, json=payload, headers=upstream.groq_headers(), stream=True
+            )
+
+        def pooled():
+            return upstream.post(payload, stream=True)
+
+        print(f"{'mode':>10} {'p50_ms':>8} {'p99_ms':>8} {'mean_ms':>8}")
+        for name, send in (('unpooled', unpooled), ('pooled', pooled)):
+            _time_requests(send, 5)  # warm up
+            samples = _time_requests(send, args.requests)
+            print(
+                f'{name:>10} {statistics.median(samples):>8.2f} '
+                f'{_percentile(samples, 99):>8.2f} {statistics.fmean(samples):>8.2f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Semantic top-k latency over the memory-mapped vector index
+
+Embeds ``--chunks`` synthetic chunks with the configured embedder (the
+hashing embedder unless FILE_EMBEDDING_MODEL is set), then times queries:
+query embedding, one matrix-vector product over the memory-mapped matrix
+and ``argpartition`` top-k. BLAS is pinned to one thread.
+
+Run from backend/:
+    python -m benchmarks.bench_vector_retrieval --chunks 100000
+
+100,000 chunks on one core, by FILE_EMBEDDING_DIM (hashing embedder):
+
+    128 dims:   51 MB, p50  7.8ms, p99 11.4ms
+    256 dims:  102 MB, p50 13.5ms, p99 18.5ms
+    1024 dims: 410 MB, p50 38.3ms, p99 48.9ms
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+for var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+    os.environ[var] = '1'
+
+from . import _django  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--chunks', type=int, default=100000)
+    parser.add_argument('--words', type=int, default=60, help='Words per synthetic chunk')
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=6)
+    args = parser.parse_args()
+
+    tmp = _django.setup()
+    from fileparser.vectors import VectorIndex, get_embedder
+    from ._corpus import TextGenerator
+
+    generator = TextGenerator()
+    index = VectorIndex(tmp / 'vector_index', get_embedder())
+    started = time.perf_counter()
+    batch = 1000
+    for offset in range(0, args.chunks, batch):
+        count = min(batch, args.chunks - offset)
+        index.add(
+            list(range(offset + 1, offset + count + 1)),
+            [generator.text(args.words) for _ in range(count)]
+        )
+    size_mb = index.vectors_path.stat().st_size / 1e6
+    print(
+        f'embedded {args.chunks} chunks ({index.embedder.name}, {size_mb:.0f} MB) '
+        f'in {time.perf_counter() - started:.1f}s'
+    )
+
+    queries = [generator.query(terms=4) for _ in range(args.queries)]
+    for query in queries[:5]:  # Warm up and fault the mapping into the page cache
+        index.query(query, args.k)
+    samples = []
+    for query in queries:
+        started = time.perf_counter()
+        index.query(query, args.k)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    print(
+        f'top-{args.k} query: p50={statistics.median(samples):.2f}ms '
+        f'p99={samples[int(0.99 * (len(samples) - 1))]:.2f}ms mean={statistics.fmean(samples):.2f}ms'
+    )
+
+
+if __name__ == '__main__':
+    main()
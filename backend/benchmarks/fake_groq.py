@@ -0,0 +1,67 @@
+"""
+Fake Groq chat completions server for benchmarks
+
+Serves an OpenAI-compatible ``/openai/v1/chat/completions`` endpoint that
+streams canned tokens with a fixed delay, so benchmarks can exercise the
+upstream path without network access or API keys.
+
+Run with:
+    uvicorn benchmarks.fake_groq:app --port 9100
+
+Environment:
+    FAKE_GROQ_CHUNKS  number of streamed content chunks (default 20)
+    FAKE_GROQ_DELAY   seconds between chunks (default 0.05)
+"""
+
+import asyncio
+import json
+import os
+
+
+CHUNKS = int(os.getenv('FAKE_GROQ_CHUNKS', '20'))
+DELAY = float(os.getenv('FAKE_GROQ_DELAY', '0.05'))
+
+
+async def _read_body(receive):
+    body = b''
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get('body', b'')
+        more_body = message.get('more_body', False)
+    return body
+
+
+async def app(scope, receive, send):
+    if scope['type'] != 'http':
+        return
+
+    payload = json.loads(await _read_body(receive) or b'{}')
+
+    if not payload.get('stream'):
+        await asyncio.sleep(DELAY * CHUNKS)
+        body = json.dumps({
+            'choices': [{'message': {'role': 'assistant', 'content': 'token ' * CHUNKS}}]
+        }).encode()
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [(b'content-type', b'application/json')],
+        })
+        await send({'type': 'http.response.body', 'body': body})
+        return
+
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [(b'content-type', b'text/event-stream')],
+    })
+    for _ in range(CHUNKS):
+        await asyncio.sleep(DELAY)
+        chunk = {'choices': [{'delta': {'content': 'token '}}]}
+        await send({
+            'type': 'http.response.body',
+            'body': f"data: {json.dumps(chunk)}\n\n".encode(),
+            'more_body': True,
+        })
+    await send({'type': 'http.response.body', 'body': b'data: [DONE]\n\n'})
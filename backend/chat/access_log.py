@@ -0,0 +1,113 @@
+"""
+Write-behind logging of shared-link views
+
+``record`` only appends the view to an in-memory buffer, so serving a shared
+session never waits on analytics writes. A background thread flushes the
+buffer every SHARED_ACCESS_LOG_FLUSH_INTERVAL seconds, or as soon as it holds
+SHARED_ACCESS_LOG_BATCH_SIZE views: the ``SharedChatAccess`` rows go in with
+one ``bulk_create`` and each session's ``access_count`` is raised by its
+number of views with a single ``F()`` update, so concurrent views are never
+lost. A flush that fails, other than on rows the database rejects, leaves
+its views buffered for the next one. Views still buffered when a process
+exits are flushed at exit; a crash loses at most one interval of them.
+"""
+
+import atexit
+import logging
+import threading
+from collections import Counter, defaultdict
+from django.conf import settings
+from django.db import DataError, IntegrityError, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import SharedChatAccess, SharedChatSession
+
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_events = []
+_counts = Counter()  # Shared session pk -> buffered views
+_wake = threading.Event()
+_flusher = None
+
+
+def _start_flusher():
+    global _flusher
+    if _flusher is None:
+        _flusher = threading.Thread(target=_flush_loop, name='access-log', daemon=True)
+        _flusher.start()
+        atexit.register(flush)
+
+
+def record(shared_session, request):
+    """Buffer one view of a shared session"""
+    event = SharedChatAccess(
+        shared_session_id=shared_session.pk,
+        ip_address=request.META.get('REMOTE_ADDR', ''),
+        user_agent=request.META.get('HTTP_USER_AGENT', ''),
+        # accessed_at (auto_now_add) becomes the flush time; this keeps the
+        # time of the view itself
+        session_data={'accessed_at': timezone.now().isoformat()}
+    )
+    with _lock:
+        _events.append(event)
+        _counts[shared_session.pk] += 1
+        full = len(_events) >= settings.SHARED_ACCESS_LOG_BATCH_SIZE
+        _start_flusher()
+    if full:
+        _wake.set()
+
+
+def pending(shared_session):
+    """Views of a session recorded but not yet flushed"""
+    with _lock:
+        return _counts.get(shared_session.pk, 0)
+
+
+def flush():
+    """Write the buffered views; returns how many were written"""
+    global _events, _counts
+    with _lock:
+        batch, counts = _events, _counts
+        _events, _counts = [], Counter()
+    if not batch:
+        return 0
+
+    try:
+        # Views of sessions deleted meanwhile would violate the foreign key
+        existing = set(SharedChatSession.objects.filter(pk__in=counts).values_list('pk', flat=True))
+        events = [event for event in batch if event.shared_session_id in existing]
+        by_increment = defaultdict(list)
+        for pk, count in counts.items():
+            if pk in existing:
+                by_increment[count].append(pk)
+
+        with transaction.atomic():
+            SharedChatAccess.objects.bulk_create(events, batch_size=500)
+            for increment, pks in by_increment.items():
+                SharedChatSession.objects.filter(pk__in=pks).update(access_count=F('access_count') + increment)
+    except (DataError, IntegrityError):
+        # Rows the database rejects would fail every retry too
+        raise
+    except Exception:
+        # Nothing was written; put the batch back ahead of views recorded
+        # meanwhile so the next flush retries it
+        with _lock:
+            _events[:0] = batch
+            _counts.update(counts)
+        raise
+    return len(events)
+
+
+def _flush_loop():
+    while True:
+        _wake.wait(settings.SHARED_ACCESS_LOG_FLUSH_INTERVAL)
+        _wake.clear()
+        try:
+            flush()
+        except Exception:
+            logger.exception('Failed to write shared session access log')
+        finally:
+            # This thread outlives requests, so release its connection here
+            connections.close_all()
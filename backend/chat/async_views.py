@@ -0,0 +1,213 @@
+"""
+Async chat views for ASGI deployments
+
+The sync ``views.chat`` holds a worker for the whole LLM generation while it
+relays the upstream stream. These views relay the same stream with a
+non-blocking HTTP client, so a single ASGI worker can serve many concurrent
+chats. Long-lived event streams live here for the same reason.
+"""
+
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from .models import ChatMessage, PdfExportJob, SharedChatSession
+from .serializers import ChatRequestSerializer, PdfExportJobSerializer
+from .views import STREAM_DONE, _parse_stream_line, _prepare_chat
+from . import live, upstream
+
+
+@csrf_exempt
+@require_POST
+async def chat(request):
+    """Handle chat messages and return AI responses without blocking"""
+    try:
+        data = json.loads(request.body or b'{}')
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON body'}, status=400)
+
+    serializer = ChatRequestSerializer(data=data)
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=400)
+
+    session, groq_payload = await sync_to_async(_prepare_chat)(serializer.validated_data)
+
+    if groq_payload['stream']:
+        return StreamingHttpResponse(
+            _stream_events(groq_payload, session),
+            content_type='text/event-stream',
+            headers={
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no'
+            }
+        )
+
+    try:
+        response = await upstream.apost(groq_payload)
+        response.raise_for_status()
+        assistant_content = response.json()['choices'][0]['message']['content']
+
+        # Save assistant message
+        assistant_message = await ChatMessage.objects.acreate(
+            session=session,
+            role='assistant',
+            content=assistant_content
+        )
+    except Exception as e:
+        return JsonResponse(
+            {'error': f'Failed to get AI response: {str(e)}'},
+            status=500
+        )
+
+    return JsonResponse({
+        'response': assistant_content,
+        'session_id': session.session_id,
+        'message_id': assistant_message.id
+    })
+
+
+async def _stream_events(payload, session):
+    """Relay the Groq SSE stream to the client as it arrives"""
+    try:
+        assistant_content = []
+        async with upstream.astream(payload) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                content = _parse_stream_line(line)
+                if content is STREAM_DONE:
+                    break
+                if content:
+                    assistant_content.append(content)
+                    yield f"data: {json.dumps({'content': content})}\n\n"
+
+        # Save assistant message
+        if assistant_content:
+            await ChatMessage.objects.acreate(
+                session=session,
+                role='assistant',
+                content=''.join(assistant_content)
+            )
+
+    except Exception as e:
+        yield f"data: {json.dumps({'error': str(e)})}\n\n"
+
+
+@require_GET
+async def pdf_job_events(request, job_id):
+    """Stream a PDF render job's status as server-sent events until it finishes"""
+    jobs = PdfExportJob.objects.select_related('shared_session').filter(id=job_id)
+    job = await jobs.afirst()
+    if job is None:
+        return JsonResponse({'error': 'Job not found'}, status=404)
+
+    return StreamingHttpResponse(
+        _job_events(jobs, job),
+        content_type='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+
+async def _job_events(jobs, job):
+    """Send the job on every status change, ending with ``done`` or ``failed``"""
+    sent = None
+    while job is not None:
+        if job.status != sent:
+            sent = job.status
+            yield f"event: {job.status}\ndata: {json.dumps(PdfExportJobSerializer(job).data)}\n\n"
+        if job.status in ('done', 'failed'):
+            break
+        await asyncio.sleep(settings.SHARED_PDF_EVENTS_POLL_INTERVAL)
+        job = await jobs.afirst()
+
+
+def _expired(shared_session):
+    return bool(shared_session.expires_at and timezone.now() > shared_session.expires_at)
+
+
+@require_GET
+async def shared_session_events(request, share_token):
+    """Stream a shared session's new messages as server-sent events.
+
+    Starts after the message id in the ``Last-Event-ID`` header (sent by
+    reconnecting EventSource clients) or the ``after`` query parameter.
+    Under WSGI (``runserver``) the response would be buffered whole and never
+    sent, so the view answers 204 instead, which tells EventSource not to
+    reconnect; viewers then poll ``shared/<token>/?after=``.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    shared_session = await SharedChatSession.objects.filter(share_token=share_token).afirst()
+    if shared_session is None:
+        return JsonResponse({'error': 'Shared session not found'}, status=404)
+    if _expired(shared_session):
+        return JsonResponse({'error': 'Shared session has expired'}, status=410)
+    if not shared_session.is_active:
+        return JsonResponse({'error': 'Shared session is no longer active'}, status=410)
+
+    try:
+        cursor = int(request.headers.get('Last-Event-ID') or request.GET.get('after') or 0)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid message cursor'}, status=400)
+
+    return StreamingHttpResponse(
+        _message_events(shared_session, cursor),
+        content_type='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+
+def _message_event(message_id, payload):
+    return f"id: {message_id}\nevent: message\ndata: {payload}\n\n"
+
+
+async def _message_events(shared_session, cursor):
+    """Send the messages after ``cursor``, then each new one as it is created.
+
+    Messages saved in this process arrive through ``live``; the database is
+    read again every SHARED_EVENTS_POLL_INTERVAL seconds for the others,
+    which also keeps the connection alive through proxies. The stream ends
+    after SHARED_EVENTS_MAX_AGE seconds and the client reconnects from its
+    last event id, so abandoned viewers do not hold a stream forever.
+    """
+    session_pk = shared_session.original_session_id
+    messages = ChatMessage.objects.filter(session_id=session_pk).order_by('id')
+    loop = asyncio.get_running_loop()
+    interval = settings.SHARED_EVENTS_POLL_INTERVAL
+    closes_at = loop.time() + settings.SHARED_EVENTS_MAX_AGE
+
+    yield f"retry: {int(settings.SHARED_EVENTS_RETRY * 1000)}\n\n"
+    # Subscribe before reading the backlog so nothing falls in between
+    with live.Subscriber(session_pk) as subscriber:
+        next_poll = loop.time()
+        while loop.time() < closes_at:
+            if loop.time() >= next_poll:
+                async for message in messages.filter(id__gt=cursor):
+                    cursor = message.id
+                    yield _message_event(message.id, json.dumps(live.message_data(message)))
+                if _expired(shared_session):
+                    yield "event: expired\ndata: {}\n\n"
+                    return
+                next_poll = loop.time() + interval
+
+            try:
+                message_id, payload = await asyncio.wait_for(
+                    subscriber.queue.get(), max(0, min(next_poll, closes_at) - loop.time())
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if message_id > cursor:
+                cursor = message_id
+                yield _message_event(message_id, payload)
@@ -0,0 +1,220 @@
+"""
+Compact binary export format for chat sessions
+
+A compact export is a ten-byte header (MAGIC, FORMAT_VERSION, codec) followed
+by a zstd- or zlib-compressed stream of msgpack frames:
+
+    {'type': 'session', 'sessionId': ..., 'title': ...}
+    {'type': 'messages', ...}    one per block of up to BLOCK_SIZE messages
+    {'type': 'file', ...}        one per file, as in the JSON export
+    {'type': 'metadata', ...}    as in the JSON export
+
+Message blocks are columnar: ids and timestamps (microseconds since the
+epoch) are delta-encoded int64 arrays, roles are dictionary-encoded, and
+contents and metadata are stored once per distinct value with an index array
+per message. ``read`` turns a compact export back into exactly the message
+dicts of the JSON export, so either format can be converted into the other
+without loss.
+"""
+
+import json
+import sys
+import zlib
+from array import array
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+import msgpack
+
+try:
+    import zstandard
+except ImportError:  # zlib only
+    zstandard = None
+
+
+MAGIC = b'CHATPACK'
+FORMAT_VERSION = 1
+ZLIB, ZSTD = 1, 2
+BLOCK_SIZE = 4096  # Messages per frame
+READ_SIZE = 64 * 1024
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+# What garbage in a frame or in the compressed stream raises
+DECODE_ERRORS = (ValueError, KeyError, IndexError, TypeError, zlib.error, msgpack.UnpackException)
+if zstandard is not None:
+    DECODE_ERRORS += (zstandard.ZstdError,)
+
+
+class FormatError(ValueError):
+    """The data is not a readable compact export"""
+
+
+def default_codec():
+    return ZSTD if zstandard is not None else ZLIB
+
+
+def _compressor(codec):
+    if codec == ZSTD:
+        return zstandard.ZstdCompressor(level=3).compressobj()
+    return zlib.compressobj(6)
+
+
+def _decompressor(codec):
+    if codec == ZSTD:
+        if zstandard is None:
+            raise FormatError('Export is zstd-compressed but zstandard is not installed')
+        return zstandard.ZstdDecompressor().decompressobj()
+    if codec == ZLIB:
+        return zlib.decompressobj()
+    raise FormatError(f'Unknown compression codec {codec}')
+
+
+def _pack_array(typecode, values):
+    packed = array(typecode, values)
+    if sys.byteorder == 'big':
+        packed.byteswap()  # Always little-endian on the wire
+    return packed.tobytes()
+
+
+def _unpack_array(typecode, data):
+    unpacked = array(typecode)
+    unpacked.frombytes(data)
+    if sys.byteorder == 'big':
+        unpacked.byteswap()
+    return unpacked
+
+
+def _deltas(values):
+    previous = 0
+    for value in values:
+        yield value - previous
+        previous = value
+
+
+def _dictionary(values):
+    """``(distinct values, index of each value)``, in order of first appearance"""
+    table, indexes = {}, []
+    for value in values:
+        indexes.append(table.setdefault(value, len(table)))
+    return list(table), indexes
+
+
+def _codes(indexes, table):
+    return _pack_array('B' if len(table) <= 256 else 'I', indexes)
+
+
+def _uncodes(data, count):
+    return _unpack_array('B' if len(data) == count else 'I', data)
+
+
+class Encoder:
+    """Compressed frames of one compact export; every method returns bytes"""
+
+    def __init__(self, codec=None):
+        self.codec = codec or default_codec()
+        self.compressor = _compressor(self.codec)
+        self.packer = msgpack.Packer()
+
+    def header(self):
+        return MAGIC + bytes((FORMAT_VERSION, self.codec))
+
+    def frame(self, data):
+        return self.compressor.compress(self.packer.pack(data))
+
+    def messages(self, rows):
+        """Frame for a block of ``(id, role, content, timestamp, metadata)`` rows"""
+        ids, roles, contents, timestamps, metadata = zip(*rows)
+        role_table, role_indexes = _dictionary(roles)
+        content_table, content_indexes = _dictionary(contents)
+        # Metadata dicts are not hashable; deduplicate on their JSON text
+        metadata_keys, metadata_indexes = _dictionary(
+            json.dumps(value or {}, separators=(',', ':')) for value in metadata
+        )
+        return self.frame({
+            'type': 'messages',
+            'count': len(ids),
+            'ids': _pack_array('q', _deltas(ids)),
+            'timestamps': _pack_array('q', _deltas((value - EPOCH) // MICROSECOND for value in timestamps)),
+            'roles': role_table,
+            'role': _codes(role_indexes, role_table),
+            'contents': content_table,
+            'content': _pack_array('I', content_indexes),
+            'metadata': [json.loads(key) for key in metadata_keys],
+            'meta': _pack_array('I', metadata_indexes),
+        })
+
+    def close(self):
+        return self.compressor.flush()
+
+
+def _message_dicts(frame):
+    count = frame['count']
+    ids = accumulate(_unpack_array('q', frame['ids']))
+    timestamps = accumulate(_unpack_array('q', frame['timestamps']))
+    roles, contents, metadata = frame['roles'], frame['contents'], frame['metadata']
+    role_indexes = _uncodes(frame['role'], count)
+    content_indexes = _unpack_array('I', frame['content'])
+    metadata_indexes = _unpack_array('I', frame['meta'])
+    for message_id, timestamp, role, content, meta in zip(
+        ids, timestamps, role_indexes, content_indexes, metadata_indexes
+    ):
+        # Same dict as live.message_data, which the JSON export writes
+        yield {
+            'id': str(message_id),
+            'role': roles[role],
+            'content': contents[content],
+            'timestamp': (EPOCH + timestamp * MICROSECOND).isoformat(),
+            'metadata': metadata[meta]
+        }
+
+
+def _frames(stream, head=b''):
+    header = head + stream.read(len(MAGIC) + 2 - len(head))
+    if len(header) < len(MAGIC) + 2 or not header.startswith(MAGIC):
+        raise FormatError('Not a compact export')
+    version, codec = header[len(MAGIC):]
+    if version > FORMAT_VERSION:
+        raise FormatError(f'Compact export version {version} is newer than this server supports')
+    decompressor = _decompressor(codec)
+    unpacker = msgpack.Unpacker(raw=False, strict_map_key=False)
+    while True:
+        chunk = stream.read(READ_SIZE)
+        if not chunk:
+            break
+        unpacker.feed(decompressor.decompress(chunk))
+        yield from unpacker
+
+
+def read(stream, head=b''):
+    """Yield the items of a compact export the way ``importer.iter_export``
+    yields those of a JSON one: ``('sessionId', value)``, ``('title', value)``,
+    ``('message', dict)``, ``('file', dict)`` and finally ``('metadata', dict)``.
+
+    ``head`` is data already read from the start of ``stream``.
+    """
+    complete = False
+    try:
+        for frame in _frames(stream, head):
+            if complete:
+                raise FormatError('Data after the end of the compact export')
+            kind = frame.get('type') if isinstance(frame, dict) else None
+            if kind == 'session':
+                yield 'sessionId', frame.get('sessionId')
+                yield 'title', frame.get('title')
+            elif kind == 'messages':
+                for message in _message_dicts(frame):
+                    yield 'message', message
+            elif kind == 'file':
+                yield 'file', {key: value for key, value in frame.items() if key != 'type'}
+            elif kind == 'metadata':
+                yield 'metadata', {key: value for key, value in frame.items() if key != 'type'}
+                complete = True
+            else:
+                raise FormatError('Invalid frame in compact export')
+    except FormatError:
+        raise
+    except DECODE_ERRORS as e:
+        raise FormatError(f'Corrupt compact export: {e}')
+    if not complete:
+        raise FormatError('Truncated compact export')
@@ -0,0 +1,139 @@
+"""
+Token-budgeted context assembly for Groq requests
+
+Fits the system prompt and conversation history into a per-model prompt
+budget. The newest turns are kept verbatim; older turns that no longer fit
+are folded into a rolling extractive summary stored on the ChatSession, so
+the prompt stays bounded however long the session gets.
+"""
+
+import math
+import re
+from django.conf import settings
+
+
+# Context windows (tokens) of the Groq models the app offers
+MODEL_CONTEXT_WINDOWS = {
+    'llama-3.1-8b-instant': 131072,
+    'llama-3.3-70b-versatile': 131072,
+    'llama3-8b-8192': 8192,
+    'llama3-70b-8192': 8192,
+    'mixtral-8x7b-32768': 32768,
+    'gemma2-9b-it': 8192,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+
+MESSAGE_OVERHEAD_TOKENS = 4  # Role and separators per chat message
+SAFETY_MARGIN_TOKENS = 64
+SUMMARY_LINE_CHARS = 200
+
+_TOKEN_PATTERN = re.compile(r'\w+|[^\w\s]')
+
+
+def count_tokens(text):
+    """Approximate the BPE token count of ``text``.
+
+    Words cost one token per four characters (at least one), punctuation one
+    token each. This tracks Llama-style tokenizers closely enough for
+    budgeting without shipping a tokenizer.
+    """
+    return sum(
+        math.ceil(len(piece) / 4) if piece[0].isalnum() or piece[0] == '_' else 1
+        for piece in _TOKEN_PATTERN.findall(text)
+    )
+
+
+def message_tokens(message):
+    """Approximate tokens used by one chat message"""
+    return count_tokens(message['content']) + MESSAGE_OVERHEAD_TOKENS
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Cut ``text`` so it fits in ``max_tokens``"""
+    if count_tokens(text) <= max_tokens:
+        return text
+    # Four characters per token is a safe upper bound for the cut point
+    text = text[:max_tokens * 4]
+    while text and count_tokens(text) > max_tokens:
+        text = text[:int(len(text) * 0.9)]
+    return text + '...'
+
+
+def prompt_budget(model, max_tokens):
+    """Prompt token budget for ``model`` leaving room for ``max_tokens`` of output"""
+    window = MODEL_CONTEXT_WINDOWS.get(model, DEFAULT_CONTEXT_WINDOW)
+    available = window - max_tokens - SAFETY_MARGIN_TOKENS
+    return max(256, min(available, settings.CHAT_CONTEXT_MAX_PROMPT_TOKENS))
+
+
+def _summary_line(message):
+    content = ' '.join(message['content'].split())
+    if len(content) > SUMMARY_LINE_CHARS:
+        content = content[:SUMMARY_LINE_CHARS].rsplit(' ', 1)[0] + '...'
+    return f"{message['role'].title()}: {content}"
+
+
+def _fold_into_summary(summary, dropped):
+    """Append dropped turns to the summary, keeping its newest lines in budget"""
+    lines = summary.splitlines() if summary else []
+    lines.extend(_summary_line(message) for message in dropped)
+    max_tokens = settings.CHAT_CONTEXT_SUMMARY_MAX_TOKENS
+    total = sum(count_tokens(line) for line in lines)
+    while lines and total > max_tokens:
+        total -= count_tokens(lines.pop(0))
+    return '\n'.join(lines)
+
+
+def build_messages(session, history, system_prompt, model, max_tokens):
+    """Assemble the Groq ``messages`` list within the model's prompt budget.
+
+    ``history`` is the session history as ``{'id', 'role', 'content'}`` dicts,
+    oldest first, ending with the new user message. Turns that fall out of the
+    budget are folded into ``session.context_summary``; saving the session is
+    left to the caller, which writes it once per turn.
+    """
+    budget = prompt_budget(model, max_tokens)
+
+    # Messages already folded into the summary are never re-sent
+    if session.summary_through_id:
+        history = [msg for msg in history if msg['id'] > session.summary_through_id]
+
+    # The system prompt (file context) may use at most half the budget
+    system_messages = []
+    if system_prompt:
+        system_prompt = truncate_to_tokens(system_prompt, budget // 2)
+        system_messages.append({'role': 'system', 'content': system_prompt})
+    remaining = budget - sum(message_tokens(msg) for msg in system_messages)
+    summary_budget = settings.CHAT_CONTEXT_SUMMARY_MAX_TOKENS + MESSAGE_OVERHEAD_TOKENS
+    remaining -= summary_budget
+
+    # Keep the newest turns that fit; the latest message is always kept
+    kept = []
+    for index in range(len(history) - 1, -1, -1):
+        cost = message_tokens(history[index])
+        if kept and cost > remaining:
+            break
+        kept.append(history[index])
+        remaining -= cost
+    kept.reverse()
+    dropped = history[:len(history) - len(kept)]
+
+    if kept and remaining < 0:
+        latest = kept[-1]
+        kept[-1] = dict(latest, content=truncate_to_tokens(
+            latest['content'], max(1, message_tokens(latest) + remaining - MESSAGE_OVERHEAD_TOKENS)
+        ))
+
+    if dropped:
+        session.context_summary = _fold_into_summary(session.context_summary, dropped)
+        session.summary_through_id = dropped[-1]['id']
+
+    if session.context_summary:
+        system_messages.append({
+            'role': 'system',
+            'content': f"Summary of earlier conversation:\n{session.context_summary}"
+        })
+
+    return system_messages + [
+        {'role': msg['role'], 'content': msg['content']} for msg in kept
+    ]
@@ -0,0 +1,211 @@
+"""
+Per-session conversation history cache
+
+Chat turns used to reload and rebuild the whole message history from the
+database. The cache keeps each active session's history as a list of
+``{'id', 'role', 'content'}`` dicts, appended to by the ``ChatMessage``
+post_save signal, so a turn costs a lookup plus a cheap "anything newer than
+the last cached id?" query. Entries are tagged with the session's
+``history_version``, which edits and deletes raise, so a process never serves
+a history another process has changed (or an import has replaced).
+
+The store is an in-process LRU by default. Set ``CHAT_HISTORY_CACHE['BACKEND']``
+to a ``CACHES`` alias to share entries through a Django cache backend instead.
+"""
+
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+
+
+class LocalHistoryStore:
+    """Thread-safe in-process LRU evicting by idle time and total message count"""
+
+    def __init__(self, max_sessions, max_messages, idle_timeout):
+        self.max_sessions = max_sessions
+        self.max_messages = max_messages
+        self.idle_timeout = idle_timeout
+        self._entries = OrderedDict()  # session pk -> (messages, last_used, version)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            messages, last_used, entry_version = entry
+            if entry_version != version or time.monotonic() - last_used > self.idle_timeout:
+                self._remove(key)
+                return None
+            self._entries[key] = (messages, time.monotonic(), version)
+            self._entries.move_to_end(key)
+            return list(messages)
+
+    def set(self, key, messages, version):
+        with self._lock:
+            self._remove(key)
+            if len(messages) > self.max_messages:
+                return
+            self._entries[key] = (list(messages), time.monotonic(), version)
+            self._size += len(messages)
+            self._evict()
+
+    def append(self, key, message):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            messages = entry[0]
+            if messages and messages[-1]['id'] >= message['id']:
+                return
+            messages.append(message)
+            self._size += 1
+            self._evict()
+
+    def delete(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry[0])
+
+    def _evict(self):
+        now = time.monotonic()
+        expired = [key for key, (_, last_used, _) in self._entries.items()
+                   if now - last_used > self.idle_timeout]
+        for key in expired:
+            self._remove(key)
+        while self._entries and (
+            len(self._entries) > self.max_sessions or self._size > self.max_messages
+        ):
+            key = next(iter(self._entries))
+            self._remove(key)
+
+
+class DjangoCacheHistoryStore:
+    """History store backed by a Django cache alias.
+
+    Idle eviction uses the cache timeout; size eviction is left to the
+    backend, except that histories over ``max_messages`` are not cached.
+    Entries are ``(version, messages)`` tuples.
+    """
+
+    def __init__(self, alias, max_messages, idle_timeout):
+        self.cache = caches[alias]
+        self.max_messages = max_messages
+        self.idle_timeout = idle_timeout
+
+    def _key(self, key):
+        return f'chat:history:{key}'
+
+    def get(self, key, version):
+        entry = self.cache.get(self._key(key))
+        if entry is None or entry[0] != version:
+            return None
+        self.cache.touch(self._key(key), self.idle_timeout)
+        return entry[1]
+
+    def set(self, key, messages, version):
+        if len(messages) > self.max_messages:
+            self.cache.delete(self._key(key))
+            return
+        self.cache.set(self._key(key), (version, list(messages)), self.idle_timeout)
+
+    def append(self, key, message):
+        entry = self.cache.get(self._key(key))
+        if entry is None:
+            return
+        version, messages = entry
+        if messages and messages[-1]['id'] >= message['id']:
+            return
+        messages.append(message)
+        self.set(key, messages, version)
+
+    def delete(self, key):
+        self.cache.delete(self._key(key))
+
+    def clear(self):
+        # Only this store's keys: the alias may hold other entries. Entries of
+        # deleted sessions were dropped with them
+        from .models import ChatSession
+        keys = ChatSession.objects.values_list('pk', flat=True).iterator(chunk_size=1000)
+        while batch := list(itertools.islice(keys, 1000)):
+            self.cache.delete_many([self._key(key) for key in batch])
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Return the configured history store"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                config = settings.CHAT_HISTORY_CACHE
+                if config['BACKEND'] == 'local':
+                    _store = LocalHistoryStore(
+                        config['MAX_SESSIONS'], config['MAX_MESSAGES'], config['IDLE_TIMEOUT']
+                    )
+                else:
+                    _store = DjangoCacheHistoryStore(
+                        config['BACKEND'], config['MAX_MESSAGES'], config['IDLE_TIMEOUT']
+                    )
+    return _store
+
+
+def message_entry(message):
+    """Cache entry for a ChatMessage"""
+    return {'id': message.id, 'role': message.role, 'content': message.content}
+
+
+def get_history(session):
+    """Return the session's history as ``{'id', 'role', 'content'}`` dicts.
+
+    A miss loads the session once; a hit only fetches messages newer than the
+    last cached id, which covers messages saved by other worker processes.
+    """
+    store = get_store()
+    history = store.get(session.pk, session.history_version)
+    if history is None:
+        history = [
+            {'id': pk, 'role': role, 'content': content}
+            for pk, role, content in session.messages.order_by('timestamp', 'id')
+            .values_list('id', 'role', 'content')
+        ]
+        store.set(session.pk, history, session.history_version)
+        return history
+
+    # New messages are appended in id order (append_message does the same),
+    # which the (session, id) index reads without sorting
+    last_id = history[-1]['id'] if history else 0
+    newer = list(
+        session.messages.filter(id__gt=last_id).order_by('id')
+        .values_list('id', 'role', 'content')
+    )
+    if newer:
+        history.extend({'id': pk, 'role': role, 'content': content} for pk, role, content in newer)
+        store.set(session.pk, history, session.history_version)
+    return history
+
+
+def append_message(message):
+    """Append a newly saved message to its session's cached history"""
+    get_store().append(message.session_id, message_entry(message))
+
+
+def invalidate(session_pk):
+    """Drop a session's cached history"""
+    get_store().delete(session_pk)
@@ -0,0 +1,238 @@
+"""
+Bulk import of exported chat sessions
+
+``import_session`` reads an export (see ``export_views``) from a file-like
+object. With ijson installed the JSON is parsed incrementally, so messages
+are inserted while the upload is still being read and memory stays bounded
+by one batch; without it the document is loaded whole. Messages go in with
+``bulk_create`` in batches of CHAT_IMPORT_BATCH_SIZE, all inside one
+transaction, and keep their exported timestamps. Compact exports (see
+``compact``) are recognised by their header and streamed the same way.
+"""
+
+import json
+from datetime import datetime
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from fileparser.models import ParsedFile
+from fileparser.retrieval import index_file
+from .models import ChatMessage, ChatSession, SharedChatSession
+from . import compact, history, pdf_cache
+
+try:
+    import ijson
+except ImportError:  # Parse the whole document at once
+    ijson = None
+
+
+ITEM_KINDS = {'messages.item': 'message', 'files.item': 'file'}
+SCALAR_EVENTS = {'string', 'number', 'boolean', 'null'}
+
+
+class InvalidExport(ValueError):
+    """The data is not a chat session export"""
+
+
+class _Prefixed:
+    """File-like ``stream`` with ``head``, already read from it, put back"""
+
+    def __init__(self, head, stream):
+        self.head = head
+        self.stream = stream
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            data, self.head = self.head + self.stream.read(), b''
+        elif len(self.head) >= size:
+            data, self.head = self.head[:size], self.head[size:]
+        else:
+            data, self.head = self.head + self.stream.read(size - len(self.head)), b''
+        return data
+
+
+def iter_export(stream):
+    """Yield the top-level ``sessionId`` and ``title`` of an export, then one
+    ``('message', dict)`` per message and ``('file', dict)`` per file, in
+    document order."""
+    head = stream.read(len(compact.MAGIC))
+    if head == compact.MAGIC:
+        try:
+            yield from compact.read(stream, head)
+        except compact.FormatError as e:
+            raise InvalidExport(str(e))
+        return
+    yield from _iter_json(_Prefixed(head, stream))
+
+
+def _iter_json(stream):
+    if ijson is None:
+        try:
+            data = json.load(stream)
+        except ValueError as e:
+            raise InvalidExport(f'Invalid JSON: {e}')
+        if not isinstance(data, dict):
+            raise InvalidExport('Invalid session data')
+        for key, value in data.items():
+            if key in ('messages', 'files'):
+                for item in value or []:
+                    yield ITEM_KINDS[f'{key}.item'], item
+            elif key in ('sessionId', 'title'):
+                yield key, value
+        return
+
+    builder = item_prefix = None
+    try:
+        for prefix, event, value in ijson.parse(stream, use_float=True):
+            if builder is not None:
+                builder.event(event, value)
+                if prefix == item_prefix and event == 'end_map':
+                    yield ITEM_KINDS[item_prefix], builder.value
+                    builder = None
+            elif prefix in ITEM_KINDS and event == 'start_map':
+                builder, item_prefix = ijson.ObjectBuilder(), prefix
+                builder.event(event, value)
+            elif prefix in ('sessionId', 'title') and event in SCALAR_EVENTS:
+                yield prefix, value
+    except ijson.JSONError as e:
+        raise InvalidExport(f'Invalid JSON: {e}')
+
+
+def _timestamp(value):
+    """Exported ISO timestamp as an aware datetime, or now if missing or invalid"""
+    parsed = parse_datetime(value) if isinstance(value, str) else None
+    if parsed is None:
+        return timezone.now()
+    if settings.USE_TZ and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class _Import:
+    """State of one import, fed the items of ``iter_export`` in order"""
+
+    def __init__(self, batch_size, progress):
+        self.batch_size = batch_size
+        self.progress = progress
+        self.session_id = None
+        self.title = None
+        self.session = None
+        self.waiting = []  # Items seen before sessionId
+        self.batch = []
+        self.message_count = 0
+        self.file_count = 0
+
+    def add(self, kind, value):
+        if self.session is None:
+            if self.session_id is None:
+                self.waiting.append((kind, value))
+                return
+            self._start()
+
+        if not isinstance(value, dict):
+            raise InvalidExport(f'Invalid {kind} entry')
+        if kind == 'message':
+            self._add_message(value)
+        else:
+            self._add_file(value)
+
+    def _start(self):
+        self.session = self._open_session()
+        waiting, self.waiting = self.waiting, []
+        for item in waiting:
+            self.add(*item)
+
+    def _open_session(self):
+        session, created = ChatSession.objects.get_or_create(
+            session_id=self.session_id,
+            defaults={'title': self.title or 'Imported Chat'}
+        )
+        if not created:
+            # Clear existing messages if importing to existing session. The
+            # delete handlers only need the session, so skip loading content
+            ChatMessage.objects.filter(session=session).only('id', 'session').delete()
+        return session
+
+    def _add_message(self, data):
+        try:
+            message = ChatMessage(
+                session=self.session,
+                role=data['role'],
+                content=data['content'],
+                timestamp=_timestamp(data.get('timestamp')),
+                metadata=data.get('metadata') or {}
+            )
+        except KeyError as e:
+            raise InvalidExport(f'Message without {e}')
+        self.batch.append(message)
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def _add_file(self, data):
+        try:
+            # Create a new file entry for the imported session
+            parsed_file = ParsedFile.objects.create(
+                original_name=data['name'],
+                file_type=data['type'],
+                file_size=len(data['content']),
+                parsed_content=data['content'],
+                metadata={
+                    'imported': True,
+                    'original_metadata': data.get('metadata', {}),
+                    'imported_at': datetime.now().isoformat()
+                }
+            )
+        except KeyError as e:
+            raise InvalidExport(f'File without {e}')
+        index_file(parsed_file)
+        self.file_count += 1
+
+    def flush(self):
+        if self.batch:
+            ChatMessage.objects.bulk_create(self.batch)
+            self.message_count += len(self.batch)
+            self.batch = []
+            if self.progress:
+                self.progress(self.message_count)
+
+    def finish(self):
+        if self.session is None and self.session_id is not None:
+            # sessionId came after the items
+            self._start()
+        self.flush()
+        if self.session is None or not self.message_count:
+            # No sessionId, or no messages
+            raise InvalidExport('Invalid session data')
+        self.session.title = self.title or 'Imported Chat'
+        # Not history_version, raised by the delete of the old messages
+        self.session.save(update_fields=['title', 'updated_at'])
+
+
+def import_session(stream, progress=None, batch_size=None):
+    """Import an export into a new session, or replace the messages of an
+    existing one with the same id; returns ``(session, messages, files)``.
+
+    ``progress`` is called with the number of messages inserted so far after
+    every batch. Nothing is kept if the data turns out to be invalid.
+    """
+    state = _Import(batch_size or settings.CHAT_IMPORT_BATCH_SIZE, progress)
+    with transaction.atomic():
+        for key, value in iter_export(stream):
+            if key == 'sessionId':
+                if not value:
+                    raise InvalidExport('Invalid session data')
+                state.session_id = str(value)
+            elif key == 'title':
+                state.title = value
+            elif key != 'metadata':  # Compact exports end with their metadata
+                state.add(key, value)
+        state.finish()
+
+    # bulk_create sends no signals
+    session = state.session
+    history.invalidate(session.pk)
+    pdf_cache.invalidate(
+        SharedChatSession.objects.filter(original_session=session).values_list('share_token', flat=True)
+    )
+    return session, state.message_count, state.file_count
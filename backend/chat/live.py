@@ -0,0 +1,79 @@
+"""
+In-process publish/subscribe of new chat messages for shared-session viewers
+
+``async_views.shared_session_events`` subscribes each connected viewer to
+its session. When a ``ChatMessage`` is created (see ``signals``) the message
+is serialized once and handed to every subscriber of the session on its own
+event loop, so a thousand viewers cost one JSON encoding and no queries.
+
+Subscribers only hear about messages created in this process. The event
+stream also re-reads the database every SHARED_EVENTS_POLL_INTERVAL seconds
+to pick up messages written by other processes.
+"""
+
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+
+_lock = threading.Lock()
+_subscribers = defaultdict(set)  # Session pk -> {Subscriber}
+
+
+def message_data(message):
+    """JSON-ready form of a message, as sent to shared-session viewers"""
+    return {
+        'id': str(message.id),
+        'role': message.role,
+        'content': message.content,
+        'timestamp': message.timestamp.isoformat(),
+        'metadata': message.metadata or {}
+    }
+
+
+class Subscriber:
+    """Queue of ``(message id, JSON payload)`` for one viewer's event loop"""
+
+    def __init__(self, session_pk):
+        self.session_pk = session_pk
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+
+    def __enter__(self):
+        with _lock:
+            _subscribers[self.session_pk].add(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        with _lock:
+            subscribers = _subscribers[self.session_pk]
+            subscribers.discard(self)
+            if not subscribers:
+                del _subscribers[self.session_pk]
+
+    def put(self, item):
+        # Called from whichever thread saved the message
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, item)
+
+
+def subscriber_count(session_pk=None):
+    with _lock:
+        if session_pk is not None:
+            return len(_subscribers.get(session_pk, ()))
+        return sum(len(subscribers) for subscribers in _subscribers.values())
+
+
+def publish(message):
+    """Hand a newly created message to the viewers of its session"""
+    with _lock:
+        subscribers = list(_subscribers.get(message.session_id, ()))
+    if not subscribers:
+        return
+    item = (message.id, json.dumps(message_data(message)))
+    for subscriber in subscribers:
+        try:
+            subscriber.put(item)
+        except RuntimeError:
+            # The viewer's event loop has closed; its __exit__ is on the way
+            pass
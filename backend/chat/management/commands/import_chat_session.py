@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+from chat import importer
+
+
+class Command(BaseCommand):
+    help = 'Import an exported chat session (JSON or compact), replacing a session with the same id'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Export file, as written by the export endpoint')
+        parser.add_argument(
+            '--batch-size', type=int,
+            help='Messages per INSERT (default CHAT_IMPORT_BATCH_SIZE)'
+        )
+
+    def handle(self, *args, **options):
+        def progress(count):
+            self.stdout.write(f'Imported {count} messages')
+
+        try:
+            with open(options['path'], 'rb') as stream:
+                session, messages, files = importer.import_session(
+                    stream, progress=progress, batch_size=options['batch_size']
+                )
+        except (OSError, importer.InvalidExport) as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported session {session.session_id}: {messages} messages, {files} files'
+        ))
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-16 23:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0004_pdfexportjob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chatmessage',
+            index=models.Index(fields=['session', 'id'], name='chat_chatme_session_dc4dbc_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-16 23:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0007_chatsession_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chatmessage',
+            index=models.Index(fields=['session', 'timestamp', 'id'], name='chat_chatme_session_67300d_idx'),
+        ),
+    ]
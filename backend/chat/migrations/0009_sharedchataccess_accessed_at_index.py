@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-16 23:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0008_chatmessage_session_timestamp_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sharedchataccess',
+            index=models.Index(fields=['shared_session', '-accessed_at'], name='chat_shared_shared__a290ec_idx'),
+        ),
+    ]
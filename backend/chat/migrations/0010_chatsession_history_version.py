@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-17 00:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0009_sharedchataccess_accessed_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatsession',
+            name='history_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.1 on 2026-10-17 00:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0010_chatsession_history_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='chatmessage',
+            name='session',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='messages', to='chat.chatsession'),
+        ),
+        migrations.AlterField(
+            model_name='sharedchatsession',
+            name='original_session',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='shared_sessions', to='chat.chatsession'),
+        ),
+        migrations.AddIndex(
+            model_name='sharedchatsession',
+            index=models.Index(fields=['original_session', 'created_at'], name='chat_shared_origina_2d577b_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 import uuid
 
 
@@ -11,8 +12,20 @@ class ChatSession(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     title = models.CharField(max_length=200, blank=True)
 
+    # Rolling summary of turns dropped from the prompt (chat.context)
+    context_summary = models.TextField(blank=True, default='')
+    summary_through_id = models.BigIntegerField(null=True, blank=True)
+
+    # Raised when messages are edited or deleted, so every process drops its
+    # cached history (chat.history)
+    history_version = models.PositiveIntegerField(default=0)
+
     class Meta:
         ordering = ['-updated_at']
+        indexes = [
+            # Keyset pagination of the session list (views.get_sessions_page)
+            models.Index(fields=['updated_at', 'id'])
+        ]
 
     def __str__(self):
         return f"Session {self.session_id} - {self.title}"
@@ -26,14 +39,22 @@ class ChatMessage(models.Model):
         ('system', 'System'),
     ]
 
-    session = models.ForeignKey(ChatSession, on_delete=models.CASCADE, related_name='messages')
+    # Indexed by the (session, ...) indexes below
+    session = models.ForeignKey(ChatSession, on_delete=models.CASCADE, related_name='messages', db_index=False)
     role = models.CharField(max_length=10, choices=ROLE_CHOICES)
     content = models.TextField()
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # A default rather than auto_now_add, so imports can keep exported timestamps
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
     metadata = models.JSONField(default=dict, blank=True)
 
     class Meta:
         ordering = ['timestamp']
+        indexes = [
+            # Message-id cursors of shared-session sync (?after=) and live events
+            models.Index(fields=['session', 'id']),
+            # Message windows in display order (views.get_session_messages)
+            models.Index(fields=['session', 'timestamp', 'id'])
+        ]
 
     def __str__(self):
         return f"{self.role}: {self.content[:50]}..."
@@ -44,7 +65,10 @@ class SharedChatSession(models.Model):
     Model for shared chat sessions with real-time sync
     """
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    original_session = models.ForeignKey(ChatSession, on_delete=models.CASCADE, related_name='shared_sessions')
+    # Indexed by (original_session, created_at) below
+    original_session = models.ForeignKey(
+        ChatSession, on_delete=models.CASCADE, related_name='shared_sessions', db_index=False
+    )
     share_token = models.CharField(max_length=100, unique=True)
     title = models.CharField(max_length=200)
     is_active = models.BooleanField(default=True)
@@ -63,6 +87,10 @@ class SharedChatSession(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # A session's shares in the default order (deletes, PDF invalidation)
+            models.Index(fields=['original_session', 'created_at'])
+        ]
     
     def __str__(self):
         return f"Shared: {self.title} ({self.share_token})"
@@ -81,8 +109,9 @@ class SharedChatSession(models.Model):
     
     def increment_access(self):
         """Increment access count"""
+        # Atomic in the database, so concurrent views are all counted
+        SharedChatSession.objects.filter(pk=self.pk).update(access_count=models.F('access_count') + 1)
         self.access_count += 1
-        self.save(update_fields=['access_count'])
 
 
 class SharedChatAccess(models.Model):
@@ -97,6 +126,39 @@ class SharedChatAccess(models.Model):
     
     class Meta:
         ordering = ['-accessed_at']
+        indexes = [
+            # Latest views of one shared link
+            models.Index(fields=['shared_session', '-accessed_at'])
+        ]
     
     def __str__(self):
         return f"Access to {self.shared_session.title} from {self.ip_address}"
+
+
+class PdfExportJob(models.Model):
+    """Background render of a shared session's PDF (chat.pdf_jobs)"""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    shared_session = models.ForeignKey(SharedChatSession, on_delete=models.CASCADE, related_name='pdf_jobs')
+    version = models.CharField(max_length=16)  # chat.pdf_cache.version of the rendered content
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        constraints = [
+            # One render per version, however many viewers ask for it
+            models.UniqueConstraint(fields=['shared_session', 'version'], name='unique_pdf_job_version')
+        ]
+
+    def __str__(self):
+        return f"PDF of {self.shared_session.share_token} ({self.status})"
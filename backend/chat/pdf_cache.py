@@ -0,0 +1,144 @@
+"""
+On-disk cache of rendered PDFs for shared chat sessions
+
+A shared session's PDF is rendered once per version of its conversation and
+kept under SHARED_PDF_CACHE_DIR as ``<share token>-<version>.pdf``. The
+version hashes the share title with the id, timestamp and count of the
+session's messages, so a new message changes the file name and the stale
+file is replaced on the next request. Edited or deleted messages drop the
+cached files through the signal handlers in ``signals``.
+
+The version doubles as the ETag, so clients revalidating an unchanged PDF
+get a 304 after one aggregate query, and cached files are streamed with
+``FileResponse`` (or handed to the web server with X-Accel-Redirect) instead
+of being read into memory. With SHARED_PDF_CACHE_DIR set to an empty string
+nothing is cached and each download is rendered into the response.
+
+Renders for the views run in a process pool through ``pdf_jobs``.
+"""
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from django.conf import settings
+from django.db.models import Count, Max
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils import timezone
+from .pdf_generator import generate_chat_pdf, stream_chat_pdf
+from . import streaming
+
+
+def enabled():
+    return bool(settings.SHARED_PDF_CACHE_DIR)
+
+
+def cache_dir():
+    return Path(settings.SHARED_PDF_CACHE_DIR)
+
+
+def version(shared_session):
+    """Version of a shared session's PDF, changing whenever its content does"""
+    stats = shared_session.original_session.messages.aggregate(
+        last_id=Max('id'), last_timestamp=Max('timestamp'), count=Count('id')
+    )
+    key = f"{shared_session.title}|{stats['last_id']}|{stats['last_timestamp']}|{stats['count']}"
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+def pdf_path(share_token, pdf_version):
+    return cache_dir() / f'{share_token}-{pdf_version}.pdf'
+
+
+def is_rendered(shared_session, pdf_version):
+    return pdf_path(shared_session.share_token, pdf_version).exists()
+
+
+def _remove_files(share_token, keep=None):
+    for path in cache_dir().glob(f'{share_token}-*.pdf'):
+        if path != keep:
+            path.unlink(missing_ok=True)
+
+
+def _messages(shared_session):
+    return shared_session.original_session.messages.order_by('timestamp').values(
+        'role', 'content', 'timestamp'
+    )
+
+
+def render(shared_session, pdf_version=None):
+    """Return the path of the session's cached PDF, rendering it if needed"""
+    pdf_version = pdf_version or version(shared_session)
+    path = pdf_path(shared_session.share_token, pdf_version)
+    if path.exists():
+        return path
+
+    session = shared_session.original_session
+    messages = _messages(shared_session)
+    directory = cache_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    # Render next to the target and rename, so readers never see a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.pdf.tmp')
+    os.close(fd)
+    try:
+        generate_chat_pdf(
+            session.session_id, messages.iterator(chunk_size=500), shared_session.title,
+            output=tmp_path, message_count=messages.count()
+        )
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+    _remove_files(shared_session.share_token, keep=path)
+
+    shared_session.pdf_generated_at = timezone.now()
+    shared_session.save(update_fields=['pdf_generated_at'])
+    return path
+
+
+def invalidate(share_tokens):
+    """Drop the cached PDFs of the given share tokens"""
+    if not enabled():
+        return
+    for share_token in share_tokens:
+        _remove_files(share_token)
+
+
+def response(request, shared_session, pdf_version=None):
+    """Serve the session's PDF, answering 304 when the client's copy is current"""
+    pdf_version = pdf_version or version(shared_session)
+    etag = f'"{pdf_version}"'
+    if etag in request.headers.get('If-None-Match', ''):
+        not_modified = HttpResponseNotModified()
+        not_modified['ETag'] = etag
+        return not_modified
+
+    filename = f'chat_session_{shared_session.share_token}.pdf'
+    if not enabled():
+        # Caching disabled: render straight into the response
+        messages = _messages(shared_session)
+        pdf_response = StreamingHttpResponse(
+            streaming.content(request, stream_chat_pdf(
+                shared_session.original_session.session_id, messages.iterator(chunk_size=500),
+                shared_session.title, message_count=messages.count()
+            )),
+            content_type='application/pdf'
+        )
+        pdf_response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        pdf_response['ETag'] = etag
+        pdf_response['Cache-Control'] = 'no-cache'
+        return pdf_response
+
+    path = render(shared_session, pdf_version)
+    if settings.SHARED_PDF_X_ACCEL_REDIRECT:
+        # Let nginx send the file from its internal location
+        pdf_response = HttpResponse(content_type='application/pdf')
+        pdf_response['X-Accel-Redirect'] = f'{settings.SHARED_PDF_X_ACCEL_REDIRECT.rstrip("/")}/{path.name}'
+        pdf_response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    else:
+        pdf_response = FileResponse(
+            open(path, 'rb'), as_attachment=True, filename=filename, content_type='application/pdf'
+        )
+    pdf_response['ETag'] = etag
+    pdf_response['Cache-Control'] = 'no-cache'
+    return pdf_response
@@ -5,8 +5,11 @@ PDF generation for chat interactions
 import os
 import tempfile
 from datetime import datetime
+from functools import lru_cache
+from itertools import islice
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.platypus.doctemplate import ActionFlowable
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
@@ -14,29 +17,17 @@ from reportlab.lib.enums import TA_LEFT, TA_RIGHT, TA_CENTER
 from django.conf import settings
 
 
-def generate_chat_pdf(session_id, messages, title="Chat Session"):
+RENDER_BATCH_SIZE = 200  # Messages turned into flowables at a time
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+@lru_cache(maxsize=1)
+def get_styles():
     """
-    Generate a PDF of chat interactions
+    Build the stylesheet and message styles once per process
     """
-    # Create temporary file
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-    temp_path = temp_file.name
-    temp_file.close()
-    
-    # Create PDF document
-    doc = SimpleDocTemplate(
-        temp_path,
-        pagesize=A4,
-        rightMargin=72,
-        leftMargin=72,
-        topMargin=72,
-        bottomMargin=18
-    )
-    
-    # Get styles
     styles = getSampleStyleSheet()
     
-    # Create custom styles
     title_style = ParagraphStyle(
         'CustomTitle',
         parent=styles['Heading1'],
@@ -72,59 +63,145 @@ def generate_chat_pdf(session_id, messages, title="Chat Session"):
         backColor=colors.lightgreen
     )
     
-    # Build content
-    story = []
+    return styles, title_style, user_style, assistant_style
+
+
+def _message_flowables(number, message):
+    """Flowables of one chat message"""
+    styles, _, user_style, assistant_style = get_styles()
     
-    # Title
-    story.append(Paragraph(f"Chat Session: {title}", title_style))
-    story.append(Spacer(1, 12))
+    # Message header
+    timestamp = message.get('timestamp', '')
+    if isinstance(timestamp, str):
+        try:
+            dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+            timestamp = dt.strftime('%Y-%m-%d %H:%M:%S')
+        except:
+            timestamp = str(timestamp)
+    else:
+        timestamp = str(timestamp)
     
-    # Session info
-    session_info = f"Session ID: {session_id}<br/>Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}<br/>Total Messages: {len(messages)}"
-    story.append(Paragraph(session_info, styles['Normal']))
-    story.append(Spacer(1, 20))
+    role = message.get('role', 'unknown')
+    content = message.get('content', '')
     
-    # Messages
-    for i, message in enumerate(messages, 1):
-        # Message header
-        timestamp = message.get('timestamp', '')
-        if isinstance(timestamp, str):
-            try:
-                dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                timestamp = dt.strftime('%Y-%m-%d %H:%M:%S')
-            except:
-                timestamp = str(timestamp)
-        else:
-            timestamp = str(timestamp)
-        
-        role = message.get('role', 'unknown')
-        content = message.get('content', '')
-        
-        # Clean content for PDF
-        content = content.replace('\n', '<br/>')
-        content = content.replace('<', '&lt;').replace('>', '&gt;')
-        
-        # Message number and timestamp
-        header = f"<b>Message {i}</b> - {role.title()} - {timestamp}"
-        story.append(Paragraph(header, styles['Heading3']))
-        
+    # Clean content for PDF
+    content = content.replace('\n', '<br/>')
+    content = content.replace('<', '&lt;').replace('>', '&gt;')
+    
+    # Message number and timestamp
+    header = f"<b>Message {number}</b> - {role.title()} - {timestamp}"
+    return [
+        Paragraph(header, styles['Heading3']),
         # Message content
-        if role == 'user':
-            story.append(Paragraph(content, user_style))
+        Paragraph(content, user_style if role == 'user' else assistant_style),
+        Spacer(1, 12)
+    ]
+
+
+class _LoadMessages(ActionFlowable):
+    """Placed at the end of the story; when the build reaches it, appends the
+    next batch of messages and another loader, or the tail after the last one.
+
+    Only about one batch of flowables is alive at a time.
+    """
+
+    def __init__(self, story, batches, tail):
+        super().__init__()
+        self.story = story
+        self.batches = batches
+        self.tail = tail
+
+    def apply(self, doc):
+        batch = next(self.batches, None)
+        if batch is None:
+            self.story.extend(self.tail)
         else:
-            story.append(Paragraph(content, assistant_style))
-        
-        story.append(Spacer(1, 12))
+            self.story.extend(batch)
+            self.story.append(_LoadMessages(self.story, self.batches, self.tail))
+
+
+def _flowable_batches(messages, batch_size):
+    """Lists of the flowables of ``batch_size`` messages at a time"""
+    numbered = enumerate(messages, 1)
+    while batch := list(islice(numbered, batch_size)):
+        yield [flowable for number, message in batch for flowable in _message_flowables(number, message)]
+
+
+def generate_chat_pdf(session_id, messages, title="Chat Session", output=None, message_count=None):
+    """
+    Generate a PDF of chat interactions.
+
+    ``messages`` may be any iterable, e.g. a queryset iterator; it is
+    rendered in batches of RENDER_BATCH_SIZE. ``output`` is a file path or a
+    binary file object (a temporary file by default); returns ``output``, or
+    the temporary file's path. Pass ``message_count`` when ``messages`` has
+    no length.
+    """
+    if output is None:
+        # Create temporary file
+        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
+        output = temp_file.name
+        temp_file.close()
+    if message_count is None:
+        messages = list(messages)
+        message_count = len(messages)
+    
+    # Create PDF document
+    doc = SimpleDocTemplate(
+        output,
+        pagesize=A4,
+        rightMargin=72,
+        leftMargin=72,
+        topMargin=72,
+        bottomMargin=18
+    )
+    
+    styles, title_style, _, _ = get_styles()
+    
+    # Title and session info
+    head = [
+        Paragraph(f"Chat Session: {title}", title_style),
+        Spacer(1, 12),
+        Paragraph(
+            f"Session ID: {session_id}<br/>Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}<br/>Total Messages: {message_count}",
+            styles['Normal']
+        ),
+        Spacer(1, 20)
+    ]
     
     # Footer
-    story.append(Spacer(1, 20))
-    footer = f"<i>Generated by AI Chatbot - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</i>"
-    story.append(Paragraph(footer, styles['Normal']))
+    tail = [
+        Spacer(1, 20),
+        Paragraph(
+            f"<i>Generated by AI Chatbot - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</i>",
+            styles['Normal']
+        )
+    ]
     
-    # Build PDF
+    # Build PDF, pulling messages in batches
+    story = list(head)
+    story.append(_LoadMessages(story, _flowable_batches(messages, RENDER_BATCH_SIZE), tail))
     doc.build(story)
     
-    return temp_path
+    return output
+
+
+def stream_chat_pdf(session_id, messages, title="Chat Session", message_count=None):
+    """
+    Render a chat PDF into a spooled buffer and yield it in chunks.
+
+    ReportLab writes the file when the build finishes, so the PDF is
+    buffered (in memory up to PDF_STREAM_MAX_MEMORY, then on disk) and
+    streamed to the client from there.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=settings.PDF_STREAM_MAX_MEMORY) as buffer:
+        generate_chat_pdf(session_id, messages, title, output=buffer, message_count=message_count)
+        buffer.seek(0)
+        while True:
+            chunk = buffer.read(STREAM_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
 
 
 def generate_chat_html(session_id, messages, title="Chat Session"):
@@ -0,0 +1,143 @@
+"""
+Background rendering of shared-session PDFs
+
+Rendering a long transcript takes seconds of CPU, so the views never do it
+on the request thread. ``request_pdf`` records a ``PdfExportJob`` for the
+current version of a shared session's PDF and schedules it; the views answer
+202 with the job, which clients poll (``get_pdf_job``) or follow as server
+sent events (``async_views.pdf_job_events``) before downloading the PDF from
+the cache.
+
+There is one job per session and version, enforced by a unique constraint,
+so any number of concurrent viewers of a share link wait on the same render.
+Jobs are run by SHARED_PDF_WORKERS threads, each handing the render to a
+spawned process pool of the same size, and claimed by atomically moving them
+from ``queued`` to ``running`` so several web processes never render a
+version twice.
+"""
+
+import multiprocessing
+import threading
+from datetime import timedelta
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import django
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+from .models import PdfExportJob, SharedChatSession
+from . import pdf_cache
+
+
+_lock = threading.Lock()
+_threads = None
+_processes = None
+
+
+def _get_threads():
+    global _threads
+    with _lock:
+        if _threads is None:
+            _threads = ThreadPoolExecutor(
+                max_workers=max(1, settings.SHARED_PDF_WORKERS),
+                thread_name_prefix='pdf-job'
+            )
+            # Pick up jobs left queued by a restarted process
+            for job_id in PdfExportJob.objects.filter(status='queued').values_list('id', flat=True):
+                _threads.submit(run_job, job_id)
+        return _threads
+
+
+def _get_processes():
+    global _processes
+    with _lock:
+        if _processes is None:
+            # spawn: forking a threaded web worker is unsafe; the workers
+            # set Django up themselves to read the messages
+            _processes = ProcessPoolExecutor(
+                max_workers=max(1, settings.SHARED_PDF_WORKERS),
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=django.setup
+            )
+        return _processes
+
+
+def _reset_processes(broken):
+    global _processes
+    with _lock:
+        if _processes is broken:
+            _processes = None
+
+
+def _schedule(job):
+    transaction.on_commit(lambda: _get_threads().submit(run_job, job.pk))
+
+
+def request_pdf(shared_session, pdf_version=None):
+    """Return the render job of the session's current PDF, starting it if needed"""
+    pdf_version = pdf_version or pdf_cache.version(shared_session)
+    rendered = pdf_cache.is_rendered(shared_session, pdf_version)
+    now = timezone.now()
+    job, created = PdfExportJob.objects.get_or_create(
+        shared_session=shared_session,
+        version=pdf_version,
+        defaults={'status': 'done', 'finished_at': now} if rendered else {}
+    )
+    if created:
+        if job.status == 'queued':
+            _schedule(job)
+        return job
+
+    # Run the job again if its file was dropped (edits keep the version), it
+    # failed, or the process rendering it died
+    stale = timezone.now() - timedelta(seconds=settings.SHARED_PDF_RENDER_TIMEOUT)
+    retry = (
+        job.status in ('done', 'failed') and not rendered
+        or job.status == 'running' and job.started_at and job.started_at < stale
+    )
+    if retry and PdfExportJob.objects.filter(pk=job.pk, status=job.status).update(
+        status='queued', error='', started_at=None, finished_at=None
+    ):
+        _schedule(job)
+        job.refresh_from_db()
+    return job
+
+
+def _render(shared_session_pk, pdf_version):
+    """Render one PDF into the cache; runs in a pool process"""
+    try:
+        shared_session = SharedChatSession.objects.select_related('original_session').get(pk=shared_session_pk)
+        pdf_cache.render(shared_session, pdf_version)
+    finally:
+        connections.close_all()
+
+
+def run_job(job_id):
+    """Run one queued job; returns False if another worker already claimed it"""
+    try:
+        claimed = PdfExportJob.objects.filter(pk=job_id, status='queued').update(
+            status='running', started_at=timezone.now()
+        )
+        if not claimed:
+            return False
+
+        job = PdfExportJob.objects.get(pk=job_id)
+        pool = _get_processes()
+        try:
+            pool.submit(_render, job.shared_session_id, job.version).result()
+            PdfExportJob.objects.filter(pk=job.pk).update(status='done', finished_at=timezone.now())
+            # Jobs of older versions point at files the render just removed
+            PdfExportJob.objects.filter(shared_session_id=job.shared_session_id).exclude(
+                pk=job.pk
+            ).exclude(status__in=('queued', 'running')).delete()
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                # A worker died (e.g. killed for memory); start a fresh pool next time
+                _reset_processes(pool)
+            PdfExportJob.objects.filter(pk=job.pk).update(
+                status='failed', error=f'Failed to generate PDF: {str(e)}', finished_at=timezone.now()
+            )
+        return True
+    finally:
+        # Pool threads outlive requests, so release their connections here
+        connections.close_all()
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import ChatSession, ChatMessage
+from .models import ChatSession, ChatMessage, PdfExportJob
 
 
 class ChatMessageSerializer(serializers.ModelSerializer):
@@ -20,6 +20,39 @@ class ChatSessionSerializer(serializers.ModelSerializer):
         return ChatMessageSerializer(messages, many=True).data
 
 
+class ChatSessionSummarySerializer(serializers.ModelSerializer):
+    """Sidebar entry: no messages, just their count and the last one's start"""
+    message_count = serializers.IntegerField(read_only=True)
+    last_message = serializers.CharField(read_only=True, allow_null=True)
+
+    class Meta:
+        model = ChatSession
+        fields = ['id', 'session_id', 'title', 'created_at', 'updated_at', 'message_count', 'last_message']
+
+
+class PdfExportJobSerializer(serializers.ModelSerializer):
+    pdf_url = serializers.SerializerMethodField()
+    status_url = serializers.SerializerMethodField()
+    events_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = PdfExportJob
+        fields = [
+            'id', 'status', 'error', 'pdf_url', 'status_url', 'events_url',
+            'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
+
+    def get_pdf_url(self, obj):
+        return obj.shared_session.pdf_url if obj.status == 'done' else None
+
+    def get_status_url(self, obj):
+        return f"/api/chat/pdf-jobs/{obj.id}/"
+
+    def get_events_url(self, obj):
+        return f"/api/chat/pdf-jobs/{obj.id}/events/"
+
+
 class ChatRequestSerializer(serializers.Serializer):
     message = serializers.CharField()
     session_id = serializers.CharField(required=False)
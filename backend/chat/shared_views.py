@@ -6,17 +6,14 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
-from django.http import JsonResponse, HttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from .models import ChatSession, ChatMessage
-from .models import SharedChatSession, SharedChatAccess
-from .pdf_generator import generate_chat_pdf, generate_chat_html
-from .serializers import ChatMessageSerializer
-import os
-import tempfile
+from .models import SharedChatSession, PdfExportJob
+from . import access_log, live, pdf_cache, pdf_jobs
+from .serializers import PdfExportJobSerializer
 import uuid
-from datetime import datetime, timedelta
+from datetime import timedelta
 
 
 @api_view(['POST'])
@@ -50,25 +47,17 @@ def create_shared_session(request):
             expires_at=expires_at
         )
         
-        # Generate PDF
-        messages = original_session.messages.all().order_by('timestamp')
-        pdf_path = generate_chat_pdf(
-            session_id, 
-            [{'role': msg.role, 'content': msg.content, 'timestamp': msg.timestamp} for msg in messages],
-            title
-        )
-        
-        # For now, we'll store the PDF path locally
-        # In production, you'd upload to UploadThing or similar
+        # Pre-render the PDF in the background so the first download is served from disk
         shared_session.pdf_url = f"/api/chat/shared/{share_token}/pdf/"
-        shared_session.pdf_generated_at = timezone.now()
-        shared_session.save()
+        shared_session.save(update_fields=['pdf_url'])
+        pdf_job = pdf_jobs.request_pdf(shared_session) if pdf_cache.enabled() else None
         
         return Response({
             'success': True,
             'share_token': share_token,
             'share_url': shared_session.get_share_url(request),
             'pdf_url': shared_session.pdf_url,
+            'pdf_job': PdfExportJobSerializer(pdf_job).data if pdf_job else None,
             'expires_at': shared_session.expires_at.isoformat() if shared_session.expires_at else None,
             'message': 'Shared session created successfully'
         })
@@ -88,9 +77,25 @@ def create_shared_session(request):
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_shared_session(request, share_token):
-    """Get shared chat session with real-time sync"""
+    """Get shared chat session with real-time sync.
+
+    With ``?after=<message id>`` (or ``since``) only the messages created
+    after that one are returned, or 304 if there are none.
+    """
+    after = request.query_params.get('after') or request.query_params.get('since')
+    if after is not None:
+        try:
+            after = int(after)
+        except ValueError:
+            return Response(
+                {'error': 'after must be a message id'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    
     try:
-        shared_session = get_object_or_404(SharedChatSession, share_token=share_token)
+        shared_session = get_object_or_404(
+            SharedChatSession.objects.select_related('original_session'), share_token=share_token
+        )
         
         # Check if session is expired
         if shared_session.expires_at and timezone.now() > shared_session.expires_at:
@@ -106,36 +111,36 @@ def get_shared_session(request, share_token):
                 status=status.HTTP_410_GONE
             )
         
-        # Track access
-        SharedChatAccess.objects.create(
-            shared_session=shared_session,
-            ip_address=request.META.get('REMOTE_ADDR', ''),
-            user_agent=request.META.get('HTTP_USER_AGENT', ''),
-            session_data={'accessed_at': timezone.now().isoformat()}
-        )
+        if after is not None:
+            # Delta sync: a viewer that already has the transcript, so no access is recorded
+            new_messages = list(
+                shared_session.original_session.messages.filter(id__gt=after).order_by('id')
+            )
+            if not new_messages:
+                return Response(status=status.HTTP_304_NOT_MODIFIED)
+            return Response({
+                'session_id': shared_session.original_session.session_id,
+                'messages': [live.message_data(msg) for msg in new_messages],
+                'cursor': new_messages[-1].id,
+                'last_synced': timezone.now().isoformat()
+            })
         
-        # Increment access count
-        shared_session.increment_access()
+        # Track access; written in the background (chat.access_log)
+        access_log.record(shared_session, request)
         
         # Get latest messages (real-time sync)
         messages = shared_session.sync_messages()
-        message_data = []
-        for msg in messages:
-            message_data.append({
-                'id': str(msg.id),
-                'role': msg.role,
-                'content': msg.content,
-                'timestamp': msg.timestamp.isoformat(),
-                'metadata': msg.metadata or {}
-            })
+        message_data = [live.message_data(msg) for msg in messages]
         
         return Response({
             'session_id': shared_session.original_session.session_id,
             'title': shared_session.title,
             'messages': message_data,
+            # Pass back as ?after= to fetch only newer messages
+            'cursor': max((msg.id for msg in messages), default=0),
             'is_editable': shared_session.allow_editing,
             'last_synced': shared_session.last_synced.isoformat(),
-            'access_count': shared_session.access_count,
+            'access_count': shared_session.access_count + access_log.pending(shared_session),
             'pdf_url': shared_session.pdf_url,
             'expires_at': shared_session.expires_at.isoformat() if shared_session.expires_at else None
         })
@@ -152,7 +157,9 @@ def get_shared_session(request, share_token):
 def get_shared_pdf(request, share_token):
     """Get PDF of shared chat session"""
     try:
-        shared_session = get_object_or_404(SharedChatSession, share_token=share_token)
+        shared_session = get_object_or_404(
+            SharedChatSession.objects.select_related('original_session'), share_token=share_token
+        )
         
         # Check if session is expired
         if shared_session.expires_at and timezone.now() > shared_session.expires_at:
@@ -161,33 +168,71 @@ def get_shared_pdf(request, share_token):
                 status=status.HTTP_410_GONE
             )
         
-        # Generate fresh PDF
-        messages = shared_session.original_session.messages.all().order_by('timestamp')
-        pdf_path = generate_chat_pdf(
-            shared_session.original_session.session_id,
-            [{'role': msg.role, 'content': msg.content, 'timestamp': msg.timestamp} for msg in messages],
-            shared_session.title
+        # Serve the cached PDF; if the conversation changed, answer with its render job
+        pdf_version = pdf_cache.version(shared_session)
+        if pdf_cache.enabled() and not pdf_cache.is_rendered(shared_session, pdf_version):
+            job = pdf_jobs.request_pdf(shared_session, pdf_version)
+            return Response(
+                PdfExportJobSerializer(job).data,
+                status=status.HTTP_202_ACCEPTED,
+                headers={'Retry-After': '1'}
+            )
+        return pdf_cache.response(request, shared_session, pdf_version)
+        
+    except Exception as e:
+        return Response(
+            {'error': f'Failed to generate PDF: {str(e)}'}, 
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def export_shared_pdf(request, share_token):
+    """Start rendering the PDF of a shared chat session, or return the finished job"""
+    try:
+        shared_session = get_object_or_404(
+            SharedChatSession.objects.select_related('original_session'), share_token=share_token
         )
         
-        # Read PDF content
-        with open(pdf_path, 'rb') as pdf_file:
-            pdf_content = pdf_file.read()
+        # Check if session is expired
+        if shared_session.expires_at and timezone.now() > shared_session.expires_at:
+            return Response(
+                {'error': 'Shared session has expired'}, 
+                status=status.HTTP_410_GONE
+            )
         
-        # Clean up temporary file
-        os.unlink(pdf_path)
+        if not pdf_cache.enabled():
+            # Without the cache every download renders into the response
+            return Response({'status': 'done', 'pdf_url': shared_session.pdf_url})
         
-        # Return PDF response
-        response = HttpResponse(pdf_content, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="chat_session_{share_token}.pdf"'
-        return response
+        job = pdf_jobs.request_pdf(shared_session)
+        return Response(
+            PdfExportJobSerializer(job).data,
+            status=status.HTTP_200_OK if job.status == 'done' else status.HTTP_202_ACCEPTED
+        )
         
     except Exception as e:
         return Response(
-            {'error': f'Failed to generate PDF: {str(e)}'}, 
+            {'error': f'Failed to start PDF export: {str(e)}'}, 
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_pdf_job(request, job_id):
+    """Get the status of a shared session PDF render job"""
+    try:
+        job = PdfExportJob.objects.select_related('shared_session').get(id=job_id)
+    except PdfExportJob.DoesNotExist:
+        return Response(
+            {'error': 'Job not found'}, 
+            status=status.HTTP_404_NOT_FOUND
+        )
+    return Response(PdfExportJobSerializer(job).data)
+
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def add_message_to_shared(request, share_token):
@@ -254,7 +299,7 @@ def get_shared_session_info(request, share_token):
             'title': shared_session.title,
             'is_active': shared_session.is_active,
             'allow_editing': shared_session.allow_editing,
-            'access_count': shared_session.access_count,
+            'access_count': shared_session.access_count + access_log.pending(shared_session),
             'created_at': shared_session.created_at.isoformat(),
             'last_synced': shared_session.last_synced.isoformat(),
             'expires_at': shared_session.expires_at.isoformat() if shared_session.expires_at else None,
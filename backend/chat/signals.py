@@ -0,0 +1,59 @@
+"""
+Signal handlers keeping chat caches in step with the database
+"""
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import ChatMessage, ChatSession, SharedChatSession
+from . import history, live, pdf_cache
+
+
+def _history_changed(session_pk):
+    # Local invalidation only reaches this process; the version reaches all
+    ChatSession.objects.filter(pk=session_pk).update(history_version=F('history_version') + 1)
+    history.invalidate(session_pk)
+
+
+def _invalidate_shared_pdfs(session_pk):
+    # Edits keep the message ids and count, so the PDF version would not change
+    pdf_cache.invalidate(
+        SharedChatSession.objects.filter(original_session_id=session_pk)
+        .values_list('share_token', flat=True)
+    )
+
+
+@receiver(post_save, sender=ChatMessage)
+def message_saved(sender, instance, created, **kwargs):
+    if created:
+        # Viewers read the message's successors from the database, and a rolled
+        # back message must not reach the history cache, so wait for the commit
+        transaction.on_commit(lambda: history.append_message(instance))
+        transaction.on_commit(lambda: live.publish(instance))
+    else:
+        _history_changed(instance.session_id)
+        _invalidate_shared_pdfs(instance.session_id)
+
+
+@receiver(post_delete, sender=ChatMessage)
+def message_deleted(sender, instance, origin=None, **kwargs):
+    # A queryset or session delete sends this for every message; handle each
+    # session once
+    if origin is not None:
+        done = origin.__dict__.setdefault('_invalidated_sessions', set())
+        if instance.session_id in done:
+            return
+        done.add(instance.session_id)
+    _history_changed(instance.session_id)
+    _invalidate_shared_pdfs(instance.session_id)
+
+
+@receiver(post_delete, sender=ChatSession)
+def session_deleted(sender, instance, **kwargs):
+    history.invalidate(instance.pk)
+
+
+@receiver(post_delete, sender=SharedChatSession)
+def shared_session_deleted(sender, instance, **kwargs):
+    pdf_cache.invalidate([instance.share_token])
@@ -0,0 +1,46 @@
+"""
+Streamed response bodies that stay streamed under ASGI
+
+Django's ASGI handler collects a sync iterator body whole (``sync_to_async(list)``)
+before sending any of it, so an export or PDF rendered through a generator
+would be buffered in memory. ``content`` passes the iterator through under
+WSGI and wraps it for ASGI in an async iterator that produces each chunk in
+a thread of its own, so chunks are sent as they are made.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connections
+
+
+_END = object()
+
+
+def content(request, chunks):
+    """``chunks`` as a ``StreamingHttpResponse`` body for ``request``'s server"""
+    # DRF wraps the HttpRequest
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        return _async_chunks(iter(chunks))
+    return chunks
+
+
+async def _async_chunks(chunks):
+    # One thread for the whole body: queryset iterators keep their cursor on
+    # the database connection of the thread that opened it
+    executor = ThreadPoolExecutor(1, thread_name_prefix='stream')
+    loop = asyncio.get_running_loop()
+    try:
+        while (chunk := await loop.run_in_executor(executor, next, chunks, _END)) is not _END:
+            yield chunk
+    finally:
+        # Also runs when the client goes away; close there without waiting
+        executor.submit(_close, chunks)
+        executor.shutdown(wait=False)
+
+
+def _close(chunks):
+    close = getattr(chunks, 'close', None)
+    if close is not None:
+        close()
+    connections.close_all()  # This thread's connections
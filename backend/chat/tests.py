@@ -0,0 +1,170 @@
+import json
+from unittest import mock
+from django.test import TestCase
+from core.query_plans import IndexedQueriesMixin
+from fileparser import jobs, parse_cache
+from fileparser.models import ParsedFile, ParseJob
+from fileparser.retrieval import index_file
+from .models import ChatMessage, ChatSession, SharedChatSession
+from . import access_log, history
+
+
+REPLY = 'Here is what the uploaded report says about revenue.'
+FILE_TEXT = 'Quarterly revenue grew in the northern region while costs fell. ' * 50
+
+
+class FakeUpstreamResponse:
+    """Just enough of a requests.Response for the chat views"""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {'choices': [{'message': {'content': REPLY}}]}
+
+    def iter_lines(self):
+        for word in REPLY.split(' '):
+            yield f"data: {json.dumps({'choices': [{'delta': {'content': word + ' '}}]})}".encode()
+        yield b'data: [DONE]'
+
+
+def fake_post(payload, stream=False):
+    return FakeUpstreamResponse(stream)
+
+
+def create_files():
+    """An uploaded file with its own chunks and one sharing a parse-cache blob"""
+    analysis = {'file_type': 'txt', 'insights': ['Mentions revenue']}
+    blob = parse_cache.store('0' * 64, 'txt', FILE_TEXT, analysis, 'Summary')
+    job = ParseJob.objects.create(
+        original_name='report.txt', file_path='', file_type='txt', file_size=len(FILE_TEXT), digest=blob.digest
+    )
+    jobs._create_parsed_file(job, FILE_TEXT, blob, analysis, 'Summary')
+    own = ParsedFile.objects.create(
+        original_name='notes.txt', file_path='', file_type='txt', file_size=len(FILE_TEXT),
+        parsed_content=FILE_TEXT, metadata={'summary': 'Notes', 'insights': []}
+    )
+    index_file(own)
+
+
+def create_session(session_id, length):
+    session = ChatSession.objects.create(session_id=session_id, title='Test')
+    ChatMessage.objects.bulk_create(
+        ChatMessage(session=session, role='user' if number % 2 == 0 else 'assistant', content=f'Message {number}')
+        for number in range(length)
+    )
+    return session
+
+
+class QueryPlanTests(IndexedQueriesMixin, TestCase):
+    """The queries of the chat and shared-session views use indexes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        create_session('older', 2)
+        cls.session = create_session('plans', 20)
+        cls.message_ids = list(cls.session.messages.order_by('id').values_list('id', flat=True))
+        SharedChatSession.objects.create(original_session=cls.session, share_token='plans', title='Plans')
+        # A turn with uploads also retrieves their chunks
+        create_files()
+
+    def setUp(self):
+        history.get_store().clear()
+
+    def get(self, path):
+        response = self.client.get(path)
+        self.assertLess(response.status_code, 400, path)
+        return response
+
+    @mock.patch('chat.upstream.post', fake_post)
+    def test_chat_turn(self):
+        with self.assertIndexedQueries():
+            for stream in (False, True):
+                response = self.client.post(
+                    '/api/chat/', {'message': 'What about revenue?', 'session_id': 'plans', 'stream': stream},
+                    content_type='application/json'
+                )
+                self.assertEqual(response.status_code, 200)
+                if stream:
+                    b''.join(response.streaming_content)
+
+    def test_session_views(self):
+        middle = self.message_ids[10]
+        with self.assertIndexedQueries():
+            self.get('/api/chat/session/plans/')
+            self.get('/api/chat/session/plans/messages/?limit=5')
+            self.get(f'/api/chat/session/plans/messages/?limit=5&before={middle}')
+            self.get(f'/api/chat/session/plans/messages/?limit=5&after={middle}')
+            cursor = self.get('/api/chat/sessions/page/?limit=1').json()['next_cursor']
+            self.get(f'/api/chat/sessions/page/?limit=1&cursor={cursor}')
+
+    def test_shared_views(self):
+        with self.assertIndexedQueries():
+            self.get('/api/chat/shared/plans/')
+            self.get(f'/api/chat/shared/plans/?after={self.message_ids[10]}')
+            self.get('/api/chat/shared/plans/info/')
+            # The access log's write, done in the background
+            access_log.flush()
+
+    def test_delete_session(self):
+        create_session('doomed', 5)
+        with self.assertIndexedQueries():
+            response = self.client.delete('/api/chat/session/doomed/delete/')
+        self.assertEqual(response.status_code, 200)
+
+
+@mock.patch('chat.upstream.post', fake_post)
+class ChatTurnQueryTests(TestCase):
+    """A chat turn runs a fixed number of queries (benchmarks/bench_chat_turn_queries.py)"""
+
+    # Counts include the SAVEPOINT and RELEASE of each atomic block, which
+    # are a BEGIN and COMMIT outside the test's transaction
+    EXISTING_SESSION = 6 + 2
+    NEW_SESSION = 5 + 4
+    NEW_SESSION_WITHOUT_ID = 4 + 2
+
+    def setUp(self):
+        history.get_store().clear()
+
+    def turn(self, session_id=None, stream=False):
+        data = {'message': 'What about revenue?', 'stream': stream}
+        if session_id:
+            data['session_id'] = session_id
+        response = self.client.post('/api/chat/', data, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        if stream:
+            b''.join(response.streaming_content)
+
+    def test_existing_session(self):
+        for length in (0, 10, 200):
+            create_session(f'history-{length}', length)
+            for stream in (False, True):
+                with self.subTest(length=length, stream=stream):
+                    # Cold history cache, then warm
+                    history.get_store().clear()
+                    with self.assertNumQueries(self.EXISTING_SESSION):
+                        self.turn(f'history-{length}', stream)
+                    with self.assertNumQueries(self.EXISTING_SESSION):
+                        self.turn(f'history-{length}', stream)
+
+    def test_new_session(self):
+        for stream in (False, True):
+            with self.subTest(stream=stream):
+                with self.assertNumQueries(self.NEW_SESSION):
+                    self.turn(f'new-{stream}', stream)
+                with self.assertNumQueries(self.NEW_SESSION_WITHOUT_ID):
+                    self.turn(stream=stream)
+
+
+class SharedEventsTests(TestCase):
+    """Live events of a shared session"""
+
+    def test_wsgi_refuses_stream(self):
+        # runserver would buffer the endless stream; 204 sends the viewer to polling
+        session = create_session('events', 2)
+        SharedChatSession.objects.create(original_session=session, share_token='events', title='Events')
+        response = self.client.get('/api/chat/shared/events/events/')
+        self.assertEqual(response.status_code, 204)
@@ -0,0 +1,138 @@
+"""
+Shared HTTP clients for Groq API calls
+
+Both clients keep connections to the upstream host alive between chat turns,
+so a message does not pay a fresh TCP+TLS handshake. Pool sizes, timeouts and
+retry policy come from the ``GROQ_*`` settings in core/settings.py.
+"""
+
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+import httpx
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+_async_client = None
+_async_client_loop = None
+
+
+def groq_headers():
+    """Headers for authenticated Groq API requests"""
+    return {
+        'Authorization': f'Bearer {settings.GROQ_API_KEY}',
+        'Content-Type': 'application/json'
+    }
+
+
+def get_session():
+    """Return the process-wide pooled ``requests.Session``"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                retry = Retry(
+                    total=settings.GROQ_MAX_RETRIES,
+                    backoff_factor=settings.GROQ_RETRY_BACKOFF,
+                    status_forcelist=RETRY_STATUSES,
+                    allowed_methods=['POST'],
+                    respect_retry_after_header=True,
+                    raise_on_status=False
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=settings.GROQ_POOL_CONNECTIONS,
+                    pool_maxsize=settings.GROQ_POOL_MAXSIZE,
+                    pool_block=True,
+                    max_retries=retry
+                )
+                session = requests.Session()
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+
+def post(payload, stream=False):
+    """POST a chat completion request over the pooled session"""
+    return get_session().post(
+        settings.GROQ_API_URL,
+        json=payload,
+        headers=groq_headers(),
+        stream=stream,
+        timeout=(settings.GROQ_CONNECT_TIMEOUT, settings.GROQ_READ_TIMEOUT)
+    )
+
+
+def get_async_client():
+    """Return the shared ``httpx.AsyncClient`` for the running event loop.
+
+    Connections belong to the loop they were opened on, so a new client is
+    created when the loop changes (e.g. under ``runserver``).
+    """
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client_loop is not loop:
+        _async_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                settings.GROQ_READ_TIMEOUT,
+                connect=settings.GROQ_CONNECT_TIMEOUT
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.GROQ_ASYNC_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.GROQ_ASYNC_MAX_CONNECTIONS,
+                keepalive_expiry=settings.GROQ_KEEPALIVE_EXPIRY
+            ),
+            transport=httpx.AsyncHTTPTransport(retries=settings.GROQ_MAX_RETRIES)
+        )
+        _async_client_loop = loop
+    return _async_client
+
+
+def _backoff(attempt, response):
+    """Seconds to wait before retry ``attempt``, honouring Retry-After"""
+    retry_after = response.headers.get('Retry-After')
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return settings.GROQ_RETRY_BACKOFF * (2 ** attempt)
+
+
+async def apost(payload):
+    """POST a chat completion request, retrying 429/5xx with backoff"""
+    client = get_async_client()
+    for attempt in range(settings.GROQ_MAX_RETRIES + 1):
+        response = await client.post(settings.GROQ_API_URL, json=payload, headers=groq_headers())
+        if response.status_code not in RETRY_STATUSES or attempt == settings.GROQ_MAX_RETRIES:
+            return response
+        await asyncio.sleep(_backoff(attempt, response))
+
+
+@asynccontextmanager
+async def astream(payload):
+    """Open a streaming chat completion request, retrying 429/5xx with backoff.
+
+    Retries only happen before any body has been read, so callers never see
+    a partially replayed stream.
+    """
+    client = get_async_client()
+    for attempt in range(settings.GROQ_MAX_RETRIES + 1):
+        request = client.build_request('POST', settings.GROQ_API_URL, json=payload, headers=groq_headers())
+        response = await client.send(request, stream=True)
+        if response.status_code in RETRY_STATUSES and attempt < settings.GROQ_MAX_RETRIES:
+            await response.aclose()
+            await asyncio.sleep(_backoff(attempt, response))
+            continue
+        try:
+            yield response
+        finally:
+            await response.aclose()
+        return
@@ -1,10 +1,13 @@
 from django.urls import path
-from . import views, export_views, shared_views
+from . import views, async_views, export_views, shared_views
 
 urlpatterns = [
     path('', views.chat, name='chat'),
+    path('async/', async_views.chat, name='chat_async'),
     path('session/<str:session_id>/', views.get_session, name='get_session'),
+    path('session/<str:session_id>/messages/', views.get_session_messages, name='get_session_messages'),
     path('sessions/', views.get_sessions, name='get_sessions'),
+    path('sessions/page/', views.get_sessions_page, name='get_sessions_page'),
     path('session/<str:session_id>/delete/', views.delete_session, name='delete_session'),
     path('export/', export_views.export_chat_session, name='export_chat_session'),
     path('import/', export_views.import_chat_session, name='import_chat_session'),
@@ -13,6 +16,10 @@ urlpatterns = [
     path('shared/create/', shared_views.create_shared_session, name='create_shared_session'),
     path('shared/<str:share_token>/', shared_views.get_shared_session, name='get_shared_session'),
     path('shared/<str:share_token>/pdf/', shared_views.get_shared_pdf, name='get_shared_pdf'),
+    path('shared/<str:share_token>/pdf/export/', shared_views.export_shared_pdf, name='export_shared_pdf'),
     path('shared/<str:share_token>/add-message/', shared_views.add_message_to_shared, name='add_message_to_shared'),
+    path('shared/<str:share_token>/events/', async_views.shared_session_events, name='shared_session_events'),
     path('shared/<str:share_token>/info/', shared_views.get_shared_session_info, name='get_shared_session_info'),
+    path('pdf-jobs/<uuid:job_id>/', shared_views.get_pdf_job, name='get_pdf_job'),
+    path('pdf-jobs/<uuid:job_id>/events/', async_views.pdf_job_events, name='pdf_job_events'),
 ]
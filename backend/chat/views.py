@@ -1,14 +1,26 @@
+import base64
 import json
-import requests
 import uuid
 from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Substr
+from django.utils.dateparse import parse_datetime
 from django.http import StreamingHttpResponse, JsonResponse
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 from .models import ChatSession, ChatMessage
-from .serializers import ChatRequestSerializer, ChatSessionSerializer, ChatMessageSerializer
+from .serializers import (
+    ChatRequestSerializer, ChatSessionSerializer, ChatSessionSummarySerializer, ChatMessageSerializer
+)
+from . import context, history, upstream
+
+
+STREAM_DONE = object()
+PREVIEW_LENGTH = 120  # Characters of the last message in session summaries
 
 
 @api_view(['POST'])
@@ -19,67 +31,54 @@ def chat(request):
     if not serializer.is_valid():
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-    message = serializer.validated_data['message']
-    session_id = serializer.validated_data.get('session_id')
-    stream = serializer.validated_data.get('stream', False)
-    model = serializer.validated_data.get('model', 'llama-3.1-8b-instant')
-    temperature = serializer.validated_data.get('temperature', 0.7)
-    max_tokens = serializer.validated_data.get('max_tokens', 1000)
+    session, groq_payload = _prepare_chat(serializer.validated_data)
 
-    # Get or create session
-    if session_id:
-        try:
-            session = ChatSession.objects.get(session_id=session_id)
-        except ChatSession.DoesNotExist:
-            session = ChatSession.objects.create(
-                session_id=session_id,
-                title=message[:50] + "..." if len(message) > 50 else message
-            )
-    else:
-        session = ChatSession.objects.create(
-            session_id=str(uuid.uuid4()),
-            title=message[:50] + "..." if len(message) > 50 else message
+    try:
+        if groq_payload['stream']:
+            if isinstance(request._request, ASGIRequest):
+                # ASGI buffers a sync generator whole before sending it, so relay
+                # with the async client as async_views.chat does
+                from .async_views import _stream_events
+                return _event_stream(_stream_events(groq_payload, session))
+            return _stream_response(groq_payload, session)
+        else:
+            return _handle_non_streaming_response(groq_payload, session)
+    except Exception as e:
+        return Response(
+            {'error': f'Failed to get AI response: {str(e)}'}, 
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
-    # Save user message
-    user_message = ChatMessage.objects.create(
-        session=session,
-        role='user',
-        content=message
-    )
 
-    # Get conversation history
-    messages = session.messages.all().order_by('timestamp')
-    conversation_history = []
-    for msg in messages:
-        conversation_history.append({
-            'role': msg.role,
-            'content': msg.content
-        })
+def _prepare_chat(validated_data):
+    """Store the user message and build the Groq payload for a chat turn.
+
+    Shared by the sync view and the async view in ``async_views``.
+    """
+    message = validated_data['message']
+    session_id = validated_data.get('session_id')
+    stream = validated_data.get('stream', False)
+    model = validated_data.get('model', 'llama-3.1-8b-instant')
+    temperature = validated_data.get('temperature', 0.7)
+    max_tokens = validated_data.get('max_tokens', 1000)
+
+    # Reads first: the session, its history and the file context
+    title = message[:50] + "..." if len(message) > 50 else message
+    if session_id:
+        session, created = ChatSession.objects.get_or_create(session_id=session_id, defaults={'title': title})
+    else:
+        session, created = ChatSession.objects.create(session_id=str(uuid.uuid4()), title=title), True
+    if created:
+        conversation_history = []
+        history.get_store().set(session.pk, conversation_history, session.history_version)
+    else:
+        conversation_history = history.get_history(session)
 
     # Get uploaded files context for the LLM
-    from fileparser.models import ParsedFile
-    uploaded_files = ParsedFile.objects.all().order_by('-created_at')[:5]  # Get 5 most recent files
-    
-    # Add file context to the conversation if files exist
-    if uploaded_files:
-        file_context = "Here are the uploaded files that the user can ask about:\n\n"
-        for file in uploaded_files:
-            file_context += f"📄 File: {file.original_name} ({file.file_type.upper()})\n"
-            
-            # Add insights if available
-            insights = file.metadata.get('insights', [])
-            if insights:
-                file_context += f"   Insights: {', '.join(insights)}\n"
-            
-            # Add content preview
-            content_preview = file.parsed_content[:800]  # First 800 chars
-            file_context += f"   Content Preview: {content_preview}...\n\n"
-        
-        # Add file context as a system message
-        conversation_history.insert(0, {
-            'role': 'system',
-            'content': f"""You are an AI assistant with access to the user's uploaded files. 
+    system_prompt = None
+    file_context = _file_context(message)
+    if file_context:
+        system_prompt = f"""You are an AI assistant with access to the user's uploaded files. 
 
 {file_context}
 
@@ -92,64 +91,106 @@ You can:
 - Provide insights based on the file content
 
 When the user asks about files, be specific about which file you're referencing and provide detailed, helpful responses based on the actual content."""
-        })
+
+    # Then one short write transaction: the user message, and the session's
+    # updated_at and summary in a single UPDATE
+    with transaction.atomic():
+        user_message = ChatMessage.objects.create(
+            session=session,
+            role='user',
+            content=message
+        )
+        messages = context.build_messages(
+            session, conversation_history + [history.message_entry(user_message)],
+            system_prompt, model, max_tokens
+        )
+        if not created:
+            session.save(update_fields=['updated_at', 'context_summary', 'summary_through_id'])
 
     # Prepare Groq API request
     groq_payload = {
         'model': model,
-        'messages': conversation_history,
+        'messages': messages,
         'temperature': temperature,
         'max_tokens': max_tokens,
         'stream': stream
     }
 
-    headers = {
-        'Authorization': f'Bearer {settings.GROQ_API_KEY}',
-        'Content-Type': 'application/json'
-    }
+    return session, groq_payload
 
+
+def _file_context(message):
+    """Describe recent uploads plus the chunks most relevant to ``message``"""
+    from fileparser.models import ParsedFile, content_expression
+    from fileparser.retrieval import retrieve
+
+    uploaded_files = list(
+        ParsedFile.objects.defer('parsed_content')
+        .annotate(preview=Substr(content_expression(), 1, 800))
+        .order_by('-created_at')[:5]  # Get 5 most recent files
+    )
+    if not uploaded_files:
+        return ''
+
+    file_context = "Here are the uploaded files that the user can ask about:\n\n"
+    for file in uploaded_files:
+        file_context += f"📄 File: {file.original_name} ({file.file_type.upper()})\n"
+
+        # Add insights if available
+        insights = file.metadata.get('insights', [])
+        if insights:
+            file_context += f"   Insights: {', '.join(insights)}\n"
+        file_context += "\n"
+
+    # Add the passages that best match the message
+    hits = retrieve(message)
+    if hits:
+        file_context += "Relevant excerpts:\n\n"
+        for chunk, score in hits:
+            file_context += f"[{chunk.source_file.original_name}, part {chunk.ordinal + 1}]\n{chunk.content}\n\n"
+    else:
+        for file in uploaded_files:
+            file_context += f"📄 {file.original_name} - Content Preview: {file.preview}...\n\n"
+
+    return file_context
+
+
+def _parse_stream_line(line):
+    """Extract the content delta from one line of a Groq SSE stream.
+
+    Returns ``STREAM_DONE`` on the terminating ``[DONE]`` event and None for
+    lines that carry no content.
+    """
+    if not line or not line.startswith('data: '):
+        return None
+    data = line[6:]  # Remove 'data: ' prefix
+    if data.strip() == '[DONE]':
+        return STREAM_DONE
     try:
-        if stream:
-            return _stream_response(groq_payload, headers, session)
-        else:
-            return _handle_non_streaming_response(groq_payload, headers, session)
-    except Exception as e:
-        return Response(
-            {'error': f'Failed to get AI response: {str(e)}'}, 
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
+        chunk = json.loads(data)
+    except json.JSONDecodeError:
+        return None
+    if 'choices' in chunk and len(chunk['choices']) > 0:
+        delta = chunk['choices'][0].get('delta', {})
+        return delta.get('content')
+    return None
 
 
-def _stream_response(payload, headers, session):
+def _stream_response(payload, session):
     """Handle streaming response from Groq API"""
     def generate():
         try:
-            response = requests.post(
-                settings.GROQ_API_URL,
-                json=payload,
-                headers=headers,
-                stream=True
-            )
+            response = upstream.post(payload, stream=True)
             response.raise_for_status()
 
             assistant_content = ""
             for line in response.iter_lines():
-                if line:
-                    line = line.decode('utf-8')
-                    if line.startswith('data: '):
-                        data = line[6:]  # Remove 'data: ' prefix
-                        if data.strip() == '[DONE]':
-                            break
-                        try:
-                            chunk = json.loads(data)
-                            if 'choices' in chunk and len(chunk['choices']) > 0:
-                                delta = chunk['choices'][0].get('delta', {})
-                                if 'content' in delta:
-                                    content = delta['content']
-                                    assistant_content += content
-                                    yield f"data: {json.dumps({'content': content})}\n\n"
-                        except json.JSONDecodeError:
-                            continue
+                content = _parse_stream_line(line.decode('utf-8'))
+                if content is STREAM_DONE:
+                    break
+                if content:
+                    assistant_content += content
+                    yield f"data: {json.dumps({'content': content})}\n\n"
 
             # Save assistant message
             if assistant_content:
@@ -162,8 +203,12 @@ def _stream_response(payload, headers, session):
         except Exception as e:
             yield f"data: {json.dumps({'error': str(e)})}\n\n"
 
+    return _event_stream(generate())
+
+
+def _event_stream(events):
     return StreamingHttpResponse(
-        generate(),
+        events,
         content_type='text/event-stream',
         headers={
             'Cache-Control': 'no-cache',
@@ -172,20 +217,16 @@ def _stream_response(payload, headers, session):
     )
 
 
-def _handle_non_streaming_response(payload, headers, session):
+def _handle_non_streaming_response(payload, session):
     """Handle non-streaming response from Groq API"""
-    response = requests.post(
-        settings.GROQ_API_URL,
-        json=payload,
-        headers=headers
-    )
+    response = upstream.post(payload)
     response.raise_for_status()
 
     data = response.json()
     assistant_content = data['choices'][0]['message']['content']
 
     # Save assistant message
-    ChatMessage.objects.create(
+    assistant_message = ChatMessage.objects.create(
         session=session,
         role='assistant',
         content=assistant_content
@@ -194,14 +235,14 @@ def _handle_non_streaming_response(payload, headers, session):
     return Response({
         'response': assistant_content,
         'session_id': session.session_id,
-        'message_id': ChatMessage.objects.filter(session=session).last().id
+        'message_id': assistant_message.id
     })
 
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_session(request, session_id):
-    """Get chat session with messages"""
+    """Get chat session with all its messages (see get_session_messages for windows)"""
     try:
         session = ChatSession.objects.get(session_id=session_id)
         serializer = ChatSessionSerializer(session)
@@ -213,15 +254,150 @@ def get_session(request, session_id):
         )
 
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_session_messages(request, session_id):
+    """Get a window of a session's messages, in chronological order.
+
+    Without cursors this is the latest ``limit`` messages. ``?before=<message
+    id>`` pages back through older ones and ``?after=<message id>`` forward
+    through newer ones, in (timestamp, id) order.
+    """
+    limit = _limit(request, settings.CHAT_MESSAGES_PAGE_SIZE, settings.CHAT_MESSAGES_PAGE_MAX)
+    before = request.query_params.get('before')
+    after = request.query_params.get('after')
+    if limit is None or (before is not None and after is not None):
+        return Response(
+            {'error': 'Use limit with at most one of before and after'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        session = ChatSession.objects.only('id', 'session_id', 'title').get(session_id=session_id)
+    except ChatSession.DoesNotExist:
+        return Response(
+            {'error': 'Session not found'}, 
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    messages = session.messages.all()
+    cursor = before if before is not None else after
+    if cursor is not None:
+        try:
+            position = messages.values_list('timestamp', 'id').get(id=int(cursor))
+        except (ValueError, ChatMessage.DoesNotExist):
+            return Response(
+                {'error': 'before and after must be message ids of this session'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        timestamp, message_id = position
+        # The plain range lets the index seek to the cursor instead of scanning up to it
+        if before is not None:
+            messages = messages.filter(
+                Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=message_id), timestamp__lte=timestamp
+            )
+        else:
+            messages = messages.filter(
+                Q(timestamp__gt=timestamp) | Q(timestamp=timestamp, id__gt=message_id), timestamp__gte=timestamp
+            )
+
+    if after is not None:
+        window = list(messages.order_by('timestamp', 'id')[:limit + 1])
+        has_more = len(window) > limit
+        window = window[:limit]
+    else:
+        # Newest first from the index, then back into reading order
+        window = list(messages.order_by('-timestamp', '-id')[:limit + 1])
+        has_more = len(window) > limit
+        window = window[:limit][::-1]
+
+    return Response({
+        'session_id': session.session_id,
+        'title': session.title,
+        'messages': ChatMessageSerializer(window, many=True).data,
+        'has_older': has_more if after is None else True,
+        'has_newer': has_more if after is not None else before is not None,
+    })
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_sessions(request):
-    """Get all chat sessions"""
+    """Get all chat sessions, with all their messages (see get_sessions_page)"""
     sessions = ChatSession.objects.all()
     serializer = ChatSessionSerializer(sessions, many=True)
     return Response(serializer.data)
 
 
+def _session_cursor(session):
+    value = f'{session.updated_at.isoformat()}|{session.pk}'
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def _parse_session_cursor(cursor):
+    """``(updated_at, pk)`` of a cursor from _session_cursor, or None if invalid"""
+    try:
+        updated_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return parse_datetime(updated_at), int(pk)
+    except ValueError:
+        return None
+
+
+def _limit(request, default, maximum):
+    """``?limit=`` clamped to 1..maximum, or None if it is not a number"""
+    try:
+        return min(max(int(request.query_params.get('limit', default)), 1), maximum)
+    except ValueError:
+        return None
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_sessions_page(request):
+    """Get one page of session summaries, most recently updated first.
+
+    Summaries have a message count and the start of the last message instead
+    of the messages, and the page is a single query. Pass ``next_cursor``
+    back as ``?cursor=`` for the next page.
+    """
+    limit = _limit(request, settings.CHAT_SESSIONS_PAGE_SIZE, settings.CHAT_SESSIONS_PAGE_MAX)
+    if limit is None:
+        return Response(
+            {'error': 'limit must be a number'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    session_messages = ChatMessage.objects.filter(session=OuterRef('pk')).order_by()
+    sessions = ChatSession.objects.defer('context_summary').annotate(
+        # Correlated subqueries, evaluated for the rows of this page only
+        message_count=Coalesce(
+            Subquery(session_messages.values('session').annotate(count=Count('*')).values('count')), 0
+        ),
+        last_message=Subquery(
+            session_messages.order_by('-id').values(preview=Substr('content', 1, PREVIEW_LENGTH))[:1]
+        ),
+    ).order_by('-updated_at', '-id')
+
+    cursor = request.query_params.get('cursor')
+    if cursor:
+        position = _parse_session_cursor(cursor)
+        if position is None or position[0] is None:
+            return Response(
+                {'error': 'Invalid cursor'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        updated_at, pk = position
+        sessions = sessions.filter(Q(updated_at__lt=updated_at) | Q(updated_at=updated_at, id__lt=pk))
+
+    page = list(sessions[:limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit]
+    return Response({
+        'sessions': ChatSessionSummarySerializer(page, many=True).data,
+        'next_cursor': _session_cursor(page[-1]) if has_more else None
+    })
+
+
 @api_view(['DELETE'])
 @permission_classes([AllowAny])
 def delete_session(request, session_id):
@@ -0,0 +1,15 @@
+"""
+ASGI config for core project.
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+# Django keeps a persistent connection per thread, and under ASGI every
+# sync_to_async thread would hold one; close them after each request unless
+# set explicitly (e.g. behind PgBouncer)
+os.environ.setdefault('DATABASE_CONN_MAX_AGE', '0')
+
+application = get_asgi_application()
@@ -0,0 +1,72 @@
+"""
+Query plan checks for the test suites
+
+``IndexedQueriesMixin.assertIndexedQueries`` captures the SQL a block of code
+(usually requests to the views) runs and fails if SQLite's ``EXPLAIN QUERY
+PLAN`` for any of it reads a whole table or sorts in a temporary B-tree. The
+plans are those of the real queries, so they cannot drift from the views.
+"""
+
+import re
+from contextlib import contextmanager
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+# "SCAN chat_chatmessage" (SQLite 3.36+) or "SCAN TABLE chat_chatmessage"
+# (older) reads the whole table; "SCAN ... USING INDEX" walks an index in
+# order and stops at the LIMIT
+FULL_SCAN = re.compile(r'\bSCAN (?:TABLE )?(\S+)$')
+SORT = 'USE TEMP B-TREE FOR ORDER BY'
+EXPLAINED = ('SELECT', 'UPDATE', 'DELETE', 'INSERT')
+
+
+def explain(sql):
+    """Detail lines of SQLite's query plan for ``sql``"""
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        # Rows are (id, parent, unused, detail)
+        return [row[3] for row in cursor.fetchall()]
+
+
+def plan_problems(details):
+    """Full table scans and temp B-tree sorts in a plan"""
+    # Scans of subqueries and CTEs read rows already narrowed down
+    derived = {
+        detail.split(' ', 1)[1] for detail in details if detail.startswith(('CO-ROUTINE ', 'MATERIALIZE '))
+    }
+    problems = [
+        f'full scan of {match.group(1)}' for detail in details
+        if (match := FULL_SCAN.search(detail))
+        and match.group(1) not in derived and not match.group(1).startswith('(')
+    ]
+    if SORT in details:
+        problems.append('sorts in a temp B-tree')
+    return problems
+
+
+class IndexedQueriesMixin:
+    """``TestCase`` mixin asserting the plans of captured queries"""
+
+    @contextmanager
+    def assertIndexedQueries(self, allowed=()):
+        """Fail if a query run in the block scans a whole table or sorts.
+
+        ``allowed`` lists problems that are expected, as reported (e.g.
+        ``'sorts in a temp B-tree'`` for results ranked by a computed score).
+        """
+        if connection.vendor != 'sqlite':
+            self.skipTest('Query plans are only checked on SQLite')
+        with CaptureQueriesContext(connection) as queries:
+            yield queries
+        failures = []
+        for query in queries.captured_queries:
+            sql = query['sql']
+            if not sql.lstrip().upper().startswith(EXPLAINED):
+                continue
+            details = explain(sql)
+            problems = [problem for problem in plan_problems(details) if problem not in allowed]
+            if problems:
+                failures.append(f'{sql}\n    {", ".join(problems)}\n    ' + '\n    '.join(details))
+        if failures:
+            self.fail(f'{len(failures)} queries are not indexed:\n' + '\n'.join(failures))
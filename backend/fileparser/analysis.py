@@ -2,12 +2,24 @@
 File analysis utilities for LLM integration
 """
 
+RESUME_INSIGHT = "Appears to be a resume/CV document"
+
+
 def analyze_file_content(file_content, file_name, file_type):
     """
     Analyze file content and provide insights
     """
+    return with_file_name(analyze_content(file_content, file_type), file_name)
+
+
+def analyze_content(file_content, file_type):
+    """
+    Analyze file content without the name-based insights.
+
+    The parse cache stores this part, so identical uploads under different
+    names share it.
+    """
     analysis = {
-        'file_name': file_name,
         'file_type': file_type,
         'content_length': len(file_content),
         'insights': []
@@ -16,8 +28,6 @@ def analyze_file_content(file_content, file_name, file_type):
     # Basic content analysis
     if file_type == 'pdf':
         analysis['insights'].append("PDF document with text content")
-        if 'resume' in file_name.lower() or 'cv' in file_name.lower():
-            analysis['insights'].append("Appears to be a resume/CV document")
         if '@' in file_content:
             analysis['insights'].append("Contains email addresses")
         if 'http' in file_content or 'www.' in file_content:
@@ -28,9 +38,9 @@ def analyze_file_content(file_content, file_name, file_type):
     
     elif file_type == 'csv':
         analysis['insights'].append("Spreadsheet data")
-        lines = file_content.split('\n')
-        if len(lines) > 1:
-            analysis['insights'].append(f"Contains {len(lines)} rows of data")
+        line_count = file_content.count('\n') + 1
+        if line_count > 1:
+            analysis['insights'].append(f"Contains {line_count} rows of data")
     
     elif file_type == 'txt':
         analysis['insights'].append("Plain text document")
@@ -39,14 +49,25 @@ def analyze_file_content(file_content, file_name, file_type):
     if len(file_content) > 1000:
         analysis['insights'].append("Large document with substantial content")
     
-    if any(keyword in file_content.lower() for keyword in ['python', 'javascript', 'java', 'c++', 'programming']):
+    lowered = file_content.lower()
+    if any(keyword in lowered for keyword in ['python', 'javascript', 'java', 'c++', 'programming']):
         analysis['insights'].append("Contains programming/technical content")
     
-    if any(keyword in file_content.lower() for keyword in ['experience', 'skills', 'education', 'work']):
+    if any(keyword in lowered for keyword in ['experience', 'skills', 'education', 'work']):
         analysis['insights'].append("Contains professional/educational information")
     
     return analysis
 
+
+def with_file_name(analysis, file_name):
+    """
+    Complete a content analysis with the insights that depend on the file name
+    """
+    insights = list(analysis['insights'])
+    if analysis['file_type'] == 'pdf' and ('resume' in file_name.lower() or 'cv' in file_name.lower()):
+        insights.insert(1, RESUME_INSIGHT)
+    return {'file_name': file_name, **analysis, 'insights': insights}
+
 def get_file_summary(file_content, max_length=500):
     """
     Get a concise summary of file content
@@ -54,16 +75,21 @@ def get_file_summary(file_content, max_length=500):
     if len(file_content) <= max_length:
         return file_content
     
-    # Try to get the first meaningful part
-    lines = file_content.split('\n')
+    # Try to get the first meaningful part, scanning line by line instead of
+    # splitting the whole document
     summary_lines = []
     current_length = 0
-    
-    for line in lines:
-        if current_length + len(line) > max_length:
+    start = 0
+    while True:
+        end = file_content.find('\n', start)
+        line_end = len(file_content) if end == -1 else end
+        if current_length + (line_end - start) > max_length:
+            break
+        summary_lines.append(file_content[start:line_end])
+        current_length += line_end - start
+        if end == -1:
             break
-        summary_lines.append(line)
-        current_length += len(line)
+        start = end + 1
     
     summary = '\n'.join(summary_lines)
     if len(file_content) > max_length:
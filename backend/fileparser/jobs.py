@@ -0,0 +1,203 @@
+"""
+Background parsing and analysis of uploaded files
+
+``upload_file`` saves the upload, records a ``ParseJob`` and answers 202
+straight away. Jobs are run by ``FILE_PARSE_WORKERS`` threads that hand the
+CPU-bound parse and analysis to a process pool of the same size, so several
+uploads are parsed in parallel on multi-core hosts and none of them blocks a
+web worker. The page ranges of a large PDF are spread over the same pool.
+The threads then store the result in the parse cache and create and index
+the ``ParsedFile``. Uploads already in the parse cache skip the queue
+(``complete_from_cache``) and reuse the blob's index.
+
+The queue lives in the database: a job is claimed by atomically moving it
+from ``queued`` to ``running``, so several web processes, or
+``manage.py run_parse_jobs`` when ``FILE_PARSE_IN_WEB`` is off, can share it
+without running a job twice.
+"""
+
+import multiprocessing
+import os
+import threading
+from datetime import timedelta
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+from .analysis import with_file_name
+from .models import ParsedFile, ParseJob
+from .retrieval import ensure_blob_index, index_file
+from .utils import analyze_text, extract_file, iter_pdf, pdf_page_count
+from . import parse_cache
+
+
+_lock = threading.Lock()
+_threads = None
+_processes = None
+
+
+def _get_threads():
+    global _threads
+    with _lock:
+        if _threads is None:
+            _threads = ThreadPoolExecutor(
+                max_workers=max(1, settings.FILE_PARSE_WORKERS),
+                thread_name_prefix='parse-job'
+            )
+            # Pick up jobs left queued by a restarted process
+            for job_id in ParseJob.objects.filter(status='queued').values_list('id', flat=True):
+                _threads.submit(run_job, job_id)
+        return _threads
+
+
+def _get_processes():
+    global _processes
+    with _lock:
+        if _processes is None:
+            # spawn: forking a threaded web worker is unsafe
+            _processes = ProcessPoolExecutor(
+                max_workers=max(1, settings.FILE_PARSE_WORKERS),
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _processes
+
+
+def _reset_processes(broken):
+    global _processes
+    with _lock:
+        if _processes is broken:
+            _processes = None
+
+
+def _create_parsed_file(job, content, blob, analysis, summary):
+    """Create and index the ParsedFile of a job, sharing ``blob`` when given.
+
+    A shared blob is chunked and indexed once, by its first file, so
+    ``content`` may be None when ``blob`` is given.
+    """
+    with transaction.atomic():
+        parsed_file = ParsedFile.objects.create(
+            user=job.user,
+            original_name=job.original_name,
+            file_path=job.file_path,
+            file_type=job.file_type,
+            file_size=job.file_size,
+            parsed_content='' if blob is not None else content,
+            blob=blob,
+            metadata={
+                'description': job.description,
+                'upload_size': job.file_size,
+                'analysis': analysis,
+                'summary': summary,
+                'insights': analysis['insights'],
+                'job_id': str(job.pk)
+            }
+        )
+        if blob is not None:
+            ensure_blob_index(blob, content)
+        else:
+            index_file(parsed_file, content)
+    return parsed_file
+
+
+def enqueue(uploaded_file, file_path, file_type, description='', user=None, digest=''):
+    """Record a parse job for a saved upload and schedule it"""
+    job = ParseJob.objects.create(
+        user=user,
+        original_name=uploaded_file.name,
+        file_path=file_path,
+        file_type=file_type,
+        file_size=uploaded_file.size,
+        digest=digest,
+        description=description
+    )
+    if settings.FILE_PARSE_IN_WEB:
+        transaction.on_commit(lambda: _get_threads().submit(run_job, job.pk))
+    return job
+
+
+def _set_stage(job, stage, progress):
+    ParseJob.objects.filter(pk=job.pk).update(stage=stage, progress=progress)
+
+
+def _extract(job):
+    pool = _get_processes()
+    try:
+        if job.file_type == 'pdf' and pdf_page_count(job.file_path) >= settings.FILE_PDF_PARALLEL_MIN_PAGES:
+            # Page ranges of a large PDF go to this same pool, which bounds
+            # the parse processes at FILE_PARSE_WORKERS
+            content = ''.join(iter_pdf(job.file_path, settings.FILE_PARSE_WORKERS, executor=pool))
+            return pool.submit(analyze_text, content, job.file_type).result()
+        return pool.submit(extract_file, job.file_path, job.original_name, job.file_type).result()
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory); start a fresh pool next time
+        _reset_processes(pool)
+        raise
+
+
+def run_job(job_id):
+    """Run one queued job; returns False if another worker already claimed it"""
+    try:
+        claimed = ParseJob.objects.filter(pk=job_id, status='queued').update(
+            status='running', stage='parsing', progress=10, started_at=timezone.now()
+        )
+        if not claimed:
+            return False
+
+        job = ParseJob.objects.get(pk=job_id)
+        try:
+            content, content_analysis, summary = _extract(job)
+            _set_stage(job, 'indexing', 80)
+
+            blob = parse_cache.store(job.digest, job.file_type, content, content_analysis, summary)
+            analysis = with_file_name(content_analysis, job.original_name)
+            parsed_file = _create_parsed_file(job, content, blob, analysis, summary)
+
+            ParseJob.objects.filter(pk=job.pk).update(
+                status='done', stage='done', progress=100,
+                file=parsed_file, finished_at=timezone.now()
+            )
+        except Exception as e:
+            ParseJob.objects.filter(pk=job.pk).update(
+                status='failed', stage='failed',
+                error=f'Failed to parse file: {str(e)}', finished_at=timezone.now()
+            )
+        finally:
+            # Clean up temporary file
+            if os.path.exists(job.file_path):
+                os.remove(job.file_path)
+        return True
+    finally:
+        # Pool threads outlive requests, so release their connections here
+        connections.close_all()
+
+
+def complete_from_cache(uploaded_file, blob, file_type, description='', user=None, digest=''):
+    """Record an already finished job for an upload found in the parse cache"""
+    now = timezone.now()
+    job = ParseJob.objects.create(
+        user=user,
+        original_name=uploaded_file.name,
+        file_type=file_type,
+        file_size=uploaded_file.size,
+        digest=digest,
+        description=description,
+        status='done',
+        stage='cached',
+        progress=100,
+        started_at=now,
+        finished_at=now
+    )
+    analysis = with_file_name(blob.analysis, job.original_name)
+    job.file = _create_parsed_file(job, None, blob, analysis, blob.summary)
+    job.save(update_fields=['file'])
+    return job
+
+
+def requeue_stale(older_than):
+    """Put jobs stuck in ``running`` for ``older_than`` seconds back in the queue"""
+    cutoff = timezone.now() - timedelta(seconds=older_than)
+    return ParseJob.objects.filter(status='running', started_at__lt=cutoff).update(
+        status='queued', stage='', progress=0, started_at=None
+    )
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from fileparser import parse_cache
+
+
+class Command(BaseCommand):
+    help = 'Show parse cache counters and delete orphaned parse blobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--gc', action='store_true',
+            help='Delete orphaned blobs past FILE_PARSE_CACHE_ORPHAN_TTL or the size cap'
+        )
+        parser.add_argument(
+            '--orphan-ttl', type=int, metavar='SECONDS',
+            help='Override FILE_PARSE_CACHE_ORPHAN_TTL for this run'
+        )
+
+    def handle(self, *args, **options):
+        if options['gc']:
+            deleted = parse_cache.collect_garbage(orphan_ttl=options['orphan_ttl'])
+            self.stdout.write(f'Deleted {deleted} orphaned blobs')
+
+        stats = parse_cache.stats()
+        self.stdout.write(
+            f"Blobs: {stats['blobs']} ({stats['chars']} chars), "
+            f"orphaned: {stats['orphaned_blobs']} ({stats['orphaned_chars']} chars)"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Hits: {stats['hits']}, misses: {stats['misses']}, "
+            f"hit rate: {stats['hit_rate']:.1%}"
+        ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from fileparser.vectors import get_index
+
+
+class Command(BaseCommand):
+    help = 'Re-embed all file chunks and compact the semantic vector index'
+
+    def handle(self, *args, **options):
+        index = get_index()
+        total = index.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Embedded {total} chunks with {index.embedder.name} into {index.directory}'
+        ))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from fileparser.models import ParsedFile
+from fileparser.retrieval import index_file
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the retrieval chunks and BM25 postings of parsed files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--missing', action='store_true',
+            help='Only index files that have no chunks yet'
+        )
+
+    def handle(self, *args, **options):
+        files = ParsedFile.objects.select_related('blob').defer('parsed_content', 'blob__content')
+        if options['missing']:
+            files = files.filter(
+                Q(blob__isnull=True, chunks__isnull=True) | Q(blob__isnull=False, blob__chunks__isnull=True)
+            ).distinct()
+        total = 0
+        blobs = set()
+        for parsed_file in files.iterator(chunk_size=50):
+            # Files sharing a blob share its chunks; index those once
+            if parsed_file.blob_id in blobs:
+                continue
+            if parsed_file.blob_id:
+                blobs.add(parsed_file.blob_id)
+            total += index_file(parsed_file)
+            self.stdout.write(f'Indexed {parsed_file.original_name}')
+        self.stdout.write(self.style.SUCCESS(f'Indexed {total} chunks'))
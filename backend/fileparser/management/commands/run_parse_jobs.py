@@ -0,0 +1,42 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from fileparser.jobs import requeue_stale, run_job
+from fileparser.models import ParseJob
+
+
+class Command(BaseCommand):
+    help = 'Run queued file parse jobs (use with FILE_PARSE_IN_WEB=False)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Exit when the queue is empty instead of polling for new jobs'
+        )
+        parser.add_argument(
+            '--requeue-stale', type=int, metavar='SECONDS',
+            help='First requeue jobs left running for longer than SECONDS'
+        )
+
+    def handle(self, *args, **options):
+        if options['requeue_stale'] is not None:
+            count = requeue_stale(options['requeue_stale'])
+            self.stdout.write(f'Requeued {count} stale jobs')
+
+        workers = max(1, settings.FILE_PARSE_WORKERS)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='parse-job') as threads:
+            while True:
+                job_ids = list(
+                    ParseJob.objects.filter(status='queued')
+                    .order_by('created_at').values_list('id', flat=True)[:workers * 4]
+                )
+                if job_ids:
+                    done, _ = wait([threads.submit(run_job, job_id) for job_id in job_ids])
+                    ran = sum(1 for future in done if future.result())
+                    self.stdout.write(f'Ran {ran} jobs')
+                elif options['once']:
+                    break
+                else:
+                    time.sleep(settings.FILE_PARSE_POLL_INTERVAL)
+        self.stdout.write(self.style.SUCCESS('Parse queue empty'))
@@ -0,0 +1,40 @@
+# Generated by Django 5.0.1 on 2026-10-16 22:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fileparser', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FileChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ordinal', models.PositiveIntegerField()),
+                ('content', models.TextField()),
+                ('length', models.PositiveIntegerField()),
+                ('file', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='fileparser.parsedfile')),
+            ],
+            options={
+                'ordering': ['file', 'ordinal'],
+                'unique_together': {('file', 'ordinal')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ChunkTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('frequency', models.PositiveIntegerField()),
+                ('chunk', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='postings', to='fileparser.filechunk')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['term', 'chunk'], name='fileparser__term_8adfcb_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,55 @@
+from django.db import migrations
+
+
+# The DDL is inlined so later changes to fileparser.search cannot change what
+# this migration does
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE fileparser_parsedfile_fts USING fts5("
+            "original_name, content, tokenize='porter unicode61')"
+        )
+        schema_editor.execute(
+            "INSERT INTO fileparser_parsedfile_fts (rowid, original_name, content) "
+            "SELECT id, original_name, parsed_content FROM fileparser_parsedfile"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE TABLE fileparser_parsedfile_search ("
+            "file_id bigint PRIMARY KEY REFERENCES fileparser_parsedfile (id) "
+            "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            "content text NOT NULL, document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX fileparser_parsedfile_search_document_idx "
+            "ON fileparser_parsedfile_search USING GIN (document)"
+        )
+        schema_editor.execute(
+            "INSERT INTO fileparser_parsedfile_search (file_id, content, document) "
+            "SELECT id, parsed_content, "
+            "setweight(to_tsvector('english', original_name), 'A') || "
+            "setweight(to_tsvector('english', parsed_content), 'B') "
+            "FROM fileparser_parsedfile"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS fileparser_parsedfile_fts")
+    elif vendor == 'postgresql':
+        schema_editor.execute("DROP TABLE IF EXISTS fileparser_parsedfile_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fileparser', '0002_filechunk_chunkterm'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.0.1 on 2026-10-16 22:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fileparser', '0004_parsejob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='parsejob',
+            name='digest',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AlterField(
+            model_name='parsedfile',
+            name='parsed_content',
+            field=models.TextField(blank=True),
+        ),
+        migrations.CreateModel(
+            name='ParsedBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64)),
+                ('file_type', models.CharField(max_length=50)),
+                ('content', models.TextField()),
+                ('content_length', models.PositiveIntegerField()),
+                ('analysis', models.JSONField(blank=True, default=dict)),
+                ('summary', models.TextField(blank=True)),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['last_used_at'], name='fileparser__last_us_890ad3_idx')],
+                'unique_together': {('digest', 'file_type')},
+            },
+        ),
+        migrations.AddField(
+            model_name='parsedfile',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='files', to='fileparser.parsedblob'),
+        ),
+    ]
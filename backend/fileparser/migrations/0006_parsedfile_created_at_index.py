@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-16 23:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fileparser', '0005_parsedblob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='parsedfile',
+            index=models.Index(fields=['created_at'], name='fileparser__created_fbf57d_idx'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.0.1 on 2026-10-17 00:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def move_chunks_to_blobs(apps, schema_editor):
+    """Keep one file's chunks per blob, owned by the blob; drop the copies"""
+    ParsedFile = apps.get_model('fileparser', 'ParsedFile')
+    FileChunk = apps.get_model('fileparser', 'FileChunk')
+    files = ParsedFile.objects.filter(blob__isnull=False, chunks__isnull=False).distinct()
+    kept = {}
+    for file_id, blob_id in files.order_by('id').values_list('id', 'blob_id'):
+        if blob_id in kept:
+            FileChunk.objects.filter(file_id=file_id).delete()
+        else:
+            kept[blob_id] = file_id
+            FileChunk.objects.filter(file_id=file_id).update(file=None, blob_id=blob_id)
+
+
+def move_chunks_to_files(apps, schema_editor):
+    """Give each blob's chunks to its first file; ``reindex_files --missing`` indexes the others"""
+    ParsedFile = apps.get_model('fileparser', 'ParsedFile')
+    FileChunk = apps.get_model('fileparser', 'FileChunk')
+    for blob_id in FileChunk.objects.filter(blob__isnull=False).values_list('blob_id', flat=True).distinct():
+        file_id = ParsedFile.objects.filter(blob_id=blob_id).order_by('id').values_list('id', flat=True).first()
+        chunks = FileChunk.objects.filter(blob_id=blob_id)
+        if file_id is None:
+            chunks.delete()
+        else:
+            chunks.update(file_id=file_id, blob=None)
+    FileChunk.objects.filter(file__isnull=True).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fileparser', '0006_parsedfile_created_at_index'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='filechunk',
+            options={'ordering': ['file', 'blob', 'ordinal']},
+        ),
+        migrations.AlterUniqueTogether(
+            name='filechunk',
+            unique_together={('file', 'ordinal')},
+        ),
+        migrations.AddField(
+            model_name='filechunk',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='fileparser.parsedblob'),
+        ),
+        migrations.AlterField(
+            model_name='filechunk',
+            name='file',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='fileparser.parsedfile'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='filechunk',
+            unique_together={('blob', 'ordinal'), ('file', 'ordinal')},
+        ),
+        migrations.RunPython(move_chunks_to_blobs, move_chunks_to_files),
+        migrations.AddConstraint(
+            model_name='filechunk',
+            constraint=models.CheckConstraint(check=models.Q(models.Q(('blob__isnull', True), ('file__isnull', False)), models.Q(('blob__isnull', False), ('file__isnull', True)), _connector='OR'), name='filechunk_file_or_blob'),
+        ),
+    ]
@@ -0,0 +1,79 @@
+from django.db import migrations
+
+
+# Blob text is indexed once per blob instead of once per file: an FTS5 table
+# with the blob table as external content on SQLite (no copy of the text), a
+# tsvector table on PostgreSQL. File entries keep the name and only the text
+# of files without a blob. The DDL is inlined, as in 0003.
+
+
+def create_blob_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute("DELETE FROM fileparser_parsedfile_fts")
+        schema_editor.execute(
+            "INSERT INTO fileparser_parsedfile_fts (rowid, original_name, content) "
+            "SELECT id, original_name, parsed_content FROM fileparser_parsedfile"
+        )
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE fileparser_parsedblob_fts USING fts5("
+            "content, content='fileparser_parsedblob', content_rowid='id', tokenize='porter unicode61')"
+        )
+        schema_editor.execute("INSERT INTO fileparser_parsedblob_fts (fileparser_parsedblob_fts) VALUES ('rebuild')")
+    elif vendor == 'postgresql':
+        # Headlines are built from the file and blob tables
+        schema_editor.execute("ALTER TABLE fileparser_parsedfile_search DROP COLUMN content")
+        schema_editor.execute(
+            "UPDATE fileparser_parsedfile_search s SET document = "
+            "setweight(to_tsvector('english', f.original_name), 'A') || "
+            "setweight(to_tsvector('english', f.parsed_content), 'B') "
+            "FROM fileparser_parsedfile f WHERE s.file_id = f.id AND f.blob_id IS NOT NULL"
+        )
+        schema_editor.execute(
+            "CREATE TABLE fileparser_parsedblob_search ("
+            "blob_id bigint PRIMARY KEY REFERENCES fileparser_parsedblob (id) "
+            "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX fileparser_parsedblob_search_document_idx "
+            "ON fileparser_parsedblob_search USING GIN (document)"
+        )
+        schema_editor.execute(
+            "INSERT INTO fileparser_parsedblob_search (blob_id, document) "
+            "SELECT id, setweight(to_tsvector('english', content), 'B') FROM fileparser_parsedblob"
+        )
+
+
+def drop_blob_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS fileparser_parsedblob_fts")
+        schema_editor.execute("DELETE FROM fileparser_parsedfile_fts")
+        schema_editor.execute(
+            "INSERT INTO fileparser_parsedfile_fts (rowid, original_name, content) "
+            "SELECT f.id, f.original_name, COALESCE(b.content, f.parsed_content) "
+            "FROM fileparser_parsedfile f LEFT JOIN fileparser_parsedblob b ON b.id = f.blob_id"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute("DROP TABLE IF EXISTS fileparser_parsedblob_search")
+        schema_editor.execute("ALTER TABLE fileparser_parsedfile_search ADD COLUMN content text NOT NULL DEFAULT ''")
+        schema_editor.execute(
+            "UPDATE fileparser_parsedfile_search s SET "
+            "content = COALESCE(b.content, f.parsed_content), "
+            "document = setweight(to_tsvector('english', f.original_name), 'A') || "
+            "setweight(to_tsvector('english', COALESCE(b.content, f.parsed_content)), 'B') "
+            "FROM fileparser_parsedfile f LEFT JOIN fileparser_parsedblob b ON b.id = f.blob_id "
+            "WHERE s.file_id = f.id"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fileparser', '0007_blob_chunks'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_blob_search_index, drop_blob_search_index),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.1 on 2026-10-17 12:05
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def count_chunks(apps, schema_editor):
+    """Create the stats row with the totals of the chunks already indexed"""
+    ChunkStats = apps.get_model('fileparser', 'ChunkStats')
+    FileChunk = apps.get_model('fileparser', 'FileChunk')
+    totals = FileChunk.objects.aggregate(count=Count('id'), length=Sum('length'))
+    ChunkStats.objects.create(pk=1, chunk_count=totals['count'], total_length=totals['length'] or 0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fileparser', '0008_parsedblob_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChunkStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chunk_count', models.PositiveBigIntegerField(default=0)),
+                ('total_length', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(count_chunks, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,27 @@
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
+import uuid
+
+
+class ParsedBlob(models.Model):
+    """Parsed text and analysis of one distinct upload, shared by identical files"""
+    digest = models.CharField(max_length=64)  # SHA-256 of the uploaded bytes
+    file_type = models.CharField(max_length=50)
+    content = models.TextField()
+    content_length = models.PositiveIntegerField()  # Characters
+    analysis = models.JSONField(default=dict, blank=True)  # Without name-based insights
+    summary = models.TextField(blank=True)
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = [('digest', 'file_type')]
+        indexes = [models.Index(fields=['last_used_at'])]
+
+    def __str__(self):
+        return f"{self.digest[:12]} ({self.file_type})"
 
 
 class ParsedFile(models.Model):
@@ -9,13 +31,112 @@ class ParsedFile(models.Model):
     file_path = models.CharField(max_length=500)
     file_type = models.CharField(max_length=50)
     file_size = models.BigIntegerField()
-    parsed_content = models.TextField()
+    parsed_content = models.TextField(blank=True)  # Empty when the text is in ``blob``
+    blob = models.ForeignKey(ParsedBlob, on_delete=models.PROTECT, null=True, blank=True, related_name='files')
     metadata = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        # File list and the most recent files given to the LLM
+        indexes = [models.Index(fields=['created_at'])]
 
     def __str__(self):
         return f"{self.original_name} ({self.file_type})"
+
+    @property
+    def content(self):
+        """Parsed text, from the shared blob when there is one"""
+        if self.blob_id:
+            return self.blob.content
+        return self.parsed_content
+
+
+def content_expression():
+    """Database expression for ``ParsedFile.content``, for annotations and filters"""
+    return Coalesce('blob__content', 'parsed_content')
+
+
+class FileChunk(models.Model):
+    """Chunk of parsed text, the unit of retrieval for LLM context.
+
+    Chunks of text shared through a ``ParsedBlob`` belong to the blob, so
+    identical uploads are chunked and indexed once; otherwise to the file.
+    """
+    file = models.ForeignKey(ParsedFile, on_delete=models.CASCADE, null=True, blank=True, related_name='chunks')
+    blob = models.ForeignKey(ParsedBlob, on_delete=models.CASCADE, null=True, blank=True, related_name='chunks')
+    ordinal = models.PositiveIntegerField()
+    content = models.TextField()
+    length = models.PositiveIntegerField()  # Number of indexed terms
+
+    class Meta:
+        ordering = ['file', 'blob', 'ordinal']
+        unique_together = [('file', 'ordinal'), ('blob', 'ordinal')]
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(file__isnull=False, blob__isnull=True) | models.Q(file__isnull=True, blob__isnull=False),
+                name='filechunk_file_or_blob'
+            )
+        ]
+
+    def __str__(self):
+        owner = f"blob {self.blob_id}" if self.blob_id else self.file.original_name
+        return f"{owner} [{self.ordinal}]"
+
+
+class ChunkTerm(models.Model):
+    """Posting of the BM25 inverted index over FileChunks"""
+    term = models.CharField(max_length=64)
+    chunk = models.ForeignKey(FileChunk, on_delete=models.CASCADE, related_name='postings')
+    frequency = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [models.Index(fields=['term', 'chunk'])]
+
+    def __str__(self):
+        return f"{self.term} -> {self.chunk_id} ({self.frequency})"
+
+
+class ChunkStats(models.Model):
+    """Totals over all FileChunks for BM25 (one row), kept current by
+    ``retrieval`` so a search does not scan the chunks"""
+    chunk_count = models.PositiveBigIntegerField(default=0)
+    total_length = models.PositiveBigIntegerField(default=0)  # Sum of FileChunk.length
+
+    def __str__(self):
+        return f"{self.chunk_count} chunks, {self.total_length} terms"
+
+
+class ParseJob(models.Model):
+    """Queued parse and analysis of an uploaded file (fileparser.jobs)"""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
+    original_name = models.CharField(max_length=255)
+    file_path = models.CharField(max_length=500)
+    file_type = models.CharField(max_length=50)
+    file_size = models.BigIntegerField()
+    digest = models.CharField(max_length=64, blank=True)  # SHA-256 of the upload
+    description = models.TextField(blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    stage = models.CharField(max_length=50, blank=True)
+    progress = models.PositiveSmallIntegerField(default=0)  # Percent
+    error = models.TextField(blank=True)
+    file = models.ForeignKey(ParsedFile, on_delete=models.SET_NULL, null=True, blank=True, related_name='jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [models.Index(fields=['status', 'created_at'])]
+
+    def __str__(self):
+        return f"{self.original_name} ({self.status})"
@@ -0,0 +1,120 @@
+"""
+Content-addressed cache of parsed uploads
+
+Uploads are hashed with SHA-256 while the request body streams in (see
+``uploadhandlers``). The parsed text, content analysis and summary of each
+distinct upload are stored once as a ``ParsedBlob`` keyed by digest and file
+type, and every ``ParsedFile`` of those bytes points at it instead of
+keeping its own copy of the text. A repeated upload skips saving and parsing
+altogether.
+
+Blobs that no file references any more are kept for
+FILE_PARSE_CACHE_ORPHAN_TTL seconds, up to FILE_PARSE_CACHE_MAX_ORPHAN_CHARS
+characters, so a file that was deleted and uploaded again still hits.
+``manage.py parse_cache --gc`` deletes the rest.
+"""
+
+import hashlib
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+from .models import ParsedBlob
+
+
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+def file_digest(uploaded_file):
+    """SHA-256 of an upload, as computed by the upload handlers when available"""
+    digest = getattr(uploaded_file, 'sha256', None)
+    if digest:
+        return digest
+    hasher = hashlib.sha256()
+    for chunk in uploaded_file.chunks(HASH_CHUNK_SIZE):
+        hasher.update(chunk)
+    uploaded_file.seek(0)
+    return hasher.hexdigest()
+
+
+def lookup(digest, file_type):
+    """Return the blob of an upload already parsed, counting the hit, or None"""
+    if not settings.FILE_PARSE_CACHE_ENABLED or not digest:
+        return None
+    blob = ParsedBlob.objects.defer('content').filter(digest=digest, file_type=file_type).first()
+    if blob is None:
+        return None
+    ParsedBlob.objects.filter(pk=blob.pk).update(
+        hit_count=F('hit_count') + 1, last_used_at=timezone.now()
+    )
+    return blob
+
+
+def store(digest, file_type, content, analysis, summary):
+    """Return the blob for a freshly parsed upload, creating it if needed"""
+    if not settings.FILE_PARSE_CACHE_ENABLED or not digest:
+        return None
+    # An identical upload parsed concurrently may have created it first
+    blob, _ = ParsedBlob.objects.get_or_create(
+        digest=digest,
+        file_type=file_type,
+        defaults={
+            'content': content,
+            'content_length': len(content),
+            'analysis': analysis,
+            'summary': summary
+        }
+    )
+    return blob
+
+
+def stats():
+    """Counters of the cache over the blobs currently stored"""
+    totals = ParsedBlob.objects.aggregate(
+        blobs=Count('id'), hits=Sum('hit_count'), chars=Sum('content_length')
+    )
+    orphans = ParsedBlob.objects.filter(files__isnull=True).aggregate(
+        blobs=Count('id'), chars=Sum('content_length')
+    )
+    hits = totals['hits'] or 0
+    # Every blob was created by one miss
+    misses = totals['blobs']
+    lookups = hits + misses
+    return {
+        'blobs': totals['blobs'],
+        'chars': totals['chars'] or 0,
+        'orphaned_blobs': orphans['blobs'],
+        'orphaned_chars': orphans['chars'] or 0,
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / lookups if lookups else 0.0
+    }
+
+
+def collect_garbage(orphan_ttl=None, max_orphan_chars=None):
+    """Delete orphaned blobs past the TTL or beyond the size cap; returns the count.
+
+    Orphans are dropped least recently used first once their total size
+    exceeds ``max_orphan_chars``. Blobs still referenced are never deleted.
+    """
+    if orphan_ttl is None:
+        orphan_ttl = settings.FILE_PARSE_CACHE_ORPHAN_TTL
+    if max_orphan_chars is None:
+        max_orphan_chars = settings.FILE_PARSE_CACHE_MAX_ORPHAN_CHARS
+
+    # Deleting runs the search-index signals; they need no text in memory
+    orphans = ParsedBlob.objects.filter(files__isnull=True).defer('content')
+    cutoff = timezone.now() - timedelta(seconds=orphan_ttl)
+    deleted, _ = orphans.filter(last_used_at__lt=cutoff).delete()
+
+    kept_chars = 0
+    excess = []
+    for pk, length in orphans.order_by('-last_used_at').values_list('pk', 'content_length'):
+        kept_chars += length
+        if kept_chars > max_orphan_chars:
+            excess.append(pk)
+    if excess:
+        # Re-check: a file may have started using one of them meanwhile
+        count, _ = orphans.filter(pk__in=excess).delete()
+        deleted += count
+    return deleted
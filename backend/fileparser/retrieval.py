@@ -0,0 +1,258 @@
+"""
+Chunking and BM25 retrieval over parsed file content
+
+Files are split into overlapping chunks at upload time and indexed in the
+``ChunkTerm`` inverted index; text shared through a ``ParsedBlob`` is chunked
+once, into chunks of the blob, however many files have it. The chat path asks
+for the top-k chunks that match the user's message instead of sending the
+start of every recent file.
+With ``FILE_RETRIEVAL_MODE = 'semantic'`` chunks are also embedded into the
+vector index in ``vectors`` and retrieval ranks by embedding similarity.
+"""
+
+import heapq
+import math
+import re
+from collections import Counter
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Sum
+from .models import ChunkStats, ChunkTerm, FileChunk, ParsedFile
+
+
+STATS_ID = 1  # The ChunkStats row, created by migration 0009
+BM25_K1 = 1.2
+BM25_B = 0.75
+MAX_TERM_LENGTH = 64
+
+STOPWORDS = frozenset('''
+a about above after again all am an and any are as at be because been before
+being below between both but by can could did do does doing down during each
+few for from further had has have having he her here hers him his how i if in
+into is it its itself just me more most my no nor not now of off on once only
+or other our ours out over own same she should so some such than that the
+their theirs them then there these they this those through to too under until
+up very was we were what when where which while who whom why will with would
+you your yours
+'''.split())
+
+_WORD_PATTERN = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Lowercased index terms of ``text`` without stopwords"""
+    return [
+        word[:MAX_TERM_LENGTH]
+        for word in _WORD_PATTERN.findall(text.lower())
+        if word not in STOPWORDS
+    ]
+
+
+def chunk_text(text, size=None, overlap=None):
+    """Split ``text`` into chunks of about ``size`` characters.
+
+    Chunks break on whitespace and overlap by about ``overlap`` characters so
+    a passage cut at a boundary still appears whole in one chunk.
+    """
+    size = size or settings.FILE_CHUNK_SIZE
+    overlap = settings.FILE_CHUNK_OVERLAP if overlap is None else overlap
+    chunks = []
+    start = 0
+    length = len(text)
+    while start < length:
+        end = min(start + size, length)
+        if end < length:
+            split = text.rfind(' ', start + size // 2, end)
+            if split != -1:
+                end = split
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= length:
+            break
+        next_start = end - overlap
+        if next_start > start:
+            space = text.find(' ', next_start, end)
+            start = space + 1 if space != -1 else next_start
+        else:
+            start = end
+    return chunks
+
+
+def _create_chunks(content, **owner):
+    """Chunk ``content`` and insert the chunks and postings of ``owner`` (``file=`` or ``blob=``)"""
+    chunk_texts = chunk_text(content)
+    chunk_terms = [Counter(tokenize(text)) for text in chunk_texts]
+    chunks = FileChunk.objects.bulk_create([
+        FileChunk(
+            **owner,
+            ordinal=ordinal,
+            content=text,
+            length=sum(terms.values())
+        )
+        for ordinal, (text, terms) in enumerate(zip(chunk_texts, chunk_terms))
+    ])
+    # Postings run to hundreds of thousands of rows for large files; skip
+    # building a model instance per row
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {ChunkTerm._meta.db_table} (term, chunk_id, frequency) VALUES (%s, %s, %s)",
+            [
+                (term, chunk.id, frequency)
+                for chunk, terms in zip(chunks, chunk_terms)
+                for term, frequency in terms.items()
+            ]
+        )
+    if settings.FILE_RETRIEVAL_MODE == 'semantic':
+        from .vectors import add_chunks
+        transaction.on_commit(lambda: add_chunks(chunks))
+    _update_stats(len(chunks), sum(chunk.length for chunk in chunks))
+    return chunks
+
+
+def delete_chunks(**owner):
+    """Delete the chunks of ``owner`` (``file=`` or ``blob=``) and take them off the stats"""
+    chunks = FileChunk.objects.filter(**owner)
+    with transaction.atomic():
+        totals = chunks.aggregate(count=Count('id'), length=Sum('length'))
+        if totals['count']:
+            chunks.delete()
+            _update_stats(-totals['count'], -totals['length'])
+
+
+def _update_stats(count, length):
+    """Add ``count`` chunks of ``length`` terms in all to ``ChunkStats``"""
+    if not count:
+        return
+    updated = ChunkStats.objects.filter(pk=STATS_ID).update(
+        chunk_count=F('chunk_count') + count, total_length=F('total_length') + length
+    )
+    if not updated:
+        # The row is gone (e.g. a flushed database); count the chunks once
+        totals = FileChunk.objects.aggregate(count=Count('id'), length=Sum('length'))
+        ChunkStats.objects.update_or_create(
+            pk=STATS_ID, defaults={'chunk_count': totals['count'], 'total_length': totals['length'] or 0}
+        )
+
+
+def chunk_stats():
+    """``(chunk count, average chunk length)`` of the BM25 corpus"""
+    stats = ChunkStats.objects.filter(pk=STATS_ID).values_list('chunk_count', 'total_length').first()
+    if not stats or not stats[0]:
+        return 0, 0
+    return stats[0], stats[1] / stats[0]
+
+
+def index_file(parsed_file, content=None):
+    """(Re)build the chunks and postings of ``parsed_file`` (of its blob when
+    it has one); returns the chunk count"""
+    if parsed_file.blob_id:
+        return index_blob(parsed_file.blob, content)
+    if content is None:
+        content = parsed_file.parsed_content
+    with transaction.atomic():
+        delete_chunks(file=parsed_file)
+        return len(_create_chunks(content, file=parsed_file))
+
+
+def index_blob(blob, content=None):
+    """(Re)build the chunks and postings of ``blob``, shared by all its files"""
+    if content is None:
+        content = blob.content
+    with transaction.atomic():
+        delete_chunks(blob=blob)
+        return len(_create_chunks(content, blob=blob))
+
+
+def ensure_blob_index(blob, content=None):
+    """Index ``blob`` unless it already is; returns the number of chunks created.
+
+    The blob's text is only read (from ``content`` or the database) when it
+    has no chunks yet, so an upload served from the parse cache does not load
+    it at all.
+    """
+    if FileChunk.objects.filter(blob=blob).exists():
+        return 0
+    if content is None:
+        content = blob.content
+    try:
+        with transaction.atomic():
+            return len(_create_chunks(content, blob=blob))
+    except IntegrityError:
+        # Indexed at the same time by another upload of the same bytes
+        return 0
+
+
+def drop_unused_blob_index(blob_id):
+    """Delete the chunks of a blob that no file uses any more"""
+    if not ParsedFile.objects.filter(blob_id=blob_id).exists():
+        delete_chunks(blob_id=blob_id)
+
+
+def get_chunks(chunk_ids):
+    """``{id: FileChunk}`` for ``chunk_ids``, with ``source_file`` set on each chunk.
+
+    That is the chunk's file, or for a chunk of a shared blob the most recent
+    file with that blob. Chunks of a blob no file uses are left out.
+    """
+    chunks = (
+        FileChunk.objects.select_related('file')
+        .defer('file__parsed_content')
+        .order_by()
+        .in_bulk(chunk_ids)
+    )
+    blob_ids = {chunk.blob_id for chunk in chunks.values() if chunk.blob_id}
+    latest = {}
+    if blob_ids:
+        # Picked here rather than sorted by the database
+        for parsed_file in ParsedFile.objects.defer('parsed_content').filter(blob_id__in=blob_ids).order_by():
+            current = latest.get(parsed_file.blob_id)
+            if current is None or (parsed_file.created_at, parsed_file.id) > (current.created_at, current.id):
+                latest[parsed_file.blob_id] = parsed_file
+    for chunk in chunks.values():
+        chunk.source_file = chunk.file if chunk.file_id else latest.get(chunk.blob_id)
+    return {chunk_id: chunk for chunk_id, chunk in chunks.items() if chunk.source_file is not None}
+
+
+def retrieve(query, k=None):
+    """Return the top ``k`` chunks for ``query`` using FILE_RETRIEVAL_MODE"""
+    if settings.FILE_RETRIEVAL_MODE == 'semantic':
+        from .vectors import search as semantic_search
+        return semantic_search(query, k)
+    return search(query, k)
+
+
+def search(query, k=None):
+    """Return up to ``k`` ``(FileChunk, score)`` pairs ranked by BM25"""
+    k = k or settings.FILE_RETRIEVAL_TOP_K
+    terms = set(tokenize(query))
+    if not terms:
+        return []
+
+    total, avg_length = chunk_stats()
+    if not total:
+        return []
+    avg_length = avg_length or 1
+
+    document_frequency = dict(
+        ChunkTerm.objects.filter(term__in=terms)
+        .values('term')
+        .annotate(df=Count('id'))
+        .values_list('term', 'df')
+    )
+    idf = {
+        term: math.log(1 + (total - df + 0.5) / (df + 0.5))
+        for term, df in document_frequency.items()
+    }
+
+    scores = Counter()
+    postings = ChunkTerm.objects.filter(term__in=idf.keys()).values_list(
+        'term', 'chunk_id', 'frequency', 'chunk__length'
+    )
+    for term, chunk_id, frequency, length in postings.iterator(chunk_size=2000):
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+        scores[chunk_id] += idf[term] * frequency * (BM25_K1 + 1) / (frequency + norm)
+
+    top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+    chunks = get_chunks([chunk_id for chunk_id, _ in top])
+    return [(chunks[chunk_id], score) for chunk_id, score in top if chunk_id in chunks]
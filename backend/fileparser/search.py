@@ -0,0 +1,194 @@
+"""
+Full-text search over parsed files
+
+SQLite uses FTS5 virtual tables and PostgreSQL tsvector tables with GIN
+indexes, created by migrations 0003 and 0008 and kept in sync by the signal
+handlers in ``signals``. Files are indexed by name and own text; text shared
+through a ``ParsedBlob`` is indexed once, in an entry of the blob (an FTS5
+table whose content is the blob table itself, so the text is not copied). Other backends fall back to a substring
+scan. Searches return ranked, paginated hits with highlighted snippets
+instead of whole documents.
+"""
+
+import html
+import re
+from django.db import connection
+from django.db.models.functions import Substr
+from .models import ParsedFile, content_expression
+
+
+SQLITE_TABLE = 'fileparser_parsedfile_fts'
+SQLITE_BLOB_TABLE = 'fileparser_parsedblob_fts'
+POSTGRES_TABLE = 'fileparser_parsedfile_search'
+POSTGRES_BLOB_TABLE = 'fileparser_parsedblob_search'
+
+SNIPPET_WORDS = 24
+
+# Highlight markers the database puts around matches; private-use characters,
+# so they survive HTML escaping and are replaced with tags afterwards
+_START = '\ue000'
+_STOP = '\ue001'
+
+_WORD_PATTERN = re.compile(r'\w+')
+
+
+def index_document(file_id, original_name, content):
+    """Insert or replace the search entry of one file.
+
+    ``content`` is the file's own text, empty when it shares a blob.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f"DELETE FROM {SQLITE_TABLE} WHERE rowid = %s", [file_id])
+            cursor.execute(
+                f"INSERT INTO {SQLITE_TABLE} (rowid, original_name, content) VALUES (%s, %s, %s)",
+                [file_id, original_name, content]
+            )
+        elif connection.vendor == 'postgresql':
+            cursor.execute(
+                f"INSERT INTO {POSTGRES_TABLE} (file_id, document) VALUES "
+                "(%s, setweight(to_tsvector('english', %s), 'A') || "
+                "setweight(to_tsvector('english', %s), 'B')) "
+                "ON CONFLICT (file_id) DO UPDATE SET document = EXCLUDED.document",
+                [file_id, original_name, content]
+            )
+
+
+def remove_document(file_id):
+    """Delete the search entry of one file"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f"DELETE FROM {SQLITE_TABLE} WHERE rowid = %s", [file_id])
+        elif connection.vendor == 'postgresql':
+            cursor.execute(f"DELETE FROM {POSTGRES_TABLE} WHERE file_id = %s", [file_id])
+
+
+def index_blob(blob_id):
+    """Add the search entry of a new blob, read from its row"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(
+                f"INSERT INTO {SQLITE_BLOB_TABLE} (rowid, content) "
+                "SELECT id, content FROM fileparser_parsedblob WHERE id = %s",
+                [blob_id]
+            )
+        elif connection.vendor == 'postgresql':
+            cursor.execute(
+                f"INSERT INTO {POSTGRES_BLOB_TABLE} (blob_id, document) "
+                "SELECT id, setweight(to_tsvector('english', content), 'B') "
+                "FROM fileparser_parsedblob WHERE id = %s ON CONFLICT (blob_id) DO NOTHING",
+                [blob_id]
+            )
+
+
+def remove_blob(blob_id):
+    """Delete the search entry of a blob; call it before deleting the row"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            # The FTS5 table keeps no copy of the text, so a delete must be
+            # given the text that was indexed
+            cursor.execute(
+                f"INSERT INTO {SQLITE_BLOB_TABLE} ({SQLITE_BLOB_TABLE}, rowid, content) "
+                "SELECT 'delete', id, content FROM fileparser_parsedblob WHERE id = %s",
+                [blob_id]
+            )
+        elif connection.vendor == 'postgresql':
+            cursor.execute(f"DELETE FROM {POSTGRES_BLOB_TABLE} WHERE blob_id = %s", [blob_id])
+
+
+def _fts5_query(query):
+    # Quote every word so user input cannot inject FTS5 operators
+    return ' '.join(f'"{word}"' for word in _WORD_PATTERN.findall(query))
+
+
+# Matches on a file's own entry and on the entry of its blob; a file matched
+# by both (e.g. name and shared text) adds up the scores
+_SQLITE_HITS = (
+    f"SELECT rowid AS file_id, bm25({SQLITE_TABLE}, 10.0, 1.0) AS score, "
+    f"snippet({SQLITE_TABLE}, 1, '{_START}', '{_STOP}', '...', {SNIPPET_WORDS}) AS snippet "
+    f"FROM {SQLITE_TABLE} WHERE {SQLITE_TABLE} MATCH %s "
+    "UNION ALL "
+    f"SELECT f.id, bm25({SQLITE_BLOB_TABLE}), "
+    f"snippet({SQLITE_BLOB_TABLE}, 0, '{_START}', '{_STOP}', '...', {SNIPPET_WORDS}) "
+    f"FROM {SQLITE_BLOB_TABLE} JOIN fileparser_parsedfile f ON f.blob_id = {SQLITE_BLOB_TABLE}.rowid "
+    f"WHERE {SQLITE_BLOB_TABLE} MATCH %s"
+)
+
+_POSTGRES_HITS = (
+    "WITH q AS (SELECT websearch_to_tsquery('english', %s) AS q), hits AS ("
+    f"SELECT s.file_id, ts_rank_cd(s.document, q.q) AS score FROM {POSTGRES_TABLE} s, q "
+    "WHERE s.document @@ q.q "
+    "UNION ALL "
+    f"SELECT f.id, ts_rank_cd(b.document, q.q) FROM {POSTGRES_BLOB_TABLE} b "
+    "JOIN fileparser_parsedfile f ON f.blob_id = b.blob_id, q "
+    "WHERE b.document @@ q.q) "
+)
+
+
+def _highlight(snippet):
+    """Snippet as HTML: the text escaped, the matches in ``<mark>``"""
+    if not snippet:
+        return ''
+    return html.escape(snippet).replace(_START, '<mark>').replace(_STOP, '</mark>')
+
+
+def search(query, page=1, page_size=20):
+    """Return ``(total, hits)`` for one page of ranked results.
+
+    Each hit is ``{'id', 'snippet', 'score'}``, best first; ``snippet`` is
+    HTML, safe to insert as is.
+    """
+    offset = (page - 1) * page_size
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            match = _fts5_query(query)
+            if not match:
+                return 0, []
+            cursor.execute(f"SELECT count(DISTINCT file_id) FROM ({_SQLITE_HITS})", [match, match])
+            total = cursor.fetchone()[0]
+            # bm25() is lower for better matches. A file matched on its name
+            # alone has no snippet when its text is in a blob; show the start
+            cursor.execute(
+                "SELECT page.file_id, COALESCE(NULLIF(page.snippet, ''), ("
+                "SELECT substr(b.content, 1, 200) FROM fileparser_parsedfile f "
+                "JOIN fileparser_parsedblob b ON b.id = f.blob_id WHERE f.id = page.file_id)), total_score "
+                f"FROM (SELECT file_id, max(snippet) AS snippet, sum(score) AS total_score FROM ({_SQLITE_HITS}) "
+                "GROUP BY file_id ORDER BY total_score LIMIT %s OFFSET %s) page "
+                "ORDER BY total_score",
+                [match, match, page_size, offset]
+            )
+            hits = [
+                {'id': row[0], 'snippet': _highlight(row[1]), 'score': -row[2]}
+                for row in cursor.fetchall()
+            ]
+            return total, hits
+
+        if connection.vendor == 'postgresql':
+            cursor.execute(f"{_POSTGRES_HITS}SELECT count(DISTINCT file_id) FROM hits", [query])
+            total = cursor.fetchone()[0]
+            # Rank and page first so ts_headline only runs on the page's rows
+            cursor.execute(
+                f"{_POSTGRES_HITS}, ranked AS ("
+                "SELECT file_id, sum(score) AS score FROM hits "
+                "GROUP BY file_id ORDER BY score DESC LIMIT %s OFFSET %s) "
+                "SELECT ranked.file_id, ts_headline('english', COALESCE(b.content, f.parsed_content), q.q, "
+                f"'StartSel={_START}, StopSel={_STOP}, MaxWords={SNIPPET_WORDS}, MinWords=8'), ranked.score "
+                "FROM ranked JOIN fileparser_parsedfile f ON f.id = ranked.file_id "
+                "LEFT JOIN fileparser_parsedblob b ON b.id = f.blob_id, q "
+                "ORDER BY ranked.score DESC",
+                [query, page_size, offset]
+            )
+            hits = [
+                {'id': row[0], 'snippet': _highlight(row[1]), 'score': row[2]}
+                for row in cursor.fetchall()
+            ]
+            return total, hits
+
+    # Other backends: unranked substring scan
+    files = ParsedFile.objects.alias(text=content_expression()).filter(text__icontains=query)
+    total = files.count()
+    page_files = (
+        files.defer('parsed_content')
+        .annotate(snippet=Substr(content_expression(), 1, 200))[offset:offset + page_size]
+    )
+    return total, [{'id': f.id, 'snippet': _highlight(f.snippet), 'score': None} for f in page_files]
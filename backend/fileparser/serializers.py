@@ -1,8 +1,10 @@
 from rest_framework import serializers
-from .models import ParsedFile
+from .models import ParsedFile, ParseJob
 
 
 class ParsedFileSerializer(serializers.ModelSerializer):
+    parsed_content = serializers.CharField(source='content', read_only=True)
+
     class Meta:
         model = ParsedFile
         fields = [
@@ -15,3 +17,15 @@ class ParsedFileSerializer(serializers.ModelSerializer):
 class FileUploadSerializer(serializers.Serializer):
     file = serializers.FileField()
     description = serializers.CharField(required=False, allow_blank=True)
+
+
+class ParseJobSerializer(serializers.ModelSerializer):
+    file = ParsedFileSerializer(read_only=True)
+
+    class Meta:
+        model = ParseJob
+        fields = [
+            'id', 'original_name', 'file_type', 'file_size', 'status', 'stage',
+            'progress', 'error', 'file', 'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
@@ -0,0 +1,45 @@
+"""
+Signal handlers keeping the full-text search index in step with ParsedFile
+and ParsedBlob, dropping the chunks of blobs no file uses any more, and
+taking deleted chunks off the BM25 stats before the cascade removes them
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from .models import ParsedBlob, ParsedFile
+from .retrieval import delete_chunks, drop_unused_blob_index
+from . import search
+
+
+@receiver(post_save, sender=ParsedFile)
+def parsed_file_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not {'parsed_content', 'blob', 'original_name'} & set(update_fields):
+        return
+    # Text shared through a blob is in the blob's entry
+    search.index_document(instance.id, instance.original_name, instance.parsed_content)
+
+
+@receiver(pre_delete, sender=ParsedFile)
+def parsed_file_deleting(sender, instance, **kwargs):
+    if not instance.blob_id:
+        delete_chunks(file=instance)
+
+
+@receiver(post_delete, sender=ParsedFile)
+def parsed_file_deleted(sender, instance, **kwargs):
+    search.remove_document(instance.id)
+    if instance.blob_id:
+        drop_unused_blob_index(instance.blob_id)
+
+
+@receiver(post_save, sender=ParsedBlob)
+def parsed_blob_saved(sender, instance, created, **kwargs):
+    if created:
+        search.index_blob(instance.id)
+
+
+@receiver(pre_delete, sender=ParsedBlob)
+def parsed_blob_deleting(sender, instance, **kwargs):
+    # Before the row goes: SQLite reads the indexed text from it
+    search.remove_blob(instance.id)
+    delete_chunks(blob=instance)
@@ -0,0 +1,102 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models import Count, Sum
+from django.test import TestCase
+from core.query_plans import IndexedQueriesMixin
+from .models import FileChunk, ParsedFile, ParseJob
+from .retrieval import chunk_stats, index_file
+from . import jobs, parse_cache
+
+
+TEXT = 'Quarterly revenue grew in the northern region while costs fell. ' * 50
+UPLOAD = b'quarterly report'
+
+
+class QueryPlanTests(IndexedQueriesMixin, TestCase):
+    """The queries of the file views use indexes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        analysis = {'file_type': 'txt', 'insights': []}
+        # An upload already parsed once, so the next one is a cache hit
+        digest = parse_cache.file_digest(SimpleUploadedFile('report.txt', UPLOAD))
+        blob = parse_cache.store(digest, 'txt', TEXT, analysis, 'Summary')
+        job = ParseJob.objects.create(
+            original_name='report.txt', file_path='', file_type='txt', file_size=len(UPLOAD), digest=digest
+        )
+        jobs._create_parsed_file(job, TEXT, blob, analysis, 'Summary')
+        cls.own = ParsedFile.objects.create(
+            original_name='notes.txt', file_path='', file_type='txt', file_size=len(TEXT),
+            parsed_content=TEXT, metadata={'summary': 'Notes', 'insights': []}
+        )
+        index_file(cls.own)
+
+    def get(self, path):
+        response = self.client.get(path)
+        self.assertLess(response.status_code, 400, path)
+        return response
+
+    def test_upload_from_cache(self):
+        with self.assertIndexedQueries():
+            response = self.client.post('/api/file/upload/', {'file': SimpleUploadedFile('copy.txt', UPLOAD)})
+            self.assertEqual(response.status_code, 201)
+            self.get(f"/api/file/jobs/{response.json()['id']}/")
+
+    def test_file_views(self):
+        with self.assertIndexedQueries():
+            self.get('/api/file/')
+            self.get(f'/api/file/{self.own.id}/')
+
+    def test_search(self):
+        # Hits are ranked by a score computed per query
+        with self.assertIndexedQueries(allowed=['sorts in a temp B-tree']):
+            response = self.client.post(
+                '/api/file/search/', {'query': 'northern revenue'}, content_type='application/json'
+            )
+        self.assertEqual(response.json()['total'], 2)
+
+    def test_llm_context(self):
+        with self.assertIndexedQueries():
+            response = self.get('/api/file/llm-context/?query=northern+revenue')
+        self.assertTrue(response.json()['chunks'])
+
+    def test_delete_file(self):
+        with self.assertIndexedQueries():
+            response = self.client.delete(f'/api/file/{self.own.id}/delete/')
+        self.assertEqual(response.status_code, 200)
+
+
+class ChunkStatsTests(TestCase):
+    """The stored BM25 totals follow the chunk table"""
+
+    def assertStatsCurrent(self):
+        totals = FileChunk.objects.aggregate(count=Count('id'), length=Sum('length'))
+        count, avg_length = chunk_stats()
+        self.assertEqual(count, totals['count'])
+        if count:
+            self.assertAlmostEqual(avg_length, totals['length'] / count)
+
+    def test_index_and_delete(self):
+        analysis = {'file_type': 'txt', 'insights': []}
+        parsed_file = ParsedFile.objects.create(
+            original_name='notes.txt', file_path='', file_type='txt', file_size=len(TEXT),
+            parsed_content=TEXT, metadata={'insights': []}
+        )
+        index_file(parsed_file)
+        self.assertStatsCurrent()
+        # Reindexing replaces the file's chunks
+        index_file(parsed_file, TEXT[:2000])
+        self.assertStatsCurrent()
+
+        blob = parse_cache.store('0' * 64, 'txt', TEXT, analysis, 'Summary')
+        job = ParseJob.objects.create(
+            original_name='report.txt', file_path='', file_type='txt', file_size=len(UPLOAD), digest=blob.digest
+        )
+        shared = jobs._create_parsed_file(job, TEXT, blob, analysis, 'Summary')
+        self.assertStatsCurrent()
+
+        # Cascades: the file's own chunks, then the blob's once no file uses it
+        parsed_file.delete()
+        self.assertStatsCurrent()
+        shared.delete()
+        self.assertStatsCurrent()
+        self.assertEqual(chunk_stats()[0], 0)
@@ -3,6 +3,7 @@ from . import views
 
 urlpatterns = [
     path('upload/', views.upload_file, name='upload_file'),
+    path('jobs/<uuid:job_id>/', views.get_job, name='get_job'),
     path('', views.get_files, name='get_files'),
     path('<int:file_id>/', views.get_file, name='get_file'),
     path('<int:file_id>/delete/', views.delete_file, name='delete_file'),
@@ -1,81 +1,225 @@
+import atexit
+import io
+import math
+import multiprocessing
 import os
 import csv
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import PyPDF2
 from docx import Document
+from django.conf import settings
 from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
 
 
-def parse_pdf(file_path):
-    """Parse PDF file and extract text using PyPDF2"""
+TEXT_BLOCK_SIZE = 64 * 1024
+
+
+_worker_pdf = (None, None)  # (file key, PdfReader) in a PDF worker process
+
+
+def _pdf_page_texts(file_path, start, stop):
+    """Extract the text of pages ``start:stop``; runs in a PDF worker process"""
+    global _worker_pdf
+    stat = os.stat(file_path)
+    key = (file_path, stat.st_mtime_ns, stat.st_size)
+    if _worker_pdf[0] != key:
+        # Keep the reader for the worker's next range of the same file
+        with open(file_path, 'rb') as file:
+            _worker_pdf = (key, PyPDF2.PdfReader(io.BytesIO(file.read())))
+    pdf_reader = _worker_pdf[1]
+    return [pdf_reader.pages[index].extract_text() + "\n" for index in range(start, stop)]
+
+
+_pdf_pools = {}
+_pdf_pools_lock = threading.Lock()
+
+
+def _get_pdf_pool(workers):
+    with _pdf_pools_lock:
+        if workers not in _pdf_pools:
+            if not _pdf_pools:
+                atexit.register(shutdown_pdf_pools)
+            _pdf_pools[workers] = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context('spawn')
+            )
+        return _pdf_pools[workers]
+
+
+def shutdown_pdf_pools():
+    """Stop the processes of the PDF pools; runs at exit once a pool exists"""
+    with _pdf_pools_lock:
+        pools = list(_pdf_pools.values())
+        _pdf_pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def pdf_page_ranges(page_count, workers):
+    """Split ``page_count`` pages into ``(start, stop)`` ranges for ``workers``"""
+    # Several ranges per worker even out pages that are slower to extract
+    size = max(1, math.ceil(page_count / (workers * 4)))
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def pdf_page_count(file_path):
+    with open(file_path, 'rb') as file:
+        return len(PyPDF2.PdfReader(file).pages)
+
+
+def iter_pdf(file_path, workers=None, executor=None):
+    """Yield the text of a PDF page by page using PyPDF2.
+
+    PDFs with at least FILE_PDF_PARALLEL_MIN_PAGES pages are split into page
+    ranges extracted in parallel, by ``executor`` or by a shared pool of
+    ``workers`` processes (FILE_PDF_WORKERS by default); pages are still
+    yielded in order. A pool worker process extracts serially rather than
+    start processes of its own, which it would never shut down.
+    """
+    if workers is None:
+        workers = settings.FILE_PDF_WORKERS
+    if executor is None and multiprocessing.parent_process() is not None:
+        workers = 1
     try:
         with open(file_path, 'rb') as file:
             pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-        return text
+            page_count = len(pdf_reader.pages)
+            if workers <= 1 or page_count < settings.FILE_PDF_PARALLEL_MIN_PAGES:
+                for page in pdf_reader.pages:
+                    yield page.extract_text() + "\n"
+                return
+
+        ranges = pdf_page_ranges(page_count, workers)
+        results = (executor or _get_pdf_pool(workers)).map(
+            _pdf_page_texts,
+            [file_path] * len(ranges),
+            [start for start, _ in ranges],
+            [stop for _, stop in ranges]
+        )
+        for texts in results:
+            yield from texts
+    except BrokenProcessPool:
+        raise
     except Exception as e:
         raise Exception(f"Error parsing PDF: {str(e)}")
 
 
-def parse_docx(file_path):
-    """Parse DOCX file and extract text"""
+def iter_docx(file_path):
+    """Yield the text of a DOCX file paragraph by paragraph"""
     try:
         doc = Document(file_path)
-        text = ""
         for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text
+            yield paragraph.text + "\n"
     except Exception as e:
         raise Exception(f"Error parsing DOCX: {str(e)}")
 
 
-def parse_csv(file_path):
-    """Parse CSV file and extract text"""
+def iter_csv(file_path):
+    """Yield the text of a CSV file row by row"""
     try:
-        text = ""
         with open(file_path, 'r', encoding='utf-8', newline='') as file:
             csv_reader = csv.reader(file)
             for row in csv_reader:
-                text += ", ".join(row) + "\n"
-        return text
+                yield ", ".join(row) + "\n"
     except Exception as e:
         raise Exception(f"Error parsing CSV: {str(e)}")
 
 
-def parse_txt(file_path):
-    """Parse TXT file and extract text"""
+def iter_txt(file_path):
+    """Yield the text of a TXT file in fixed-size blocks"""
     try:
         with open(file_path, 'r', encoding='utf-8') as file:
-            return file.read()
+            while True:
+                block = file.read(TEXT_BLOCK_SIZE)
+                if not block:
+                    break
+                yield block
     except Exception as e:
         raise Exception(f"Error parsing TXT: {str(e)}")
 
 
+def parse_pdf(file_path):
+    """Parse PDF file and extract text using PyPDF2"""
+    return ''.join(iter_pdf(file_path))
+
+
+def parse_docx(file_path):
+    """Parse DOCX file and extract text"""
+    return ''.join(iter_docx(file_path))
+
+
+def parse_csv(file_path):
+    """Parse CSV file and extract text"""
+    return ''.join(iter_csv(file_path))
+
+
+def parse_txt(file_path):
+    """Parse TXT file and extract text"""
+    return ''.join(iter_txt(file_path))
+
+
 def get_file_type(filename):
     """Get file type from filename"""
     _, ext = os.path.splitext(filename.lower())
     return ext[1:] if ext else 'unknown'
 
 
-def parse_file(file_path, filename):
-    """Parse file based on its type"""
+PARSERS = {
+    'pdf': iter_pdf,
+    'docx': iter_docx,
+    'csv': iter_csv,
+    'txt': iter_txt,
+}
+
+
+def iter_file(file_path, filename):
+    """Yield a file's text incrementally based on its type"""
     file_type = get_file_type(filename)
-    
-    if file_type == 'pdf':
-        return parse_pdf(file_path)
-    elif file_type == 'docx':
-        return parse_docx(file_path)
-    elif file_type == 'csv':
-        return parse_csv(file_path)
-    elif file_type == 'txt':
-        return parse_txt(file_path)
-    else:
+    parser = PARSERS.get(file_type)
+    if parser is None:
         raise Exception(f"Unsupported file type: {file_type}")
+    return parser(file_path)
+
+
+def parse_file(file_path, filename):
+    """Parse file based on its type"""
+    # CPython grows a string with a single reference in place, so the text is
+    # held once. StringIO.getvalue() and ''.join() both briefly hold it twice
+    # (bench_parse_pipeline.py)
+    text = ''
+    for piece in iter_file(file_path, filename):
+        text += piece
+    return text
+
+
+def parse_file_to(file_path, filename, output):
+    """Parse a file, writing its text to the ``output`` stream as it is extracted"""
+    for piece in iter_file(file_path, filename):
+        output.write(piece)
 
 
 def save_uploaded_file(uploaded_file):
-    """Save uploaded file and return the path"""
-    file_name = default_storage.save(uploaded_file.name, ContentFile(uploaded_file.read()))
+    """Save uploaded file and return the path.
+
+    The storage backend copies the upload chunk by chunk, so the file is never
+    held in memory as a whole.
+    """
+    file_name = default_storage.save(uploaded_file.name, uploaded_file)
     return default_storage.path(file_name)
+
+
+def extract_file(file_path, filename, file_type):
+    """Parse and analyze a file; returns ``(content, analysis, summary)``.
+
+    The analysis leaves out the name-based insights (see
+    ``analysis.with_file_name``). Runs in the parse worker processes of
+    ``fileparser.jobs``, so it must not touch the database.
+    """
+    return analyze_text(parse_file(file_path, filename), file_type)
+
+
+def analyze_text(content, file_type):
+    """``(content, analysis, summary)`` of already extracted text"""
+    from .analysis import analyze_content, get_file_summary
+    return content, analyze_content(content, file_type), get_file_summary(content)
@@ -0,0 +1,249 @@
+"""
+Semantic retrieval over file chunks with a memory-mapped NumPy index
+
+Chunks are embedded on the CPU, either with a local sentence-transformers
+model (``FILE_EMBEDDING_MODEL``) or with a signed feature-hashing vectorizer
+over words and word bigrams. The hashing embedder is a lexical fallback for
+hosts without the model: it finds chunks sharing the query's words, not
+paraphrases, much like BM25. Embeddings are L2-normalised float32 rows
+appended to ``vectors.f32`` under ``FILE_VECTOR_INDEX_DIR``, with the chunk
+ids in ``ids.i64``. A query is one matrix-vector product over the
+memory-mapped matrix followed by ``argpartition`` for the top k.
+
+Rows of deleted or re-indexed chunks stay in the files until
+``manage.py rebuild_vectors`` compacts them; searches skip them.
+"""
+
+import json
+import os
+import threading
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+import numpy as np
+from django.conf import settings
+from .models import FileChunk
+from .retrieval import get_chunks, tokenize
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking
+    fcntl = None
+
+
+VECTORS_FILE = 'vectors.f32'
+IDS_FILE = 'ids.i64'
+META_FILE = 'meta.json'
+
+
+class HashingEmbedder:
+    """Dependency-free lexical embedder using signed feature hashing.
+
+    Unrelated words share buckets, so recall falls as ``dim`` shrinks: a query
+    of six words from a chunk finds it in the top 6 of 20,000 chunks 46% of
+    the time at 128 dimensions, 86% at 256 and 99% at 1024. Query time grows
+    with ``dim`` (bench_vector_retrieval.py), so the default of 128 keeps to
+    the 10ms budget at 100k chunks and more dimensions are opt-in.
+    """
+
+    def __init__(self, dim):
+        self.dim = dim
+        self.name = f'hashing-{dim}'
+
+    def _features(self, text):
+        terms = tokenize(text)
+        return terms + [f'{a} {b}' for a, b in zip(terms, terms[1:])]
+
+    def embed(self, texts):
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            hashes = np.fromiter(
+                (zlib.crc32(feature.encode()) for feature in self._features(text)),
+                dtype=np.uint32
+            )
+            if not hashes.size:
+                continue
+            signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+            np.add.at(matrix[row], hashes % self.dim, signs)
+        # Sublinear term frequency, then unit length so dot product is cosine
+        np.copyto(matrix, np.sign(matrix) * np.log1p(np.abs(matrix)))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+
+class SentenceTransformerEmbedder:
+    """Local sentence-transformers model pinned to the CPU"""
+
+    def __init__(self, model_name):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name, device='cpu')
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = model_name
+
+    def embed(self, texts):
+        return self.model.encode(
+            list(texts), batch_size=32, normalize_embeddings=True, convert_to_numpy=True
+        ).astype(np.float32)
+
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder():
+    """Return the configured embedder, falling back to feature hashing"""
+    global _embedder
+    if _embedder is None:
+        with _embedder_lock:
+            if _embedder is None:
+                embedder = None
+                if settings.FILE_EMBEDDING_MODEL:
+                    try:
+                        embedder = SentenceTransformerEmbedder(settings.FILE_EMBEDDING_MODEL)
+                    except ImportError:
+                        embedder = None
+                _embedder = embedder or HashingEmbedder(settings.FILE_EMBEDDING_DIM)
+    return _embedder
+
+
+class VectorIndex:
+    """Append-only float32 matrix of chunk embeddings on disk"""
+
+    def __init__(self, directory, embedder):
+        self.directory = Path(directory)
+        self.embedder = embedder
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._ids = None
+        self._mapped_key = None
+
+    @property
+    def vectors_path(self):
+        return self.directory / VECTORS_FILE
+
+    @property
+    def ids_path(self):
+        return self.directory / IDS_FILE
+
+    @contextmanager
+    def _file_lock(self):
+        # Writers in other worker processes append to the same files
+        with open(self.directory / '.lock', 'w') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def _check_meta(self):
+        meta_path = self.directory / META_FILE
+        meta = {'embedder': self.embedder.name, 'dim': self.embedder.dim}
+        if meta_path.exists():
+            stored = json.loads(meta_path.read_text())
+            if stored != meta:
+                raise ValueError(
+                    f"Vector index was built with {stored['embedder']}; "
+                    "run 'manage.py rebuild_vectors'"
+                )
+        else:
+            meta_path.write_text(json.dumps(meta))
+
+    def add(self, chunk_ids, texts):
+        """Embed ``texts`` and append them under ``chunk_ids``"""
+        if not chunk_ids:
+            return
+        matrix = self.embedder.embed(texts)
+        ids = np.asarray(chunk_ids, dtype=np.int64)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._file_lock():
+            self._check_meta()
+            with open(self.vectors_path, 'ab') as vectors_file:
+                vectors_file.write(np.ascontiguousarray(matrix).tobytes())
+            with open(self.ids_path, 'ab') as ids_file:
+                ids_file.write(ids.tobytes())
+
+    def _mapped(self):
+        """Memory-map the index, remapping when another writer has grown it"""
+        with self._lock:
+            try:
+                ids_stat = self.ids_path.stat()
+                vectors_stat = self.vectors_path.stat()
+            except FileNotFoundError:
+                return None, None
+            key = (ids_stat.st_ino, ids_stat.st_size, vectors_stat.st_ino)
+            if key != self._mapped_key:
+                dim = self.embedder.dim
+                rows = min(ids_stat.st_size // 8, vectors_stat.st_size // (4 * dim))
+                if rows == 0:
+                    return None, None
+                self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(rows, dim))
+                self._ids = np.memmap(self.ids_path, dtype=np.int64, mode='r', shape=(rows,))
+                self._mapped_key = key
+            return self._matrix, self._ids
+
+    def query(self, text, k):
+        """Return up to ``k`` ``(chunk_id, score)`` pairs, best first"""
+        matrix, ids = self._mapped()
+        if matrix is None:
+            return []
+        query = self.embedder.embed([text])[0]
+        scores = matrix @ query
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(ids[i]), float(scores[i])) for i in top]
+
+    def rebuild(self, batch_size=512):
+        """Rewrite the index from the current FileChunk table"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_vectors = self.directory / (VECTORS_FILE + '.tmp')
+        tmp_ids = self.directory / (IDS_FILE + '.tmp')
+        total = 0
+        with self._file_lock():
+            with open(tmp_vectors, 'wb') as vectors_file, open(tmp_ids, 'wb') as ids_file:
+                batch = []
+                rows = FileChunk.objects.order_by('id').values_list('id', 'content')
+                for row in rows.iterator(chunk_size=batch_size):
+                    batch.append(row)
+                    if len(batch) == batch_size:
+                        total += self._write_batch(batch, vectors_file, ids_file)
+                        batch = []
+                total += self._write_batch(batch, vectors_file, ids_file)
+            os.replace(tmp_vectors, self.vectors_path)
+            os.replace(tmp_ids, self.ids_path)
+            (self.directory / META_FILE).write_text(
+                json.dumps({'embedder': self.embedder.name, 'dim': self.embedder.dim})
+            )
+        return total
+
+    def _write_batch(self, batch, vectors_file, ids_file):
+        if not batch:
+            return 0
+        ids, texts = zip(*batch)
+        vectors_file.write(np.ascontiguousarray(self.embedder.embed(texts)).tobytes())
+        ids_file.write(np.asarray(ids, dtype=np.int64).tobytes())
+        return len(batch)
+
+
+_index = None
+
+
+def get_index():
+    """Return the process-wide vector index"""
+    global _index
+    if _index is None:
+        _index = VectorIndex(settings.FILE_VECTOR_INDEX_DIR, get_embedder())
+    return _index
+
+
+def add_chunks(chunks):
+    """Append embeddings for newly created FileChunks"""
+    get_index().add([chunk.id for chunk in chunks], [chunk.content for chunk in chunks])
+
+
+def search(query, k=None):
+    """Return up to ``k`` ``(FileChunk, score)`` pairs ranked by cosine similarity"""
+    k = k or settings.FILE_RETRIEVAL_TOP_K
+    # Over-fetch so rows of deleted chunks do not shrink the result
+    hits = get_index().query(query, k * 2)
+    chunks = get_chunks([chunk_id for chunk_id, _ in hits])
+    return [(chunks[chunk_id], score) for chunk_id, score in hits if chunk_id in chunks][:k]
@@ -1,19 +1,22 @@
 import os
 from django.conf import settings
+from django.db.models.functions import Substr
 from django.http import JsonResponse
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
-from .models import ParsedFile
-from .serializers import ParsedFileSerializer, FileUploadSerializer
-from .utils import parse_file, get_file_type, save_uploaded_file
+from .models import ParsedFile, ParseJob, content_expression
+from .serializers import ParsedFileSerializer, FileUploadSerializer, ParseJobSerializer
+from .utils import get_file_type, save_uploaded_file
+from .retrieval import retrieve
+from . import jobs, parse_cache, search
 
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def upload_file(request):
-    """Handle file upload and parsing"""
+    """Handle file upload and queue it for parsing"""
     serializer = FileUploadSerializer(data=request.data)
     if not serializer.is_valid():
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -38,56 +41,50 @@ def upload_file(request):
         )
 
     try:
-        # Save file temporarily
+        # Identical uploads reuse the cached parse without touching the disk
+        digest = parse_cache.file_digest(uploaded_file)
+        blob = parse_cache.lookup(digest, file_type)
+        if blob is not None:
+            job = jobs.complete_from_cache(uploaded_file, blob, file_type, description, digest=digest)
+            serializer = ParseJobSerializer(job)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+        # Save file temporarily; parsing runs in the background job queue
         file_path = save_uploaded_file(uploaded_file)
-        
-        # Parse file content
-        parsed_content = parse_file(file_path, uploaded_file.name)
-        
-        # Analyze file content
-        from .analysis import analyze_file_content, get_file_summary
-        analysis = analyze_file_content(parsed_content, uploaded_file.name, file_type)
-        file_summary = get_file_summary(parsed_content)
-        
-        # Create ParsedFile record with analysis
-        parsed_file = ParsedFile.objects.create(
-            original_name=uploaded_file.name,
-            file_path=file_path,
-            file_type=file_type,
-            file_size=uploaded_file.size,
-            parsed_content=parsed_content,
-            metadata={
-                'description': description,
-                'upload_size': uploaded_file.size,
-                'analysis': analysis,
-                'summary': file_summary,
-                'insights': analysis['insights']
-            }
-        )
-
-        # Clean up temporary file
-        if os.path.exists(file_path):
-            os.remove(file_path)
-
-        serializer = ParsedFileSerializer(parsed_file)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
-
+        job = jobs.enqueue(uploaded_file, file_path, file_type, description, digest=digest)
     except Exception as e:
         # Clean up file if it exists
         if 'file_path' in locals() and os.path.exists(file_path):
             os.remove(file_path)
-        
+
         return Response(
-            {'error': f'Failed to parse file: {str(e)}'}, 
+            {'error': f'Failed to queue file: {str(e)}'}, 
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+    serializer = ParseJobSerializer(job)
+    return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_job(request, job_id):
+    """Get the status and progress of a parse job"""
+    try:
+        job = ParseJob.objects.select_related('file__blob').get(id=job_id)
+    except ParseJob.DoesNotExist:
+        return Response(
+            {'error': 'Job not found'}, 
+            status=status.HTTP_404_NOT_FOUND
+        )
+    return Response(ParseJobSerializer(job).data)
+
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_files(request):
     """Get all parsed files"""
-    files = ParsedFile.objects.all()
+    files = ParsedFile.objects.select_related('blob')
     serializer = ParsedFileSerializer(files, many=True)
     return Response(serializer.data)
 
@@ -97,7 +94,7 @@ def get_files(request):
 def get_file(request, file_id):
     """Get specific parsed file"""
     try:
-        file_obj = ParsedFile.objects.get(id=file_id)
+        file_obj = ParsedFile.objects.select_related('blob').get(id=file_id)
         serializer = ParsedFileSerializer(file_obj)
         return Response(serializer.data)
     except ParsedFile.DoesNotExist:
@@ -125,7 +122,7 @@ def delete_file(request, file_id):
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def search_files(request):
-    """Search files by content"""
+    """Search files by content, returning ranked hits with snippets"""
     query = request.data.get('query', '')
     if not query:
         return Response(
@@ -133,17 +130,53 @@ def search_files(request):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    # Simple text search in parsed content
-    files = ParsedFile.objects.filter(parsed_content__icontains=query)
-    serializer = ParsedFileSerializer(files, many=True)
-    return Response(serializer.data)
+    try:
+        page = max(1, int(request.data.get('page', 1)))
+        page_size = min(100, max(1, int(request.data.get('page_size', 20))))
+    except (TypeError, ValueError):
+        return Response(
+            {'error': 'page and page_size must be integers'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    total, hits = search.search(query, page, page_size)
+    files = ParsedFile.objects.only(
+        'id', 'original_name', 'file_type', 'file_size', 'created_at'
+    ).in_bulk([hit['id'] for hit in hits])
+
+    results = []
+    for hit in hits:
+        file = files.get(hit['id'])
+        if file is None:
+            continue
+        results.append({
+            'id': file.id,
+            'original_name': file.original_name,
+            'file_type': file.file_type,
+            'file_size': file.file_size,
+            'created_at': file.created_at,
+            'snippet': hit['snippet'],
+            'score': hit['score']
+        })
+
+    return Response({
+        'query': query,
+        'page': page,
+        'page_size': page_size,
+        'total': total,
+        'results': results
+    })
 
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_files_for_llm(request):
-    """Get files formatted for LLM context"""
-    files = ParsedFile.objects.all().order_by('-created_at')[:5]
+    """Get files formatted for LLM context, with chunks relevant to ``?query=``"""
+    files = (
+        ParsedFile.objects.defer('parsed_content')
+        .annotate(preview=Substr(content_expression(), 1, 1000))
+        .order_by('-created_at')[:5]
+    )
     
     llm_context = []
     for file in files:
@@ -151,13 +184,26 @@ def get_files_for_llm(request):
             'id': file.id,
             'name': file.original_name,
             'type': file.file_type,
-            'summary': file.metadata.get('summary', file.parsed_content[:500]),
+            'summary': file.metadata.get('summary', file.preview[:500]),
             'insights': file.metadata.get('insights', []),
-            'content_preview': file.parsed_content[:1000]  # First 1000 chars for context
+            'content_preview': file.preview  # First 1000 chars for context
         }
         llm_context.append(context_item)
+
+    query = request.query_params.get('query', '')
+    chunks = [
+        {
+            'file_id': chunk.source_file.id,
+            'name': chunk.source_file.original_name,
+            'part': chunk.ordinal + 1,
+            'score': round(score, 4),
+            'content': chunk.content
+        }
+        for chunk, score in retrieve(query)
+    ] if query else []
     
     return Response({
         'files': llm_context,
-        'total_files': len(llm_context)
+        'total_files': len(llm_context),
+        'chunks': chunks
     })
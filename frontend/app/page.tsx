@@ -15,11 +15,11 @@ export default function Home() {
     // Load initial data
     const loadData = async () => {
       try {
-        const [sessions, files] = await Promise.all([
+        const [sessionsPage, files] = await Promise.all([
           chatApi.getSessions(),
           fileApi.getFiles(),
         ]);
-        setSessions(sessions);
+        setSessions(sessionsPage.sessions, sessionsPage.next_cursor);
         setFiles(files);
       } catch (error) {
         console.error('Failed to load initial data:', error);
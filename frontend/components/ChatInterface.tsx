@@ -2,13 +2,14 @@
 
 import { useState, useRef, useEffect } from 'react';
 import { useChatStore } from '@/lib/store';
-import { chatApi } from '@/lib/api';
+import { chatApi, toMessages, MESSAGE_PAGE_SIZE } from '@/lib/api';
 import Message from './Message';
 import { Send, Loader2 } from 'lucide-react';
 
 export default function ChatInterface() {
   const {
     messages,
+    hasOlderMessages,
     isLoading,
     error,
     currentSessionId,
@@ -18,19 +19,51 @@ export default function ChatInterface() {
     setError,
     setCurrentSession,
     setSessions,
+    prependMessages,
   } = useChatStore();
 
   const [input, setInput] = useState('');
   const messagesEndRef = useRef<HTMLDivElement>(null);
+  const messagesRef = useRef<HTMLDivElement>(null);
+  const [isLoadingOlder, setIsLoadingOlder] = useState(false);
   const [streamingMessageId, setStreamingMessageId] = useState<string | null>(null);
 
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
   };
 
+  // Follow new and streaming messages, not older pages loaded above
+  const lastMessage = messages[messages.length - 1];
   useEffect(() => {
     scrollToBottom();
-  }, [messages]);
+  }, [lastMessage?.id, lastMessage?.content]);
+
+  const loadOlderMessages = async () => {
+    if (!currentSessionId || !hasOlderMessages || isLoadingOlder || messages.length === 0) return;
+    setIsLoadingOlder(true);
+    const container = messagesRef.current;
+    const previousHeight = container?.scrollHeight ?? 0;
+    try {
+      const page = await chatApi.getMessages(currentSessionId, { before: messages[0].id, limit: MESSAGE_PAGE_SIZE });
+      prependMessages(toMessages(page.messages), page.has_older);
+      // Keep the messages on screen where they were
+      requestAnimationFrame(() => {
+        if (container) {
+          container.scrollTop += container.scrollHeight - previousHeight;
+        }
+      });
+    } catch (error) {
+      console.error('Failed to load older messages:', error);
+    } finally {
+      setIsLoadingOlder(false);
+    }
+  };
+
+  const handleScroll = () => {
+    if (messagesRef.current && messagesRef.current.scrollTop < 200) {
+      loadOlderMessages();
+    }
+  };
 
   const handleSendMessage = async () => {
     if (!input.trim() || isLoading) return;
@@ -103,8 +136,8 @@ export default function ChatInterface() {
           
           // Refresh sessions list to include the new session
           try {
-            const updatedSessions = await chatApi.getSessions();
-            setSessions(updatedSessions);
+            const sessionsPage = await chatApi.getSessions();
+            setSessions(sessionsPage.sessions, sessionsPage.next_cursor);
           } catch (error) {
             console.error('Failed to refresh sessions:', error);
           }
@@ -144,7 +177,7 @@ export default function ChatInterface() {
       </div>
 
       {/* Messages */}
-      <div className="flex-1 overflow-y-auto p-6 space-y-6">
+      <div ref={messagesRef} onScroll={handleScroll} className="flex-1 overflow-y-auto p-6 space-y-6">
         {messages.length === 0 ? (
           <div className="flex items-center justify-center h-full">
             <div className="text-center max-w-md">
@@ -171,6 +204,11 @@ export default function ChatInterface() {
           </div>
         ) : (
           <>
+            {isLoadingOlder && (
+              <div className="flex items-center justify-center py-2">
+                <Loader2 className="h-4 w-4 text-blue-500 animate-spin" />
+              </div>
+            )}
             {messages.map((message) => (
               <Message
                 key={message.id}
@@ -2,7 +2,7 @@
 
 import { useEffect, useState } from 'react';
 import { useChatStore } from '@/lib/store';
-import { chatApi } from '@/lib/api';
+import { chatApi, toMessages, MESSAGE_PAGE_SIZE } from '@/lib/api';
 import { Plus, MessageSquare, Trash2, History, Loader2, Share2, Upload } from 'lucide-react';
 import { formatDate } from '@/lib/utils';
 import PDFChatSharing from './PDFChatSharing';
@@ -11,15 +11,18 @@ import RobustChatImport from './RobustChatImport';
 export default function SessionManager() {
   const {
     sessions,
+    sessionsCursor,
     currentSessionId,
     setCurrentSession,
     setMessages,
     setSessions,
+    appendSessions,
     clearChat,
   } = useChatStore();
 
   const [isLoading, setIsLoading] = useState(false);
   const [isRefreshing, setIsRefreshing] = useState(false);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [showSharing, setShowSharing] = useState(false);
   const [showImport, setShowImport] = useState(false);
 
@@ -31,8 +34,8 @@ export default function SessionManager() {
   const loadSessions = async () => {
     setIsRefreshing(true);
     try {
-      const sessionsData = await chatApi.getSessions();
-      setSessions(sessionsData);
+      const sessionsPage = await chatApi.getSessions();
+      setSessions(sessionsPage.sessions, sessionsPage.next_cursor);
     } catch (error) {
       console.error('Failed to load sessions:', error);
     } finally {
@@ -40,6 +43,19 @@ export default function SessionManager() {
     }
   };
 
+  const loadMoreSessions = async () => {
+    if (!sessionsCursor) return;
+    setIsLoadingMore(true);
+    try {
+      const sessionsPage = await chatApi.getSessions(sessionsCursor);
+      appendSessions(sessionsPage.sessions, sessionsPage.next_cursor);
+    } catch (error) {
+      console.error('Failed to load more sessions:', error);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   const handleNewChat = () => {
     clearChat();
     setCurrentSession(null);
@@ -50,18 +66,10 @@ export default function SessionManager() {
 
     setIsLoading(true);
     try {
-      const session = await chatApi.getSession(sessionId);
+      // Latest messages only; ChatInterface loads older ones on scroll
+      const page = await chatApi.getMessages(sessionId, { limit: MESSAGE_PAGE_SIZE });
       setCurrentSession(sessionId);
-      
-      // Convert backend messages to frontend format
-      const frontendMessages = (session.messages || []).map((msg: any) => ({
-        id: msg.id.toString(),
-        role: msg.role,
-        content: msg.content,
-        timestamp: new Date(msg.timestamp),
-      }));
-      
-      setMessages(frontendMessages);
+      setMessages(toMessages(page.messages), page.has_older);
     } catch (error) {
       console.error('Failed to load session:', error);
     } finally {
@@ -158,7 +166,7 @@ export default function SessionManager() {
             <div>
               <h3 className="font-semibold text-sm text-slate-700 dark:text-slate-300">Chat History</h3>
               <p className="text-xs text-slate-500 dark:text-slate-400">
-                {sessions.length} conversations
+                {sessions.length}{sessionsCursor ? '+' : ''} conversations
               </p>
             </div>
           </div>
@@ -211,8 +219,14 @@ export default function SessionManager() {
                   <p className="text-sm font-semibold truncate text-slate-700 dark:text-slate-300">
                     {session.title || `Chat ${session.session_id.slice(0, 8)}`}
                   </p>
+                  {session.last_message && (
+                    <p className="text-xs truncate text-slate-500 dark:text-slate-400">
+                      {session.last_message}
+                    </p>
+                  )}
                   <p className="text-xs text-slate-500 dark:text-slate-400">
                     {formatDate(session.updated_at)}
+                    {session.message_count !== undefined && ` · ${session.message_count} messages`}
                   </p>
                 </div>
                 <button
@@ -226,6 +240,16 @@ export default function SessionManager() {
                 </button>
               </div>
             ))}
+            {sessionsCursor && (
+              <button
+                onClick={loadMoreSessions}
+                disabled={isLoadingMore}
+                className="w-full flex items-center justify-center space-x-2 px-3 py-2 text-xs text-slate-500 dark:text-slate-400 hover:bg-white/60 dark:hover:bg-slate-700/60 rounded-lg transition-all duration-200"
+              >
+                {isLoadingMore && <Loader2 className="h-3 w-3 animate-spin" />}
+                <span>Load older conversations</span>
+              </button>
+            )}
           </div>
         )}
       </div>
@@ -2,6 +2,7 @@
 
 import { useState } from 'react';
 import { useChatStore } from '@/lib/store';
+import { chatApi } from '@/lib/api';
 import { Share2, Download, Link, Copy, CheckCircle, Loader2, Clock, Users } from 'lucide-react';
 
 interface SharedChatSharingProps {
@@ -61,9 +62,16 @@ export default function SharedChatSharing({ sessionId, onClose }: SharedChatShar
     }
   };
 
-  const downloadPDF = () => {
+  const downloadPDF = async () => {
     if (shareData?.pdf_url) {
-      window.open(`http://localhost:8000${shareData.pdf_url}`, '_blank');
+      try {
+        const pdfUrl = await chatApi.exportSharedPdf(shareData.share_token);
+        // Served as an attachment, so this downloads without leaving the page
+        window.location.href = `http://localhost:8000${pdfUrl}`;
+      } catch (error) {
+        console.error('Failed to generate PDF:', error);
+        alert('Failed to generate PDF. Please try again.');
+      }
     }
   };
 
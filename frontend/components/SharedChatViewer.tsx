@@ -1,7 +1,8 @@
 'use client';
 
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { useChatStore } from '@/lib/store';
+import { chatApi } from '@/lib/api';
 import { Download, RefreshCw, Loader2, AlertCircle, Clock, Users } from 'lucide-react';
 import Message from './Message';
 
@@ -9,12 +10,19 @@ interface SharedChatViewerProps {
   shareToken: string;
 }
 
+// Without an event stream (the backend runs under WSGI), poll for new messages
+const POLL_INTERVAL = 30000;
+// An ASGI backend opens the stream at once; give up on it after this long
+const EVENTS_OPEN_TIMEOUT = 10000;
+
 export default function SharedChatViewer({ shareToken }: SharedChatViewerProps) {
   const { setMessages, setCurrentSession } = useChatStore();
   const [sessionData, setSessionData] = useState<any>(null);
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [isRefreshing, setIsRefreshing] = useState(false);
+  // Latest message id seen, read by the polling fallback
+  const cursorRef = useRef(0);
 
   const loadSharedSession = async () => {
     try {
@@ -23,6 +31,7 @@ export default function SharedChatViewer({ shareToken }: SharedChatViewerProps)
       if (response.ok) {
         const data = await response.json();
         setSessionData(data);
+        cursorRef.current = data.cursor || 0;
         setMessages(data.messages.map((msg: any) => ({
           id: msg.id,
           role: msg.role,
@@ -43,25 +52,103 @@ export default function SharedChatViewer({ shareToken }: SharedChatViewerProps)
     }
   };
 
+  const appendMessages = (messages: any[]) => {
+    setSessionData((current: any) => {
+      const known = new Set(current.messages.map((msg: any) => msg.id));
+      const added = messages.filter((msg: any) => !known.has(msg.id));
+      if (!added.length) {
+        return current;
+      }
+      const cursor = Math.max(current.cursor || 0, ...added.map((msg: any) => Number(msg.id)));
+      cursorRef.current = Math.max(cursorRef.current, cursor);
+      return {
+        ...current,
+        messages: [...current.messages, ...added],
+        cursor,
+        last_synced: new Date().toISOString()
+      };
+    });
+  };
+
   const refreshSession = async () => {
     setIsRefreshing(true);
-    await loadSharedSession();
+    try {
+      // Only fetch messages newer than the cursor; 304 means nothing new
+      const response = await fetch(
+        `http://localhost:8000/api/chat/shared/${shareToken}/?after=${cursorRef.current}`
+      );
+      if (response.status === 200) {
+        const data = await response.json();
+        appendMessages(data.messages);
+      } else if (response.status !== 304) {
+        const errorData = await response.json();
+        setError(errorData.error || 'Failed to refresh shared session');
+      }
+    } catch (err) {
+      setError('Network error. Please check your connection.');
+    } finally {
+      setIsRefreshing(false);
+    }
   };
 
-  const downloadPDF = () => {
+  const downloadPDF = async () => {
     if (sessionData?.pdf_url) {
-      window.open(`http://localhost:8000${sessionData.pdf_url}`, '_blank');
+      try {
+        const pdfUrl = await chatApi.exportSharedPdf(shareToken);
+        // Served as an attachment, so this downloads without leaving the page
+        window.location.href = `http://localhost:8000${pdfUrl}`;
+      } catch (error) {
+        console.error('Failed to generate PDF:', error);
+        alert('Failed to generate PDF. Please try again.');
+      }
     }
   };
 
   useEffect(() => {
     loadSharedSession();
-    
-    // Auto-refresh every 30 seconds
-    const interval = setInterval(loadSharedSession, 30000);
-    return () => clearInterval(interval);
   }, [shareToken]);
 
+  const hasLoaded = sessionData !== null;
+
+  useEffect(() => {
+    if (!hasLoaded) {
+      return;
+    }
+
+    // Push new messages as they are created, falling back to polling when
+    // the backend cannot hold a stream open
+    let interval: ReturnType<typeof setInterval> | undefined;
+    const poll = () => {
+      events.close();
+      clearTimeout(openTimeout);
+      if (interval === undefined) {
+        interval = setInterval(refreshSession, POLL_INTERVAL);
+      }
+    };
+    const events = new EventSource(
+      `http://localhost:8000/api/chat/shared/${shareToken}/events/?after=${cursorRef.current}`
+    );
+    const openTimeout = setTimeout(poll, EVENTS_OPEN_TIMEOUT);
+    events.onopen = () => clearTimeout(openTimeout);
+    events.onmessage = (event) => appendMessages([JSON.parse(event.data)]);
+    events.onerror = () => {
+      // CLOSED: refused (204 under WSGI) rather than a dropped connection,
+      // which EventSource retries on its own
+      if (events.readyState === EventSource.CLOSED) {
+        poll();
+      }
+    };
+    events.addEventListener('expired', () => {
+      events.close();
+      setError('Shared session has expired');
+    });
+    return () => {
+      events.close();
+      clearTimeout(openTimeout);
+      clearInterval(interval);
+    };
+  }, [shareToken, hasLoaded]);
+
   if (isLoading) {
     return (
       <div className="flex h-screen bg-background items-center justify-center">
@@ -9,8 +9,21 @@ const api = axios.create({
   },
 });
 
+// Messages fetched per window when opening a session or scrolling back
+export const MESSAGE_PAGE_SIZE = 50;
+
+// Backend messages in the store's format
+export const toMessages = (messages: any[]) =>
+  messages.map((msg: any) => ({
+    id: msg.id.toString(),
+    role: msg.role,
+    content: msg.content,
+    timestamp: new Date(msg.timestamp),
+  }));
+
 // Chat API
 export const chatApi = {
+  // /chat/ streams under both runserver (WSGI) and ASGI; /chat/async/ is buffered under WSGI
   sendMessage: async (message: string, sessionId?: string, stream = false) => {
     if (stream) {
       // Handle streaming response
@@ -47,8 +60,17 @@ export const chatApi = {
     return response.data;
   },
 
-  getSessions: async () => {
-    const response = await api.get('/chat/sessions/');
+  getMessages: async (sessionId: string, params: { before?: string; after?: string; limit?: number } = {}) => {
+    // A window of messages in reading order: { messages, has_older, has_newer }
+    const response = await api.get(`/chat/session/${sessionId}/messages/`, { params });
+    return response.data;
+  },
+
+  getSessions: async (cursor?: string | null) => {
+    // One page of session summaries, newest first: { sessions, next_cursor }
+    const response = await api.get('/chat/sessions/page/', {
+      params: cursor ? { cursor } : {},
+    });
     return response.data;
   },
 
@@ -56,6 +78,25 @@ export const chatApi = {
     const response = await api.delete(`/chat/session/${sessionId}/delete/`);
     return response.data;
   },
+
+  exportSharedPdf: async (shareToken: string) => {
+    // PDFs render in the background; wait for the job before downloading
+    const response = await api.post(`/chat/shared/${shareToken}/pdf/export/`);
+    let job = response.data;
+    while (job.status === 'queued' || job.status === 'running') {
+      await new Promise(resolve => setTimeout(resolve, 1000));
+      job = await chatApi.getPdfJob(job.id);
+    }
+    if (job.status === 'failed') {
+      throw new Error(job.error || 'Failed to generate PDF');
+    }
+    return job.pdf_url;
+  },
+
+  getPdfJob: async (jobId: string) => {
+    const response = await api.get(`/chat/pdf-jobs/${jobId}/`);
+    return response.data;
+  },
 };
 
 // File API
@@ -72,6 +113,21 @@ export const fileApi = {
         'Content-Type': 'multipart/form-data',
       },
     });
+
+    // Parsing runs in the background; poll the job until the file is ready
+    let job = response.data;
+    while (job.status === 'queued' || job.status === 'running') {
+      await new Promise(resolve => setTimeout(resolve, 1000));
+      job = await fileApi.getJob(job.id);
+    }
+    if (job.status === 'failed') {
+      throw new Error(job.error || 'Failed to parse file');
+    }
+    return job.file;
+  },
+
+  getJob: async (jobId: string) => {
+    const response = await api.get(`/file/jobs/${jobId}/`);
     return response.data;
   },
 
@@ -90,8 +146,8 @@ export const fileApi = {
     return response.data;
   },
 
-  searchFiles: async (query: string) => {
-    const response = await api.post('/file/search/', { query });
+  searchFiles: async (query: string, page = 1, pageSize = 20) => {
+    const response = await api.post('/file/search/', { query, page, page_size: pageSize });
     return response.data;
   },
 };
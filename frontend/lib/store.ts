@@ -13,7 +13,10 @@ export interface ChatSession {
   title: string;
   created_at: string;
   updated_at: string;
-  messages: Message[];
+  messages?: Message[];
+  // Session list summaries (GET /chat/sessions/page/)
+  message_count?: number;
+  last_message?: string | null;
 }
 
 export interface ParsedFile {
@@ -30,11 +33,13 @@ interface ChatStore {
   // Current session
   currentSessionId: string | null;
   messages: Message[];
+  hasOlderMessages: boolean;
   isLoading: boolean;
   error: string | null;
 
   // Sessions
   sessions: ChatSession[];
+  sessionsCursor: string | null;
   
   // Files
   files: ParsedFile[];
@@ -43,10 +48,12 @@ interface ChatStore {
   setCurrentSession: (sessionId: string | null) => void;
   addMessage: (message: Omit<Message, 'id' | 'timestamp'>) => void;
   updateMessage: (id: string, content: string) => void;
-  setMessages: (messages: Message[]) => void;
+  setMessages: (messages: Message[], hasOlder?: boolean) => void;
+  prependMessages: (messages: Message[], hasOlder: boolean) => void;
   setLoading: (loading: boolean) => void;
   setError: (error: string | null) => void;
-  setSessions: (sessions: ChatSession[]) => void;
+  setSessions: (sessions: ChatSession[], cursor?: string | null) => void;
+  appendSessions: (sessions: ChatSession[], cursor: string | null) => void;
   setFiles: (files: ParsedFile[]) => void;
   clearChat: () => void;
 }
@@ -55,9 +62,11 @@ export const useChatStore = create<ChatStore>((set, get) => ({
   // State
   currentSessionId: null,
   messages: [],
+  hasOlderMessages: false,
   isLoading: false,
   error: null,
   sessions: [],
+  sessionsCursor: null,
   files: [],
 
   // Actions
@@ -65,7 +74,7 @@ export const useChatStore = create<ChatStore>((set, get) => ({
     set({ currentSessionId: sessionId });
     // If switching to a new session, clear current messages
     if (sessionId) {
-      set({ messages: [] });
+      set({ messages: [], hasOlderMessages: false });
     }
   },
   
@@ -88,15 +97,34 @@ export const useChatStore = create<ChatStore>((set, get) => ({
     }));
   },
 
-  setMessages: (messages) => set({ messages }),
+  setMessages: (messages, hasOlder = false) => set({ messages, hasOlderMessages: hasOlder }),
+
+  prependMessages: (messages, hasOlder) =>
+    set((state) => ({
+      messages: [...messages, ...state.messages],
+      hasOlderMessages: hasOlder,
+    })),
   
   setLoading: (loading) => set({ isLoading: loading }),
   
   setError: (error) => set({ error }),
   
-  setSessions: (sessions) => set({ sessions }),
+  setSessions: (sessions, cursor) =>
+    set((state) => ({
+      sessions,
+      sessionsCursor: cursor === undefined ? state.sessionsCursor : cursor,
+    })),
+
+  appendSessions: (sessions, cursor) =>
+    set((state) => ({
+      sessions: [
+        ...state.sessions,
+        ...sessions.filter((s) => !state.sessions.some((existing) => existing.session_id === s.session_id)),
+      ],
+      sessionsCursor: cursor,
+    })),
   
   setFiles: (files) => set({ files }),
   
-  clearChat: () => set({ messages: [], currentSessionId: null, error: null }),
+  clearChat: () => set({ messages: [], hasOlderMessages: false, currentSessionId: null, error: null }),
 }));